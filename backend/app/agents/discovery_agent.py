@@ -1,14 +1,25 @@
 import os
-import json
+import logging
+from typing import AsyncIterator, Dict, List
 from openai import AsyncOpenAI
 from app.models.schemas import DiscoveryInput, DiscoveryResult, KeywordData, ChannelData, KeywordProposal, StrategyInput, StrategyResult
+from app.services.json_stream import JsonArrayStreamer
+from app.services.keyword_index import KeywordIndex
+from app.services.memo_cache import LRUCache, canonical_key, prompt_version
+from app.services.replay import replay_store
+from app.services.metrics import instrument_openai, record_cache_lookup
+from app.services.model_router import json_validator, model_router
+from app.services.prompts import PromptTemplate
+from app.services.singleflight import SingleFlight
 
-class DiscoveryAgent:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
-    async def propose_keywords(self, input_data: DiscoveryInput) -> KeywordProposal:
-        system_prompt = """You are a Discovery & Market Intelligence Agent specialized in B2B lead generation.
+# Token-set similarity at which two keywords are treated as the same
+KEYWORD_SIMILARITY_THRESHOLD = float(os.getenv("KEYWORD_SIMILARITY_THRESHOLD", "0.8"))
+# Maximum number of memoized keyword proposals / strategies kept in memory
+DISCOVERY_CACHE_SIZE = int(os.getenv("DISCOVERY_CACHE_SIZE", "256"))
+
+KEYWORD_SYSTEM_PROMPT = """You are a Discovery & Market Intelligence Agent specialized in B2B lead generation.
 
         Your task is to discover and extract **real, high-intent, industry-specific keywords** that can be used to identify potential customer companies across multiple platforms (Google Maps, company websites, directories, social platforms, B2B databases).
 
@@ -99,54 +110,8 @@ class DiscoveryAgent:
         - Your output should be directly usable for automated lead generation without cleanup.
 
         """
-        user_prompt = f"""
-        ICP: {', '.join(input_data.icp_profile)}
-        Industries: {', '.join(input_data.target_industries)}
-        Summary: {input_data.company_summary}
-        """
-        
-        try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                response_format={ "type": "json_object" }
-            )
-            data = json.loads(response.choices[0].message.content)
-            
-            # Handle the new prompt format which uses "keywords" instead of "grouped_keywords"
-            keywords_list = data.get("keywords", data.get("grouped_keywords", []))
-            
-            grouped_keywords = []
-            
-            # Check if it's a flat list of strings (common LLM mistake)
-            if keywords_list and isinstance(keywords_list[0], str):
-                grouped_keywords.append({
-                    "category_name": "General Recommendations",
-                    "keywords": keywords_list
-                })
-            else:
-                # Handle structured list of categories
-                for item in keywords_list:
-                    if isinstance(item, dict):
-                        grouped_keywords.append({
-                            "category_name": item.get("category_name", "General"),
-                            "keywords": item.get("keywords", [])
-                        })
-            
-            print(f"✓ Generated {len(grouped_keywords)} keyword categories")
-            # Debug: print raw if empty
-            if not grouped_keywords:
-                print(f"⚠️ Raw keyword data payload: {json.dumps(data, indent=2)}")
-                
-            return KeywordProposal(grouped_keywords=grouped_keywords)
-        except Exception as e:
-            print(f"Keyword Gen Error: {e}")
-            import traceback
-            traceback.print_exc()
-            return KeywordProposal(grouped_keywords=[])
 
-    async def generate_strategy(self, input_data: StrategyInput) -> StrategyResult:
-        system_prompt = """You are a Lead Generation Channel & Distribution Intelligence Agent.
+STRATEGY_SYSTEM_PROMPT = """You are a Lead Generation Channel & Distribution Intelligence Agent.
 
         Your responsibility is to determine **where real businesses using the given keywords can actually be found**, not where they theoretically could exist.
 
@@ -225,25 +190,242 @@ class DiscoveryAgent:
         - Your output must be directly actionable in an automated scraping or research workflow.
 
         """
+
+KEYWORD_PROMPT = PromptTemplate("keywords", KEYWORD_SYSTEM_PROMPT)
+STRATEGY_PROMPT = PromptTemplate("strategy", STRATEGY_SYSTEM_PROMPT)
+
+# Cache keys embed these versions, so editing a prompt or its model route invalidates old entries
+KEYWORD_PROMPT_VERSION = prompt_version(KEYWORD_PROMPT.instructions, ",".join(model_router.tiers("keywords")),
+                                        str(KEYWORD_SIMILARITY_THRESHOLD))
+STRATEGY_PROMPT_VERSION = prompt_version(STRATEGY_PROMPT.instructions, ",".join(model_router.tiers("strategy")))
+
+_validate_json = json_validator()
+# Strategies with fewer channels than this are retried on the next model tier
+MIN_STRATEGY_CHANNELS = int(os.getenv("MIN_STRATEGY_CHANNELS", "3"))
+
+
+def _validate_keywords(content: str):
+    data, problem = _validate_json(content)
+    if problem is None and not (data.get("keywords") or data.get("grouped_keywords")):
+        problem = "missing:keywords"
+    return data, problem
+
+
+async def _stream_content(stream) -> AsyncIterator[str]:
+    """Text deltas of a streamed chat completion."""
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+class DiscoveryAgent:
+    def __init__(self):
+        self.client = instrument_openai(
+            replay_store.wrap_openai(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))),
+            agent="discovery",
+        )
+        # Memoized results keyed by canonicalized (order-insensitive) input
+        self.cache = LRUCache(max_size=DISCOVERY_CACHE_SIZE)
+        # Identical requests arriving before the first one is cached share its LLM call
+        self._keywords_inflight = SingleFlight("keywords")
+        self._strategy_inflight = SingleFlight("strategy")
+
+    def _cache_key(self, namespace: str, version: str, input_data) -> str:
+        payload = input_data.model_dump(exclude={"regenerate"})
+        return canonical_key(namespace, version, payload)
+
+    def _cached(self, cache_key: str, input_data, label: str):
+        if input_data.regenerate:
+            return None
+        cached = self.cache.get(cache_key)
+        record_cache_lookup("discovery", cached is not None)
+        if cached is None:
+            return None
+        logger.info("Served from cache", extra={"label": label})
+        return cached.model_copy(deep=True)
+
+    def _keyword_messages(self, input_data: DiscoveryInput) -> List[Dict]:
+        user_prompt = f"""
+        ICP: {', '.join(input_data.icp_profile)}
+        Industries: {', '.join(input_data.target_industries)}
+        Summary: {input_data.company_summary}
+        """
+        return KEYWORD_PROMPT.messages(user_prompt)
+
+    def _strategy_messages(self, input_data: StrategyInput) -> List[Dict]:
         user_prompt = f"""
         Keywords: {', '.join(input_data.selected_keywords)}
         Industry Context: {', '.join(input_data.target_industries)}
         """
+        return STRATEGY_PROMPT.messages(user_prompt)
+
+    def _keyword_proposal(self, data: dict) -> KeywordProposal:
+        # Handle the new prompt format which uses "keywords" instead of "grouped_keywords"
+        keywords_list = data.get("keywords", data.get("grouped_keywords", []))
+        
+        grouped_keywords = []
+        
+        # Check if it's a flat list of strings (common LLM mistake)
+        if keywords_list and isinstance(keywords_list[0], str):
+            grouped_keywords.append({
+                "category_name": "General Recommendations",
+                "keywords": keywords_list
+            })
+        else:
+            # Handle structured list of categories
+            for item in keywords_list:
+                if isinstance(item, dict):
+                    grouped_keywords.append({
+                        "category_name": item.get("category_name", "General"),
+                        "keywords": item.get("keywords", [])
+                    })
+        
+        # Collapse case/plural/punctuation variants across categories
+        index = KeywordIndex(similarity_threshold=KEYWORD_SIMILARITY_THRESHOLD)
+        grouped_keywords = index.collapse_categories(grouped_keywords)
+        
+        logger.info("Generated keyword categories", extra={
+            "categories": len(grouped_keywords),
+            "keywords_proposed": index.total_added,
+            "keywords_unique": len(index.canonical),
+            "dedup_ratio": round(index.dedup_ratio, 3),
+        })
+        # Debug: log raw payload if empty
+        if not grouped_keywords:
+            logger.warning("Empty keyword proposal", extra={"payload": data})
+            
+        return KeywordProposal(
+            grouped_keywords=grouped_keywords,
+            total_keywords=index.total_added,
+            unique_keywords=len(index.canonical),
+            dedup_ratio=index.dedup_ratio
+        )
+
+    async def propose_keywords(self, input_data: DiscoveryInput) -> KeywordProposal:
+        cache_key = self._cache_key("keywords", KEYWORD_PROMPT_VERSION, input_data)
+        cached = self._cached(cache_key, input_data, "Keyword proposal")
+        if cached is not None:
+            return cached
+        return await self._keywords_inflight.do(cache_key, lambda: self._propose_keywords(input_data, cache_key))
+
+    async def _propose_keywords(self, input_data: DiscoveryInput, cache_key: str) -> KeywordProposal:
+        try:
+            data, model = await model_router.complete(
+                self.client, "keywords", self._keyword_messages(input_data), _validate_keywords,
+                response_format={ "type": "json_object" }
+            )
+            result = self._keyword_proposal(data)
+            # Only cache usable proposals so an empty response can be retried
+            if result.grouped_keywords:
+                self.cache.set(cache_key, result.model_copy(deep=True))
+            return result
+        except Exception as e:
+            logger.exception("Keyword generation failed")
+            return KeywordProposal(grouped_keywords=[])
+
+    async def stream_keywords(self, input_data: DiscoveryInput) -> AsyncIterator[Dict]:
+        """
+        Same proposal as propose_keywords, streamed. Yields a "category" event
+        for each keyword category as soon as the model has finished writing it
+        (already deduplicated against earlier categories), then a "result"
+        event with the final KeywordProposal.
+        """
+        cache_key = self._cache_key("keywords", KEYWORD_PROMPT_VERSION, input_data)
+        result = self._cached(cache_key, input_data, "Keyword proposal")
+        if result is not None:
+            for category in result.grouped_keywords:
+                yield {"event": "category", "data": category.model_dump()}
+        else:
+            try:
+                # Streamed output cannot be taken back, so it goes straight to the top tier
+                stream = await self.client.chat.completions.create(
+                    model=model_router.top_model("keywords"),
+                    messages=self._keyword_messages(input_data),
+                    response_format={ "type": "json_object" },
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                parser = JsonArrayStreamer(("keywords", "grouped_keywords"))
+                index = KeywordIndex(similarity_threshold=KEYWORD_SIMILARITY_THRESHOLD)
+                async for text in _stream_content(stream):
+                    for _, item in parser.feed(text):
+                        if not isinstance(item, dict):
+                            continue
+                        category = index.collapse_category(item)
+                        if category["keywords"]:
+                            category["aliases"] = {k: list(index.aliases[k]) for k in category["keywords"] if index.aliases[k]}
+                            yield {"event": "category", "data": category}
+                # The final proposal is rebuilt from the whole document so it
+                # matches the non-streaming endpoint exactly
+                result = self._keyword_proposal(parser.result())
+                if result.grouped_keywords:
+                    self.cache.set(cache_key, result.model_copy(deep=True))
+            except Exception:
+                logger.exception("Keyword generation failed")
+                result = KeywordProposal(grouped_keywords=[])
+        yield {"event": "result", "data": result.model_dump()}
+
+    async def generate_strategy(self, input_data: StrategyInput) -> StrategyResult:
+        cache_key = self._cache_key("strategy", STRATEGY_PROMPT_VERSION, input_data)
+        cached = self._cached(cache_key, input_data, "Strategy")
+        if cached is not None:
+            return cached
+        return await self._strategy_inflight.do(cache_key, lambda: self._generate_strategy(input_data, cache_key))
+
+    async def _generate_strategy(self, input_data: StrategyInput, cache_key: str) -> StrategyResult:
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            data, model = await model_router.complete(
+                self.client, "strategy", self._strategy_messages(input_data),
+                json_validator(min_items={"channels": MIN_STRATEGY_CHANNELS}, item_fields={"channels": ("name",)}),
                 response_format={ "type": "json_object" }
             )
-            data = json.loads(response.choices[0].message.content)
-            return StrategyResult(
+            result = StrategyResult(
                 channels=data.get("channels", []),
                 strategy_summary=data.get("strategy_summary", "")
             )
+            if result.channels:
+                self.cache.set(cache_key, result.model_copy(deep=True))
+            return result
         except Exception as e:
-            print(f"Strategy Gen Error: {e}")
+            logger.error("Strategy generation failed", extra={"error": str(e)})
             return StrategyResult(channels=[], strategy_summary="Error generating strategy")
 
+    async def stream_strategy(self, input_data: StrategyInput) -> AsyncIterator[Dict]:
+        """
+        Same strategy as generate_strategy, streamed: a "channel" event per
+        channel as soon as it is complete, then a "result" event.
+        """
+        cache_key = self._cache_key("strategy", STRATEGY_PROMPT_VERSION, input_data)
+        result = self._cached(cache_key, input_data, "Strategy")
+        if result is not None:
+            for channel in result.channels:
+                yield {"event": "channel", "data": channel}
+        else:
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=model_router.top_model("strategy"),
+                    messages=self._strategy_messages(input_data),
+                    response_format={ "type": "json_object" },
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                parser = JsonArrayStreamer(("channels",))
+                async for text in _stream_content(stream):
+                    for _, channel in parser.feed(text):
+                        if isinstance(channel, dict):
+                            yield {"event": "channel", "data": channel}
+                data = parser.result()
+                result = StrategyResult(
+                    channels=data.get("channels", []),
+                    strategy_summary=data.get("strategy_summary", "")
+                )
+                if result.channels:
+                    self.cache.set(cache_key, result.model_copy(deep=True))
+            except Exception as e:
+                logger.error("Strategy generation failed", extra={"error": str(e)})
+                result = StrategyResult(channels=[], strategy_summary="Error generating strategy")
+        yield {"event": "result", "data": result.model_dump()}
+
     # Deprecated single-step method retained for compatibility if needed, using new components
     async def discover(self, input_data: DiscoveryInput) -> DiscoveryResult:
         # Just return empty/dummy for now as we are switching flow
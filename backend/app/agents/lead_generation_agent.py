@@ -1,16 +1,112 @@
 import os
-import json
 import asyncio
+import logging
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
 from openai import AsyncOpenAI
 from app.models.schemas import (
     LeadGenerationRequest, 
     LeadGenerationResult, 
     CompanyLead, 
-    PersonContact
+    PersonContact,
+    ReEnrichRequest,
+    ReEnrichResult
 )
 from app.services.web_scraper import WebScraper
+from app.services.lead_ranker import LeadRanker
+from app.services.replay import replay_store
+from app.services.result_store import result_store
+from app.services.lead_store import lead_store, lead_domain
+from app.services.seen_filter import seen_filter
+from app.services.cancellation import Deadline
+from app.services.freshness import FIELD_GROUPS, plan_fetches, stale_groups, stamp
+from app.services.metrics import PIPELINE_QUEUE_DEPTH, instrument_openai
+from app.services.model_router import json_validator, model_router
+from app.services.prompts import PromptTemplate
+from app.services.tracing import span, start_trace
+
+logger = logging.getLogger(__name__)
+
+# Fetch homepage title/description for each lead before ranking
+FETCH_RANKING_SNIPPETS = os.getenv("FETCH_RANKING_SNIPPETS", "true").lower() == "true"
+SNIPPET_CONCURRENCY = int(os.getenv("SNIPPET_CONCURRENCY", "10"))
+
+# Static instructions only; per-request values go in the user message so the
+# provider can cache the prefix (see PromptTemplate)
+DISCOVER_COMPANIES_PROMPT = PromptTemplate("discover_companies", """You are a B2B Lead Discovery Agent.
+    Your task is to identify real companies that match the given criteria from the specified channel.
+    The channel, keywords, industries and the maximum number of companies are given at the end.
+    
+    For each company, provide:
+    - Company name (real, existing company)
+    - Website URL
+    - Industry
+    - Estimated company size (e.g., "1-10", "11-50", "51-200", "201-500", "500+")
+    - Location (City, Country)
+    - LinkedIn URL (if applicable)
+    
+    Return a JSON array of companies, no more than the requested limit.
+    Focus on companies that are likely to be found on the given channel and match the keywords/industries.
+    
+    Output format:
+    {
+        "companies": [
+            {
+                "company_name": "Example Corp",
+                "website": "https://example.com",
+                "industry": "Technology",
+                "company_size": "51-200",
+                "location": "San Francisco, USA",
+                "linkedin_url": "https://linkedin.com/company/example"
+            }
+        ]
+    }
+    """)
+
+KEY_CONTACTS_PROMPT = PromptTemplate("key_contacts", """You are a B2B Contact Research Agent.
+    Given a company, identify key decision-makers and provide their contact information.
+    
+    Find 2-4 key contacts:
+    - Decision makers (C-level, VPs, Directors)
+    - Purchasing authorities
+    - Department heads relevant to the seller's offering described at the end
+    
+    For each person provide ALL available contact info:
+    - Full name
+    - Designation/Title
+    - Role category (Decision Maker, Purchasing Authority, Technical Lead, etc.)
+    - Professional email
+    - Phone number
+    - LinkedIn URL
+    - Twitter URL
+    - Facebook URL
+    - Instagram URL
+    - WhatsApp number
+    
+    Return JSON format:
+    {
+        "key_contacts": [
+            {
+                "full_name": "John Doe",
+                "designation": "CEO",
+                "role_category": "Decision Maker",
+                "email": "john.doe@company.com",
+                "phone": "+1-xxx-xxx-xxxx",
+                "linkedin_url": "https://linkedin.com/in/johndoe",
+                "twitter_url": "https://twitter.com/johndoe",
+                "facebook_url": null,
+                "instagram_url": null,
+                "whatsapp_number": "+1-xxx-xxx-xxxx"
+            }
+        ]
+    }
+    
+    Be factual. Only include verifiable contact information found in public sources.
+    """)
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower() if url else ""
 
 class LeadGenerationAgent:
     """
@@ -19,109 +115,276 @@ class LeadGenerationAgent:
     """
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = instrument_openai(
+            replay_store.wrap_openai(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))),
+            agent="lead_generation",
+        )
         self.scraper = WebScraper()
+        self.ranker = LeadRanker()
     
     async def generate_leads(self, request: LeadGenerationRequest) -> LeadGenerationResult:
         """
-        Main orchestration method for lead generation workflow
+        Main orchestration method for lead generation workflow.
+        With request.trace set, the result carries a timed span per stage,
+        nested per channel and per lead.
         """
+        with start_trace(request.trace) as trace:
+            with span("generate_leads", channels=len(request.selected_channels)):
+                result = await self._generate_leads(request)
+        if trace is not None and request.trace:
+            result.trace_id = trace.trace_id
+            result.trace = trace.to_spans()
+        try:
+            result.result_id = await asyncio.to_thread(result_store.save, result)
+        except OSError as e:
+            logger.warning("Could not store lead result", extra={"error": str(e)})
+        try:
+            await asyncio.to_thread(lead_store.add_leads, result.companies, result.result_id)
+        except Exception as e:
+            logger.warning("Could not index leads", extra={"error": str(e)})
+        # Enriched companies are not rediscovered by later campaigns
+        try:
+            enriched = [lead for lead in result.companies if lead.enrichment_status == "enriched"]
+            await asyncio.to_thread(seen_filter.add_leads, enriched)
+        except Exception as e:
+            logger.warning("Could not update seen filter", extra={"error": str(e)})
+        return result
+    
+    async def _generate_leads(self, request: LeadGenerationRequest) -> LeadGenerationResult:
         started_at = datetime.utcnow().isoformat()
+        deadline = Deadline(request.deadline_seconds)
         all_companies = []
         leads_by_channel = {}
+        skipped_seen = 0
+        exclusions = []
+        if request.skip_seen:
+            try:
+                exclusions = await asyncio.to_thread(seen_filter.prompt_exclusions, request.target_industries)
+            except Exception as e:
+                logger.warning("Could not load exclusions", extra={"error": str(e)})
         
-        # Process each channel
+        # Discover companies from each channel
         for channel in request.selected_channels:
-            print(f"Processing channel: {channel}")
-            channel_leads = await self._discover_from_channel(
-                channel=channel,
-                keywords=request.selected_keywords,
-                industries=request.target_industries,
-                max_leads=request.max_leads_per_channel
-            )
-            
-            # Enrich each lead
-            enriched_leads = []
-            for lead in channel_leads:
-                enriched = await self._enrich_company_lead(lead, request.company_summary)
-                enriched_leads.append(enriched)
-            
-            all_companies.extend(enriched_leads)
-            leads_by_channel[channel] = len(enriched_leads)
+            if deadline.expired:
+                leads_by_channel[channel] = 0
+                continue
+            logger.info("Processing channel", extra={"channel": channel})
+            with span("discover_channel", new_track=True, channel=channel) as channel_span:
+                try:
+                    channel_leads = await deadline.run(self._discover_from_channel(
+                        channel=channel,
+                        keywords=request.selected_keywords,
+                        industries=request.target_industries,
+                        max_leads=request.max_leads_per_channel,
+                        exclude=exclusions
+                    ))
+                except asyncio.TimeoutError:
+                    logger.warning("Deadline passed during discovery", extra={"channel": channel})
+                    channel_leads = []
+                # Drop companies already enriched or excluded before they cost an enrichment
+                if request.skip_seen and channel_leads:
+                    try:
+                        channel_leads, seen = await asyncio.to_thread(seen_filter.filter_new, channel_leads)
+                        skipped_seen += len(seen)
+                    except Exception as e:
+                        logger.warning("Seen filter check failed", extra={"channel": channel, "error": str(e)})
+                if channel_span:
+                    channel_span.set(leads=len(channel_leads))
+            all_companies.extend(channel_leads)
+            leads_by_channel[channel] = len(channel_leads)
+        
+        # Rank leads against the ICP so enrichment is spent on the best fits
+        with span("rank_leads", leads=len(all_companies)) as ranking_span:
+            to_enrich = await self._rank_leads(all_companies, request, deadline)
+            if ranking_span:
+                ranking_span.set(selected=len(to_enrich))
+        selected_ids = {id(lead) for lead in to_enrich}
+        for lead in all_companies:
+            if id(lead) not in selected_ids:
+                lead.enrichment_status = "skipped"
+        
+        # Enrich the selected leads, most relevant first. Leads not reached
+        # before the deadline keep enrichment_status "pending".
+        enrichment_queue = PIPELINE_QUEUE_DEPTH.labels(stage="enrichment")
+        enrichment_queue.set(len(to_enrich))
+        pending = 0
+        for lead in to_enrich:
+            if deadline.expired:
+                pending += 1
+            else:
+                with span("enrich_lead", new_track=True, company=lead.company_name, domain=_domain(lead.website)):
+                    try:
+                        await deadline.run(self._enrich_company_lead(lead, request.company_summary))
+                    except asyncio.TimeoutError:
+                        lead.enrichment_status = "pending"
+                        pending += 1
+            enrichment_queue.dec()
+        if pending:
+            logger.warning("Deadline passed before enrichment finished", extra={
+                "deadline_seconds": request.deadline_seconds, "pending": pending
+            })
         
         completed_at = datetime.utcnow().isoformat()
         
+        summary = f"Generated {len(all_companies)} leads across {len(request.selected_channels)} channels"
+        skipped = len(all_companies) - len(to_enrich)
+        if skipped:
+            summary += f" ({len(to_enrich) - pending} enriched, {skipped} skipped as low ICP relevance)"
+        if pending:
+            summary += f"; {pending} still pending when the {request.deadline_seconds:g}s deadline passed"
+        if skipped_seen:
+            summary += f"; {skipped_seen} skipped as already seen"
+        
         return LeadGenerationResult(
             total_leads=len(all_companies),
             leads_by_channel=leads_by_channel,
             companies=all_companies,
-            generation_summary=f"Generated {len(all_companies)} leads across {len(request.selected_channels)} channels",
+            generation_summary=summary,
             started_at=started_at,
-            completed_at=completed_at
+            completed_at=completed_at,
+            pending_leads=pending,
+            skipped_seen=skipped_seen
+        )
+    
+    async def re_enrich(self, request: ReEnrichRequest) -> ReEnrichResult:
+        """
+        Refresh stored leads incrementally: only field groups that are missing,
+        stale or due for a retry are re-fetched, and fresh leads are skipped.
+        """
+        refreshed, planned = [], {}
+        fetches = {fetch: 0 for fetch in ("social_links", "contact_info", "llm_contacts")}
+        skipped = 0
+        async for data in self._re_enrich_candidates(request):
+            if len(refreshed) >= request.limit:
+                break
+            lead = CompanyLead.model_validate(data)
+            groups = stale_groups(lead, force=request.force_fields)
+            if not groups:
+                skipped += 1
+                continue
+            needed = plan_fetches(groups)
+            if not lead.website:
+                needed &= {"llm_contacts"}
+            with span("re_enrich_lead", new_track=True, domain=_domain(lead.website), groups=",".join(groups)):
+                await self._enrich_company_lead(lead, request.company_summary, groups=groups)
+            for fetch in needed:
+                fetches[fetch] += 1
+            planned[lead_domain(lead.website) or lead.company_name] = groups
+            refreshed.append(lead)
+        
+        if refreshed:
+            await asyncio.to_thread(lead_store.add_leads, refreshed)
+        full_cost = sum(3 if lead.website else 1 for lead in refreshed)
+        logger.info("Re-enriched leads", extra={"refreshed": len(refreshed), "skipped_fresh": skipped, "fetches": fetches})
+        return ReEnrichResult(
+            refreshed=refreshed,
+            planned=planned,
+            fetches=fetches,
+            fetches_saved=full_cost - sum(fetches.values()),
+            skipped_fresh=skipped
         )
     
+    async def _re_enrich_candidates(self, request: ReEnrichRequest):
+        """Stored leads to consider, read off the event loop one page at a time."""
+        if request.domains:
+            for data in await asyncio.to_thread(lead_store.get_leads, request.domains):
+                yield data
+            return
+        last_id = 0
+        while True:
+            page = await asyncio.to_thread(lead_store.leads_after, last_id)
+            if not page:
+                return
+            for _, data in page:
+                yield data
+            last_id = page[-1][0]
+    
+    async def _rank_leads(self, leads: List[CompanyLead], request: LeadGenerationRequest,
+                          deadline: Optional[Deadline] = None) -> List[CompanyLead]:
+        """
+        Score leads locally against the ICP, keywords and industries and return
+        those selected for enrichment. Homepage snippets are fetched concurrently
+        with a short timeout to give the ranker more text than name and industry;
+        when the deadline passes, ranking uses the snippets fetched so far. The
+        scraper keeps these homepage responses, so enrichment does not fetch
+        them again.
+        """
+        if not leads:
+            return []
+        
+        snippets = {}
+        if FETCH_RANKING_SNIPPETS:
+            semaphore = asyncio.Semaphore(SNIPPET_CONCURRENCY)
+            snippet_queue = PIPELINE_QUEUE_DEPTH.labels(stage="snippets")
+            
+            async def fetch(index: int, lead: CompanyLead):
+                async with semaphore:
+                    try:
+                        with span("fetch_snippet", new_track=True, domain=_domain(lead.website)):
+                            snippets[index] = await self.scraper.get_snippet(lead.website)
+                        lead.summary = snippets[index] or None
+                    finally:
+                        snippet_queue.dec()
+            
+            pending = [(i, lead) for i, lead in enumerate(leads) if lead.website]
+            snippet_queue.set(len(pending))
+            fetches = asyncio.gather(*(fetch(i, lead) for i, lead in pending))
+            try:
+                await (deadline.run(fetches) if deadline else fetches)
+            except asyncio.TimeoutError:
+                logger.warning("Deadline passed during snippet fetches", extra={"fetched": len(snippets)})
+        
+        selected = self.ranker.rank(
+            leads,
+            icp_profile=request.icp_profile,
+            keywords=request.selected_keywords,
+            industries=request.target_industries,
+            snippets=snippets,
+            top_k=request.enrich_top_k,
+            min_score=request.min_relevance_score
+        )
+        logger.info("Ranked leads", extra={"leads": len(leads), "selected": len(selected)})
+        return selected
+    
     async def _discover_from_channel(
         self, 
         channel: str, 
         keywords: List[str], 
         industries: List[str],
-        max_leads: int
+        max_leads: int,
+        exclude: Optional[List[str]] = None
     ) -> List[CompanyLead]:
         """
         Discover companies from a specific channel using LLM-based research.
         In production, this would call Apify actors or channel-specific APIs.
-        """
-        
-        system_prompt = f"""You are a B2B Lead Discovery Agent.
-        Your task is to identify real companies that match the given criteria from the specified channel.
-        
-        Channel: {channel}
-        
-        For each company, provide:
-        - Company name (real, existing company)
-        - Website URL
-        - Industry
-        - Estimated company size (e.g., "1-10", "11-50", "51-200", "201-500", "500+")
-        - Location (City, Country)
-        - LinkedIn URL (if applicable)
-        
-        Return a JSON array of companies. Limit to {max_leads} companies.
-        Focus on companies that are likely to be found on {channel} and match the keywords/industries.
-        
-        Output format:
-        {{
-            "companies": [
-                {{
-                    "company_name": "Example Corp",
-                    "website": "https://example.com",
-                    "industry": "Technology",
-                    "company_size": "51-200",
-                    "location": "San Francisco, USA",
-                    "linkedin_url": "https://linkedin.com/company/example"
-                }}
-            ]
-        }}
+        Companies in `exclude` (already known) are asked to be left out; the
+        seen filter still drops any that come back.
         """
         
         user_prompt = f"""
+        Channel: {channel}
         Keywords: {', '.join(keywords[:5])}
         Industries: {', '.join(industries)}
         
+        Limit to {max_leads} companies.
         Find companies on {channel} that match these criteria.
         Provide real, existing companies that would realistically be found on this platform.
         """
+        if exclude:
+            user_prompt += f"""
+        Exclude these companies, we already know them: {', '.join(exclude)}
+        """
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            # Escalate when the cheaper model returns too few usable companies
+            data, model = await model_router.complete(
+                self.client,
+                "discover_companies",
+                DISCOVER_COMPANIES_PROMPT.messages(user_prompt),
+                json_validator(min_items={"companies": max(1, max_leads // 2)},
+                               item_fields={"companies": ("company_name", "website")}),
                 response_format={"type": "json_object"}
             )
-            
-            data = json.loads(response.choices[0].message.content)
             companies_data = data.get("companies", [])
             
             # Convert to CompanyLead objects
@@ -146,111 +409,103 @@ class LeadGenerationAgent:
             return leads
             
         except Exception as e:
-            print(f"Error discovering from {channel}: {e}")
+            logger.error("Channel discovery failed", extra={"channel": channel, "error": str(e)})
             return []
     
-    async def _enrich_company_lead(self, lead: CompanyLead, context: str) -> CompanyLead:
+    async def _enrich_company_lead(self, lead: CompanyLead, context: str,
+                                   groups: Optional[List[str]] = None) -> CompanyLead:
         """
         Enrich a company lead with contact information and key personnel.
         Uses actual website scraping for company data, combined with LLM for key contacts.
+        
+        Args:
+            lead: Lead to enrich in place
+            context: Company summary used to pick relevant contacts
+            groups: Field groups to refresh (see freshness.FIELD_GROUPS); None
+                enriches everything. Fetches not needed for these groups are skipped,
+                and freshly fetched empty values never overwrite existing data.
         """
+        fetches = plan_fetches(groups)
         
         # STEP 1: Scrape actual company data from website
         if lead.website:
-            print(f"🔍 Scraping {lead.website} for company information...")
+            logger.info("Scraping lead website", extra={"company": lead.company_name, "url": lead.website, "fetches": sorted(fetches)})
             
             # Get social media links from website
-            try:
-                social_links = await self.scraper.extract_social_media_links(lead.website)
-                lead.linkedin_url = social_links.get("linkedin_url") or lead.linkedin_url
-                lead.twitter_url = social_links.get("twitter_url")
-                lead.facebook_url = social_links.get("facebook_url")
-                lead.instagram_url = social_links.get("instagram_url")
-                lead.youtube_url = social_links.get("youtube_url")
-                lead.whatsapp_url = social_links.get("whatsapp_url")
-                lead.tiktok_url = social_links.get("tiktok_url")
-            except Exception as e:
-                print(f"  Social media extraction error: {e}")
+            if "social_links" in fetches:
+                try:
+                    with span("scrape.social_links"):
+                        social_links = await self.scraper.extract_social_media_links(lead.website)
+                    for field in FIELD_GROUPS["social"]:
+                        setattr(lead, field, social_links.get(field) or getattr(lead, field))
+                    stamp(lead, "social", "website_scrape")
+                except Exception as e:
+                    logger.warning("Social media extraction failed", extra={"url": lead.website, "error": str(e)})
+                    stamp(lead, "social", "website_scrape", failed=True)
             
             # Get contact info (address, phones, emails, branches) from website
-            try:
-                contact_info = await self.scraper.extract_contact_info(lead.website)
-                lead.main_address = contact_info.get("main_address")
-                lead.email_addresses = contact_info.get("email_addresses", [])
-                lead.phone_numbers = [{"number": p, "has_whatsapp": False} for p in contact_info.get("phone_numbers", [])]
-                lead.branches = contact_info.get("branches", [])
-                
-                # Set headquarters from location if not found
-                if not lead.headquarters and lead.location:
-                    lead.headquarters = lead.location
-            except Exception as e:
-                print(f"  Contact info extraction error: {e}")
-        
-        # STEP 2: Use LLM only for key contacts (personnel data not available via scraping)
-        system_prompt = f"""You are a B2B Contact Research Agent.
-        Given a company, identify key decision-makers and provide their contact information.
-        
-        Find 2-4 key contacts:
-        - Decision makers (C-level, VPs, Directors)
-        - Purchasing authorities
-        - Department heads relevant to: {context[:200]}
-        
-        For each person provide ALL available contact info:
-        - Full name
-        - Designation/Title
-        - Role category (Decision Maker, Purchasing Authority, Technical Lead, etc.)
-        - Professional email
-        - Phone number
-        - LinkedIn URL
-        - Twitter URL
-        - Facebook URL
-        - Instagram URL
-        - WhatsApp number
-        
-        Return JSON format:
-        {{
-            "key_contacts": [
-                {{
-                    "full_name": "John Doe",
-                    "designation": "CEO",
-                    "role_category": "Decision Maker",
-                    "email": "john.doe@company.com",
-                    "phone": "+1-xxx-xxx-xxxx",
-                    "linkedin_url": "https://linkedin.com/in/johndoe",
-                    "twitter_url": "https://twitter.com/johndoe",
-                    "facebook_url": null,
-                    "instagram_url": null,
-                    "whatsapp_number": "+1-xxx-xxx-xxxx"
-                }}
-            ]
-        }}
+            if "contact_info" in fetches:
+                try:
+                    with span("scrape.contact_info") as contact_span:
+                        contact_info = await self.scraper.extract_contact_info(lead.website)
+                        if contact_span:
+                            contact_span.set(branches=len(contact_info.get("branches", [])))
+                    lead.main_address = contact_info.get("main_address") or lead.main_address
+                    lead.email_addresses = contact_info.get("email_addresses") or lead.email_addresses
+                    lead.phone_numbers = [{"number": p, "has_whatsapp": False} for p in contact_info.get("phone_numbers", [])] or lead.phone_numbers
+                    lead.branches = contact_info.get("branches") or lead.branches
+                    
+                    # Set headquarters from location if not found
+                    if not lead.headquarters and lead.location:
+                        lead.headquarters = lead.location
+                    stamp(lead, "contact", "website_scrape")
+                    stamp(lead, "branches", "website_scrape")
+                except Exception as e:
+                    logger.warning("Contact info extraction failed", extra={"url": lead.website, "error": str(e)})
+                    stamp(lead, "contact", "website_scrape", failed=True)
+                    stamp(lead, "branches", "website_scrape", failed=True)
+            
+            if "website_scrape" not in lead.data_sources and fetches & {"social_links", "contact_info"}:
+                lead.data_sources.append("website_scrape")
+        else:
+            # Nothing to scrape; record the check so re-enrichment does not pick
+            # these groups again on every run
+            for group in ("social", "contact", "branches"):
+                if groups is None or group in groups:
+                    stamp(lead, group, "no_website")
         
-        Be factual. Only include verifiable contact information found in public sources.
-        """
+        if "llm_contacts" not in fetches:
+            # Key contacts are still fresh; only scraped fields were refreshed
+            if lead.enrichment_status != "failed":
+                lead.enrichment_status = "enriched"
+            return lead
         
+        # STEP 2: Use LLM only for key contacts (personnel data not available via scraping)
         user_prompt = f"""
         Company: {lead.company_name}
         Website: {lead.website}
         Industry: {lead.industry}
         Location: {lead.location}
+        Relevant departments: {context[:200]}
         
         Find key decision-makers and their contact information.
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            # Contact formatting is easy; escalate only when names or titles are missing
+            enrichment_data, model = await model_router.complete(
+                self.client,
+                "key_contacts",
+                KEY_CONTACTS_PROMPT.messages(user_prompt),
+                # An empty list is an honest "no public contacts"; a bigger model would only invent some
+                json_validator(min_items={"key_contacts": 0},
+                               item_fields={"key_contacts": ("full_name", "designation")}),
                 response_format={"type": "json_object"}
             )
             
-            enrichment_data = json.loads(response.choices[0].message.content)
-            
             # Add key contacts (only thing from LLM now - company data comes from scraper)
             contacts_data = enrichment_data.get("key_contacts", [])
+            key_contacts = []
             for contact_info in contacts_data:
                 contact = PersonContact(
                     full_name=contact_info.get("full_name", "Unknown"),
@@ -265,18 +520,22 @@ class LeadGenerationAgent:
                     whatsapp_number=contact_info.get("whatsapp_number"),
                     data_source="llm_research"
                 )
-                lead.key_contacts.append(contact)
+                key_contacts.append(contact)
+            lead.key_contacts = key_contacts or lead.key_contacts
+            stamp(lead, "key_contacts", "llm_contacts")
             
             lead.enrichment_status = "enriched"
             lead.confidence_score = 0.8 if lead.website else 0.6
-            lead.data_sources.append("website_scrape")
-            lead.data_sources.append("llm_contacts")
+            if "llm_contacts" not in lead.data_sources:
+                lead.data_sources.append("llm_contacts")
             
-            print(f"✓ Enriched {lead.company_name}: {len(lead.branches)} branches, {len(lead.key_contacts)} contacts")
+            logger.info("Enriched lead", extra={"company": lead.company_name, "branches": len(lead.branches), "contacts": len(lead.key_contacts), "model": model})
             
         except Exception as e:
-            print(f"Error enriching {lead.company_name}: {e}")
-            lead.enrichment_status = "failed"
-            lead.confidence_score = 0.3
+            logger.error("Lead enrichment failed", extra={"company": lead.company_name, "error": str(e)})
+            stamp(lead, "key_contacts", "llm_contacts", failed=True)
+            if not lead.key_contacts:
+                lead.enrichment_status = "failed"
+                lead.confidence_score = 0.3
         
         return lead
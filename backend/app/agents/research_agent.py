@@ -1,89 +1,143 @@
 import os
-import json
+import re
+import logging
+from typing import AsyncContextManager, Callable, Optional
 from openai import AsyncOpenAI
 from app.models.schemas import CompanyInput, ResearchResult
 from app.services.web_scraper import WebScraper
+from app.services.content_budget import ContentBudgeter, relevance_terms
+from app.services.replay import replay_store
+from app.services.metrics import instrument_openai
+from app.services.model_router import json_validator, model_router
+from app.services.prompts import PromptTemplate
+from app.services.memo_cache import canonical_key
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Token budgets for scraped content in the analysis prompt
+WEBSITE_TOKEN_BUDGET = int(os.getenv("RESEARCH_WEBSITE_TOKEN_BUDGET", "2000"))
+SOCIAL_TOKEN_BUDGET = int(os.getenv("RESEARCH_SOCIAL_TOKEN_BUDGET", "1500"))
+# Raw characters fetched per page before budgeting
+RAW_CONTENT_CHARS = 40000
+
+# STEP 3 prompt: enhanced system prompt for comprehensive analysis
+RESEARCH_PROMPT = PromptTemplate("research", """You are an Expert Market Research Agent. 
+    Analyze the provided company website content AND social media profiles.
+    
+    Extract the following fields in JSON format:
+    - company_summary: A comprehensive summary based on website AND social media presence. 
+      Include insights from their social media activity, recent posts, engagement style, brand voice, and company culture.
+    - icp_profile: A list of Ideal Customer Profiles - types of businesses/organizations that would BUY from this company 
+    - target_industries: A list of industries where their CUSTOMERS operate (NOT the company's own industry).
+    - target_companies: A list of SPECIFIC REAL COMPANY NAMES that are POTENTIAL CUSTOMERS - businesses that could 
+      BUY this company's products/services. These should be PROSPECTS, not competitors!
+      For example: If analyzing a countertop supplier, list construction companies, design firms, builders, 
+      renovation contractors - NOT other countertop brands like Caesarstone or Cambria.
+      Provide 5-10 real company names that match the ICP profile.
+    - usp: Their Unique Selling Proposition (consider both website and social media messaging).
+    - pain_points: A list of customer pain points they address.
+    
+    CRITICAL: target_companies must be POTENTIAL BUYERS/CUSTOMERS, not competitors or similar businesses!
+    
+    Use insights from social media to enrich your understanding of:
+    - Company culture, values, and brand personality
+    - Recent achievements, announcements, and milestones
+    - Customer engagement, testimonials, and community feedback
+    - Product updates, features, and innovations
+    - Industry thought leadership and expertise
+    - Team highlights and company growth
+    
+    Be strictly factual based on the content provided.
+    """)
+
+# Content budgeting favours blocks about what the prompt asks for: the first
+# line of each bullet (the analysis fields and the insights to look for)
+ANALYSIS_TERMS = relevance_terms(*re.findall(r'^- (.*)$', RESEARCH_PROMPT.instructions, re.MULTILINE))
 
 class ResearchAgent:
     def __init__(self):
         self.scraper = WebScraper()
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = instrument_openai(
+            replay_store.wrap_openai(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))),
+            agent="research",
+        )
+        self.budgeter = ContentBudgeter(model=model_router.top_model("research"), relevance_terms=ANALYSIS_TERMS)
+        # Identical concurrent analyses (retries, teammates on the same prospect) share one run
+        self._inflight = SingleFlight("analyze")
+
+    async def analyze(self, input_data: CompanyInput,
+                      admit: Optional[Callable[[], AsyncContextManager]] = None) -> ResearchResult:
+        """
+        Analyze a company; identical concurrent calls share one run.
+
+        Args:
+            admit: Admission for the shared run (e.g. heavy_lane.admit), so
+                   callers that join it do not take a slot each
+        """
+        key = canonical_key("analyze", "inflight", input_data.model_dump())
+        return await self._inflight.do(key, lambda: self._analyze(input_data), admit=admit)
 
-    async def analyze(self, input_data: CompanyInput) -> ResearchResult:
+    async def _analyze(self, input_data: CompanyInput) -> ResearchResult:
         url = input_data.website
         
         # If URL is missing, search for it
         if not url:
-            print(f"Searching for URL for {input_data.company_name}...")
+            logger.info("Searching for company URL", extra={"company": input_data.company_name})
             results = self.scraper.search(f"{input_data.company_name} official site", max_results=1)
             if results:
                 url = results[0]['href']
-                print(f"Found URL: {url}")
+                logger.info("Found company URL", extra={"company": input_data.company_name, "url": url})
         
         content = ""
         social_media_links = {}
         contact_info = {}
         
         if url:
-            print(f"Scraping {url}...")
-            content = await self.scraper.get_content(url)
+            logger.info("Scraping website", extra={"url": url})
+            content = await self.scraper.get_content(url, max_chars=RAW_CONTENT_CHARS)
             
             # STEP 1: Extract social media links directly from HTML
-            print(f"Extracting social media links from {url}...")
+            logger.debug("Extracting social media links", extra={"url": url})
             social_media_links = await self.scraper.extract_social_media_links(url)
             
             # STEP 1.5: Extract contact info (addresses, phones, emails, branches)
-            print(f"Extracting contact information from {url}...")
+            logger.debug("Extracting contact information", extra={"url": url})
             contact_info = await self.scraper.extract_contact_info(url)
         
         if not content:
-            print("Content fetch failed or empty.")
+            logger.warning("Content fetch failed or empty", extra={"url": url})
         
         # STEP 2: Scrape content from social media profiles for richer analysis
         social_content = {}
-        print(f"Found social media accounts: {social_media_links}")
+        logger.info("Found social media accounts", extra={"platforms": [p for p, u in social_media_links.items() if u]})
         
         for platform, social_url in social_media_links.items():
             if social_url:
                 platform_name = platform.replace('_url', '').title()
-                print(f"Scraping {platform_name} profile: {social_url}")
+                logger.debug("Scraping social profile", extra={"platform": platform_name, "url": social_url})
                 try:
-                    social_text = await self.scraper.get_content(social_url)
+                    social_text = await self.scraper.get_content(social_url, max_chars=RAW_CONTENT_CHARS)
                     if social_text:
-                        social_content[platform_name] = social_text[:2000]  # Limit per platform
-                        print(f"✓ Scraped {len(social_text)} chars from {platform_name}")
+                        social_content[platform_name] = social_text
+                        logger.debug("Scraped social profile", extra={"platform": platform_name, "chars": len(social_text)})
                 except Exception as e:
-                    print(f"Error scraping {platform_name}: {e}")
-        
-        # STEP 3: Enhanced system prompt for comprehensive analysis
-        system_prompt = """You are an Expert Market Research Agent. 
-        Analyze the provided company website content AND social media profiles.
-        
-        Extract the following fields in JSON format:
-        - company_summary: A comprehensive summary based on website AND social media presence. 
-          Include insights from their social media activity, recent posts, engagement style, brand voice, and company culture.
-        - icp_profile: A list of Ideal Customer Profiles - types of businesses/organizations that would BUY from this company 
-        - target_industries: A list of industries where their CUSTOMERS operate (NOT the company's own industry).
-        - target_companies: A list of SPECIFIC REAL COMPANY NAMES that are POTENTIAL CUSTOMERS - businesses that could 
-          BUY this company's products/services. These should be PROSPECTS, not competitors!
-          For example: If analyzing a countertop supplier, list construction companies, design firms, builders, 
-          renovation contractors - NOT other countertop brands like Caesarstone or Cambria.
-          Provide 5-10 real company names that match the ICP profile.
-        - usp: Their Unique Selling Proposition (consider both website and social media messaging).
-        - pain_points: A list of customer pain points they address.
-        
-        CRITICAL: target_companies must be POTENTIAL BUYERS/CUSTOMERS, not competitors or similar businesses!
-        
-        Use insights from social media to enrich your understanding of:
-        - Company culture, values, and brand personality
-        - Recent achievements, announcements, and milestones
-        - Customer engagement, testimonials, and community feedback
-        - Product updates, features, and innovations
-        - Industry thought leadership and expertise
-        - Team highlights and company growth
-        
-        Be strictly factual based on the content provided.
-        """
+                    logger.warning("Social profile scrape failed", extra={"platform": platform_name, "error": str(e)})
+        
+        # STEP 2.5: Keep only the most informative blocks within the token budgets.
+        # Website blocks are selected first so social profiles repeating the same
+        # text are deduplicated against them.
+        kept_blocks = []
+        terms = self.budgeter.relevance_terms | relevance_terms(
+            input_data.company_name, input_data.industry, input_data.existing_customers)
+        has_content = bool(content)
+        raw_tokens = self.budgeter.count_tokens(content) + sum(
+            self.budgeter.count_tokens(t) for t in social_content.values())
+        content = self.budgeter.select(content, WEBSITE_TOKEN_BUDGET, kept_blocks, terms)
+        social_content = self.budgeter.select_sources(social_content, SOCIAL_TOKEN_BUDGET, kept_blocks, terms)
+        budgeted_tokens = self.budgeter.count_tokens(content) + sum(
+            self.budgeter.count_tokens(t) for t in social_content.values())
+        logger.info("Budgeted scraped content", extra={"raw_tokens": raw_tokens, "budgeted_tokens": budgeted_tokens})
         
         # Build comprehensive user prompt with website + social media content
         user_prompt = f"""
@@ -100,7 +154,7 @@ class ResearchAgent:
         
         
         === WEBSITE CONTENT ===
-        {content[:5000]}
+        {content}
         
         === SOCIAL MEDIA INSIGHTS ===
         """
@@ -113,17 +167,14 @@ class ResearchAgent:
             user_prompt += "\nNo social media content available.\n"
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            data, model = await model_router.complete(
+                self.client,
+                "research",
+                RESEARCH_PROMPT.messages(user_prompt),
+                json_validator(required=("company_summary", "icp_profile", "target_industries")),
                 response_format={ "type": "json_object" }
             )
             
-            data = json.loads(response.choices[0].message.content)
-            
             return ResearchResult(
                 company_name=input_data.company_name,
                 company_summary=data.get("company_summary", "Analysis unavailable."),
@@ -133,7 +184,7 @@ class ResearchAgent:
                 usp=data.get("usp", ""),
                 pain_points=data.get("pain_points", []),
                 sources=[url] if url else ["No source found"],
-                confidence_score=0.85 if content else 0.4,
+                confidence_score=0.85 if has_content else 0.4,
                 # Contact information (auto-extracted from website)
                 main_address=contact_info.get("main_address"),
                 phone_numbers=contact_info.get("phone_numbers", []),
@@ -154,7 +205,7 @@ class ResearchAgent:
                 tripadvisor_url=social_media_links.get("tripadvisor_url")
             )
         except Exception as e:
-            print(f"Error in LLM analysis: {e}")
+            logger.error("LLM analysis failed", extra={"company": input_data.company_name, "error": str(e)})
             return ResearchResult(
                 company_name=input_data.company_name,
                 company_summary="Error during analysis.",
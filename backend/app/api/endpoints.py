@@ -1,14 +1,26 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from app.models.schemas import (
     CompanyInput, ResearchResult, DiscoveryInput, DiscoveryResult, 
     KeywordProposal, StrategyInput, StrategyResult,
-    LeadGenerationRequest, LeadGenerationResult,
+    LeadGenerationRequest, LeadGenerationResult, LeadQueryResult,
+    ReEnrichRequest, ReEnrichResult, ExclusionImport, ExclusionImportResult,
     CompanyLookupRequest, CompanyLookupResponse
 )
 from app.agents.research_agent import ResearchAgent
 from app.agents.discovery_agent import DiscoveryAgent
 from app.agents.lead_generation_agent import LeadGenerationAgent
+from app.services.admission import AdmissionRejected, heavy_lane, interactive_lane
+from app.services.cancellation import cancel_on_disconnect
 from app.services.company_lookup import company_lookup_service
+from app.services.profiler import PROFILE_KINDS, is_authorized, load_profile
+from app.services.responses import model_response, ndjson_response
+from app.services.result_store import result_store
+from app.services.lead_store import lead_store
+from app.services.seen_filter import seen_filter
+from app.services.lead_export import DEFAULT_EXPLODE, EXPORT_FORMATS, export_leads, parse_columns
 
 router = APIRouter()
 
@@ -24,47 +36,71 @@ async def lookup_company(input_data: CompanyLookupRequest):
     Auto-fetch company URL and industry based on company name.
     Uses DuckDuckGo search + AI to find the official website and industry.
     """
-    try:
-        result = await company_lookup_service.lookup_company(input_data.company_name)
-        return CompanyLookupResponse(
-            website=result.get("website"),
-            industry=result.get("industry"),
-            error=result.get("error")
-        )
-    except Exception as e:
-        return CompanyLookupResponse(
-            website=None,
-            industry=None,
-            error=str(e)
-        )
+    async with interactive_lane.admit():
+        try:
+            result = await company_lookup_service.lookup_company(input_data.company_name)
+            return CompanyLookupResponse(
+                website=result.get("website"),
+                industry=result.get("industry"),
+                error=result.get("error")
+            )
+        except Exception as e:
+            return CompanyLookupResponse(
+                website=None,
+                industry=None,
+                error=str(e)
+            )
 
 
 @router.post("/analyze", response_model=ResearchResult)
-async def analyze_company(input_data: CompanyInput):
-    try:
-        result = await research_agent.analyze(input_data)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def analyze_company(input_data: CompanyInput, request: Request):
+    # Identical in-flight analyses are coalesced; only the shared run takes a heavy slot
+    async with cancel_on_disconnect(request):
+        try:
+            result = await research_agent.analyze(input_data, admit=heavy_lane.admit)
+            return model_response(result)
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/keywords", response_model=KeywordProposal)
 async def generate_keywords(input_data: DiscoveryInput):
-    try:
-        result = await discovery_agent.propose_keywords(input_data)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with interactive_lane.admit():
+        try:
+            result = await discovery_agent.propose_keywords(input_data)
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/keywords/stream")
+async def stream_keywords(input_data: DiscoveryInput):
+    """
+    Streaming variant of /keywords as newline-delimited JSON: one
+    {"event": "category", "data": KeywordCategory} line per category as it is
+    generated, then {"event": "result", "data": KeywordProposal}.
+    """
+    return ndjson_response(await interactive_lane.admit_stream(discovery_agent.stream_keywords(input_data)))
 
 @router.post("/strategy", response_model=StrategyResult)
 async def generate_strategy(input_data: StrategyInput):
-    try:
-        result = await discovery_agent.generate_strategy(input_data)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with interactive_lane.admit():
+        try:
+            result = await discovery_agent.generate_strategy(input_data)
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/strategy/stream")
+async def stream_strategy(input_data: StrategyInput):
+    """
+    Streaming variant of /strategy: {"event": "channel", ...} lines as each
+    channel is generated, then {"event": "result", "data": StrategyResult}.
+    """
+    return ndjson_response(await interactive_lane.admit_stream(discovery_agent.stream_strategy(input_data)))
 
 @router.post("/generate-leads", response_model=LeadGenerationResult)
-async def generate_leads(input_data: LeadGenerationRequest):
+async def generate_leads(input_data: LeadGenerationRequest, request: Request, compact: bool = False):
     """
     Generate and enrich leads from selected channels.
     This endpoint orchestrates the full lead generation workflow:
@@ -72,10 +108,98 @@ async def generate_leads(input_data: LeadGenerationRequest):
     2. Enrich each company with contact information
     3. Identify key decision makers and contacts
     4. Return structured, tabular data
+    
+    Pass ?compact=true to omit null fields and empty lists from the response.
+    With deadline_seconds set, leads not enriched by then are returned with
+    enrichment_status "pending". Work stops when the client disconnects.
     """
+    async with cancel_on_disconnect(request), heavy_lane.admit():
+        try:
+            result = await lead_gen_agent.generate_leads(input_data)
+            return model_response(result, compact=compact)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@router.post("/leads/re-enrich", response_model=ReEnrichResult)
+async def re_enrich_leads(input_data: ReEnrichRequest, request: Request):
+    """
+    Refresh stored leads, fetching only the field groups that are missing or
+    stale. Suitable for a nightly job over the whole lead store.
+    """
+    async with cancel_on_disconnect(request), heavy_lane.admit():
+        try:
+            return model_response(await lead_gen_agent.re_enrich(input_data))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/leads", response_model=LeadQueryResult)
+async def query_leads(q: Optional[str] = None, industry: Optional[str] = None, location: Optional[str] = None,
+                      channel: Optional[str] = None, domain: Optional[str] = None,
+                      min_confidence: Optional[float] = None, discovered_after: Optional[str] = None,
+                      sort: str = "discovered_at", limit: int = 50, cursor: Optional[str] = None):
+    """
+    Browse every lead generated so far without re-running generation.
+    Filters combine with AND; q is a full-text search over company name and
+    homepage summary. Follow next_cursor to page through results.
+    """
+    try:
+        page = await asyncio.to_thread(
+            lead_store.query, q=q, industry=industry, location=location, channel=channel, domain=domain,
+            min_confidence=min_confidence, discovered_after=discovered_after, sort=sort, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(LeadQueryResult.model_validate(page))
+
+@router.post("/exclusions", response_model=ExclusionImportResult)
+async def import_exclusions(input_data: ExclusionImport):
+    """
+    Add companies that lead generation should never return, e.g. accounts
+    already in the CRM. Matching is by domain and by company name with
+    legal suffixes ignored.
+    """
+    entries = [(domain, None, None) for domain in input_data.domains]
+    entries += [(None, name, None) for name in input_data.company_names]
     try:
-        result = await lead_gen_agent.generate_leads(input_data)
-        return result
+        added = await asyncio.to_thread(seen_filter.add, entries, input_data.source)
+        return ExclusionImportResult(added=added, total=await asyncio.to_thread(seen_filter.count))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/results/{result_id}/export")
+async def export_result(result_id: str, format: str = "csv", columns: Optional[str] = None,
+                        explode: Optional[str] = DEFAULT_EXPLODE):
+    """
+    Stream a stored lead generation result as CSV, XLSX or Parquet.
+    
+    - columns: comma-separated "Header=path" entries, e.g.
+      "Company=company_name,Phones=phone_numbers[].number,Contact=key_contacts.full_name"
+    - explode: list field to emit one row per item (default key_contacts); empty for one row per lead
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if not result_store.exists(result_id):
+        raise HTTPException(status_code=404, detail="Result not found")
+    body = export_leads(result_store.iter_leads(result_id), format, parse_columns(columns), explode or None)
+    filename = f"leads_{result_id[:8]}.{format}"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.get("/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, kind: Optional[str] = None,
+                      x_profile_token: Optional[str] = Header(default=None)):
+    """
+    Fetch a request profile recorded with the X-Profile header.
+    Without `kind` returns metadata; with kind=wall or kind=cpu returns
+    collapsed stacks for flamegraph.pl or speedscope.
+    """
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling not authorized")
+    if kind is not None and kind not in PROFILE_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(PROFILE_KINDS)}")
+    profile = load_profile(profile_id, kind)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile if kind is None else PlainTextResponse(profile)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class CompanyInput(BaseModel):
     company_name: str
@@ -56,18 +56,24 @@ class DiscoveryInput(BaseModel):
     icp_profile: List[str]
     target_industries: List[str]
     company_summary: str
+    regenerate: bool = Field(default=False, description="Bypass the cache and generate fresh keywords")
 
 class KeywordCategory(BaseModel):
     category_name: str
     keywords: List[str]
+    aliases: Dict[str, List[str]] = Field(default={}, description="Canonical keyword -> collapsed near-duplicates")
 
 class KeywordProposal(BaseModel):
     grouped_keywords: List[KeywordCategory]
+    total_keywords: int = Field(default=0, description="Keywords proposed before deduplication")
+    unique_keywords: int = Field(default=0, description="Canonical keywords after deduplication")
+    dedup_ratio: float = Field(default=0.0, description="Share of proposed keywords collapsed as duplicates")
 
 class StrategyInput(BaseModel):
     selected_keywords: List[str]
     company_summary: str
     target_industries: List[str]
+    regenerate: bool = Field(default=False, description="Bypass the cache and generate a fresh strategy")
 
 class StrategyResult(BaseModel):
     channels: List[dict] # name, relevance_score
@@ -93,7 +99,13 @@ class LeadGenerationRequest(BaseModel):
     selected_keywords: List[str] = Field(description="Keywords to search for")
     target_industries: List[str] = Field(description="Target industries")
     company_summary: str = Field(description="Company summary for context")
+    icp_profile: List[str] = Field(default=[], description="Ideal Customer Profiles used to rank leads")
     max_leads_per_channel: int = Field(default=50, description="Maximum leads to generate per channel")
+    enrich_top_k: Optional[int] = Field(default=None, description="Only enrich the K most relevant leads")
+    min_relevance_score: Optional[float] = Field(default=None, description="Only enrich leads scoring at least this (0.0 to 1.0)")
+    trace: bool = Field(default=False, description="Return a timed span timeline of the run")
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, description="Return the leads enriched by then; the rest stay pending")
+    skip_seen: bool = Field(default=False, description="Skip companies already enriched or on the exclusion list")
 
 class PersonContact(BaseModel):
     full_name: str
@@ -109,12 +121,18 @@ class PersonContact(BaseModel):
     data_source: str = Field(default="website_scrape", description="Source of the data")
 
 
+class FieldProvenance(BaseModel):
+    source: str = Field(description="e.g. website_scrape, llm_contacts")
+    fetched_at: str = Field(description="ISO timestamp of the fetch")
+    status: str = Field(default="ok", description="ok, empty or failed")
+
 class CompanyLead(BaseModel):
     company_name: str
     website: Optional[str] = None
     industry: Optional[str] = None
     company_size: Optional[str] = None
     location: Optional[str] = None
+    summary: Optional[str] = Field(default=None, description="Homepage title and description")
     
     # Address Information
     main_address: Optional[str] = None
@@ -141,10 +159,50 @@ class CompanyLead(BaseModel):
     channel_source: str = Field(description="Which channel this lead came from")
     keywords_matched: List[str] = []
     confidence_score: float = Field(default=0.0)
-    enrichment_status: str = Field(default="pending", description="pending, enriched, failed")
+    relevance_score: Optional[float] = Field(default=None, description="Local ICP relevance score 0.0 to 1.0")
+    enrichment_status: str = Field(default="pending", description="pending, enriched, failed, skipped")
     data_sources: List[str] = []
     discovered_at: str = Field(description="ISO timestamp")
-
+    field_provenance: Dict[str, FieldProvenance] = Field(
+        default={}, description="Source and freshness per field group: social, contact, branches, key_contacts"
+    )
+
+
+class ReEnrichRequest(BaseModel):
+    domains: Optional[List[str]] = Field(default=None, description="Stored leads to refresh; omit to scan the whole lead store")
+    company_summary: str = Field(default="", description="Company summary for contact research context")
+    force_fields: List[str] = Field(default=[], description="Groups to refresh regardless of age: social, contact, branches, key_contacts")
+    limit: int = Field(default=100, description="Maximum leads to refresh in this run")
+
+class ReEnrichResult(BaseModel):
+    refreshed: List[CompanyLead]
+    planned: Dict[str, List[str]] = Field(description="{domain: field groups refreshed}")
+    fetches: Dict[str, int] = Field(description="Fetches performed: social_links, contact_info, llm_contacts")
+    fetches_saved: int = Field(description="Fetches a full re-enrichment would have made on top of these")
+    skipped_fresh: int = Field(description="Leads examined that were already fresh")
+
+class ExclusionImport(BaseModel):
+    domains: List[str] = Field(default=[], description="Websites or domains, e.g. from a CRM export")
+    company_names: List[str] = Field(default=[], description="Company names; legal suffixes like Inc or GmbH are ignored")
+    source: str = Field(default="import", description="Where the list came from, e.g. crm")
+
+class ExclusionImportResult(BaseModel):
+    added: int = Field(description="Domains and names that were not excluded yet")
+    total: int = Field(description="Entries in the seen-set after the import")
+
+class LeadQueryResult(BaseModel):
+    leads: List[CompanyLead]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as cursor to fetch the next page")
+
+
+class TraceSpan(BaseModel):
+    span_id: int
+    parent_id: Optional[int] = None
+    name: str = Field(description="Stage, e.g. discover_channel, enrich_lead, http.fetch")
+    start_ms: float = Field(description="Offset from the start of the run")
+    duration_ms: float
+    status: str = Field(description="ok or error")
+    attributes: Dict[str, Any] = {}
 
 class LeadGenerationResult(BaseModel):
     total_leads: int
@@ -153,4 +211,9 @@ class LeadGenerationResult(BaseModel):
     generation_summary: str
     started_at: str
     completed_at: str
+    pending_leads: int = Field(default=0, description="Leads selected for enrichment but not enriched before the deadline")
+    skipped_seen: int = Field(default=0, description="Discovered companies skipped as already seen or excluded")
+    result_id: Optional[str] = Field(default=None, description="Id for exporting this result later")
+    trace_id: Optional[str] = None
+    trace: Optional[List[TraceSpan]] = Field(default=None, description="Timed spans when tracing was requested")
 
@@ -0,0 +1,148 @@
+"""
+Admission Control
+Per-lane concurrency budgets with bounded wait queues, so bursts are shed with 429 instead of slowing everyone down
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from app.services.metrics import observe_admission, record_admission_rejection, set_admission_load
+
+logger = logging.getLogger(__name__)
+
+# Estimated job time before any job has finished, used for Retry-After
+INITIAL_JOB_SECONDS = 10.0
+MAX_RETRY_AFTER_SECONDS = 120
+
+
+class AdmissionRejected(Exception):
+    """The lane is saturated; the caller should retry after `retry_after` seconds."""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"{lane} lane is at capacity ({reason})")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLane:
+    """
+    At most `max_concurrent` jobs run at once. Further jobs wait in FIFO
+    order, up to `max_queue` of them and for at most `max_wait` seconds;
+    anything beyond that is rejected immediately. A finishing job hands its
+    slot straight to the oldest waiter, so queued jobs cannot be overtaken
+    by new arrivals.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of job duration, for Retry-After estimates
+        self._job_seconds = INITIAL_JOB_SECONDS
+
+    @classmethod
+    def from_env(cls, name: str, max_concurrent: int, max_queue: int, max_wait: float) -> "AdmissionLane":
+        prefix = f"{name.upper()}_LANE"
+        return cls(
+            name,
+            max_concurrent=int(os.getenv(f"{prefix}_MAX_CONCURRENT", str(max_concurrent))),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", str(max_queue))),
+            max_wait=float(os.getenv(f"{prefix}_MAX_WAIT_SECONDS", str(max_wait))),
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: queued work ahead, spread over the slots."""
+        jobs_ahead = len(self._waiters) + 1
+        estimate = self._job_seconds * jobs_ahead / max(1, self.max_concurrent)
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(estimate)))
+
+    def _reject(self, reason: str):
+        record_admission_rejection(self.name, reason)
+        logger.warning("Request rejected by admission control", extra={
+            "lane": self.name, "reason": reason, "active": self.active, "queued": len(self._waiters)
+        })
+        raise AdmissionRejected(self.name, reason, self.retry_after())
+
+    async def _acquire(self):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        set_admission_load(self.name, self.active, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            set_admission_load(self.name, self.active, len(self._waiters))
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("wait_timeout")
+            raise
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot over; active stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold one of the lane's slots for the duration of the block."""
+        queued_at = time.perf_counter()
+        await self._acquire()
+        started = time.perf_counter()
+        observe_admission(self.name, started - queued_at)
+        set_admission_load(self.name, self.active, len(self._waiters))
+        try:
+            yield
+        finally:
+            self._job_seconds = 0.8 * self._job_seconds + 0.2 * (time.perf_counter() - started)
+            self._release()
+            set_admission_load(self.name, self.active, len(self._waiters))
+
+    async def _stream(self, events: AsyncIterator) -> AsyncIterator:
+        async with self.admit():
+            # Marks admission; consumed by admit_stream before the response starts
+            yield None
+            async for event in events:
+                yield event
+
+    async def admit_stream(self, events: AsyncIterator) -> AsyncIterator:
+        """
+        Wrap a streamed response's events so they hold a slot until the last
+        one is sent, the stream fails, or the client stops reading. The slot
+        is acquired here, before the response starts, so a saturated lane
+        still answers 429 instead of a broken 200 stream.
+        """
+        stream = self._stream(events)
+        await stream.__anext__()
+        return stream
+
+
+# Lead generation, re-enrichment and company analysis fan out into many fetches and LLM calls
+heavy_lane = AdmissionLane.from_env("heavy", max_concurrent=4, max_queue=16, max_wait=30.0)
+# Single-LLM-call endpoints get their own budget so they never queue behind heavy jobs
+interactive_lane = AdmissionLane.from_env("interactive", max_concurrent=32, max_queue=64, max_wait=10.0)
+
+LANES: Dict[str, AdmissionLane] = {lane.name: lane for lane in (heavy_lane, interactive_lane)}
@@ -0,0 +1,83 @@
+"""
+Cancellation
+Stops a request's in-flight work when its client disconnects, and bounds work by a per-request deadline
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Optional, TypeVar
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready."""
+
+
+@asynccontextmanager
+async def cancel_on_disconnect(request: Request):
+    """
+    Cancel the current task as soon as the client disconnects, so the
+    fetches and LLM calls it awaits are cancelled too (work shared with other
+    requests through SingleFlight keeps running for them). Raises
+    ClientDisconnected instead of CancelledError so the request finishes
+    cleanly. Admission slots and other context managers entered inside the
+    block are released on the way out.
+    """
+    task = asyncio.current_task()
+    disconnected = False
+
+    async def watch():
+        nonlocal disconnected
+        # The body has already been read, so the next message is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        disconnected = True
+        task.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield
+    except asyncio.CancelledError:
+        if not disconnected:
+            raise
+        task.uncancel()
+        logger.info("Client disconnected, cancelled request work", extra={"path": request.url.path})
+        raise ClientDisconnected(request.url.path)
+    finally:
+        watcher.cancel()
+
+
+class Deadline:
+    """
+    A fixed point in time for a request's remaining work. `None` seconds
+    means no deadline.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self.expires_at = None if seconds is None else loop.time() + seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._loop.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    async def run(self, work: Awaitable[T]) -> T:
+        """
+        Await `work`, cancelling it when the deadline passes.
+
+        Raises:
+            asyncio.TimeoutError: when the deadline passed first
+        """
+        return await asyncio.wait_for(work, self.remaining())
@@ -4,22 +4,52 @@ Fetches company URL and industry using DuckDuckGo search and OpenAI
 """
 
 import os
-import re
-import json
+import time
 import asyncio
+import logging
 from typing import Optional
 from openai import AsyncOpenAI
 from duckduckgo_search import DDGS
 from dotenv import load_dotenv
+from app.services.replay import replay_store
+from app.services.metrics import instrument_openai, observe_search
+from app.services.model_router import json_validator, model_router
+from app.services.prompts import PromptTemplate
+from app.services.singleflight import SingleFlight
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Static instructions first so the prefix is cacheable; the company and its
+# search results are appended in the user message
+LOOKUP_PROMPT = PromptTemplate("company_lookup", """You are a helpful assistant that extracts company information from search results. Always respond with valid JSON only.
+
+You are a research assistant. Based on the search results for the company named at the end, extract:
+1. The official website URL of the company (not a news article, not LinkedIn, not a directory listing - the company's actual official website)
+2. The industry/sector the company operates in
+
+Important Rules:
+- For the website, find the company's PRIMARY official domain (e.g., company.com, not linkedin.com/company/...)
+- If the company name appears in the domain, that's likely the official site
+- For industry, be specific but concise (e.g., "Countertops & Stone Surfaces", "SaaS", "E-commerce", "Construction")
+- If you cannot determine with confidence, return null
+
+Respond in this exact JSON format only, no other text:
+{"website": "https://example.com" or null, "industry": "Industry Name" or null}
+""")
+
 
 class CompanyLookupService:
     """Service to auto-fetch company URL and industry from search engines."""
 
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = instrument_openai(
+            replay_store.wrap_openai(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))),
+            agent="company_lookup",
+        )
+        # Concurrent lookups of the same name share one search + LLM call
+        self._inflight = SingleFlight("company_lookup")
 
     async def lookup_company(self, company_name: str) -> dict:
         """
@@ -33,7 +63,10 @@ class CompanyLookupService:
         """
         if not company_name or len(company_name.strip()) < 2:
             return {"website": None, "industry": None, "error": "Company name too short"}
+        key = " ".join(company_name.lower().split())
+        return await self._inflight.do(key, lambda: self._lookup_company(company_name))
 
+    async def _lookup_company(self, company_name: str) -> dict:
         try:
             # Step 1: Search for the company using DuckDuckGo (run in thread to avoid blocking)
             search_results = await self._search_company(company_name)
@@ -47,7 +80,7 @@ class CompanyLookupService:
             return result
 
         except Exception as e:
-            print(f"Company lookup error: {e}")
+            logger.error("Company lookup failed", extra={"company": company_name, "error": str(e)})
             return {"website": None, "industry": None, "error": str(e)}
 
     async def _search_company(self, company_name: str) -> list:
@@ -55,30 +88,33 @@ class CompanyLookupService:
         
         def _sync_search():
             """Synchronous search function to run in thread."""
+            start = time.perf_counter()
             try:
                 with DDGS() as ddgs:
                     # Search for company official website
-                    results = list(ddgs.text(
-                        f"{company_name} official website company",
-                        max_results=8
-                    ))
+                    website_query = f"{company_name} official website company"
+                    results = replay_store.search(
+                        website_query, 8, lambda: list(ddgs.text(website_query, max_results=8))
+                    )
                     
                     # Also search for company industry/about
-                    industry_results = list(ddgs.text(
-                        f"{company_name} company industry about what does",
-                        max_results=5
-                    ))
+                    industry_query = f"{company_name} company industry about what does"
+                    industry_results = replay_store.search(
+                        industry_query, 5, lambda: list(ddgs.text(industry_query, max_results=5))
+                    )
                     
+                    observe_search("duckduckgo", "ok", time.perf_counter() - start)
                     return results + industry_results
             except Exception as e:
-                print(f"DuckDuckGo search error: {e}")
+                observe_search("duckduckgo", "error", time.perf_counter() - start)
+                logger.warning("DuckDuckGo search failed", extra={"company": company_name, "error": str(e)})
                 return []
         
         # Run synchronous DDGS in a thread to avoid blocking the event loop
         try:
             return await asyncio.to_thread(_sync_search)
         except Exception as e:
-            print(f"Async search wrapper error: {e}")
+            logger.warning("Async search wrapper failed", extra={"company": company_name, "error": str(e)})
             return []
 
     async def _extract_company_info(self, company_name: str, search_results: list) -> dict:
@@ -92,44 +128,23 @@ class CompanyLookupService:
             body = result.get("body", "")
             formatted_results += f"\n{i}. Title: {title}\n   URL: {url}\n   Description: {body}\n"
 
-        prompt = f"""You are a research assistant. Based on the following search results for the company "{company_name}", extract:
-1. The official website URL of the company (not a news article, not LinkedIn, not a directory listing - the company's actual official website)
-2. The industry/sector the company operates in
+        user_prompt = f"""Company: {company_name}
 
 Search Results:
 {formatted_results}
-
-Important Rules:
-- For the website, find the company's PRIMARY official domain (e.g., company.com, not linkedin.com/company/...)
-- If the company name appears in the domain, that's likely the official site
-- For industry, be specific but concise (e.g., "Countertops & Stone Surfaces", "SaaS", "E-commerce", "Construction")
-- If you cannot determine with confidence, return null
-
-Respond in this exact JSON format only, no other text:
-{{"website": "https://example.com" or null, "industry": "Industry Name" or null}}
 """
 
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts company information from search results. Always respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
+            # A null website means the small model was unsure; the next tier retries
+            result, model = await model_router.complete(
+                self.openai_client,
+                "company_lookup",
+                LOOKUP_PROMPT.messages(user_prompt),
+                json_validator(required=("website",)),
                 temperature=0.2,
                 max_tokens=200
             )
             
-            content = response.choices[0].message.content.strip()
-            
-            # Clean up the response - remove markdown code blocks if present
-            if content.startswith("```"):
-                content = re.sub(r'^```(?:json)?\n?', '', content)
-                content = re.sub(r'\n?```$', '', content)
-            
-            # Parse the JSON response
-            result = json.loads(content)
-            
             # Validate website URL format
             website = result.get("website")
             if website and not website.startswith(("http://", "https://")):
@@ -142,7 +157,7 @@ Respond in this exact JSON format only, no other text:
             }
 
         except Exception as e:
-            print(f"OpenAI extraction error: {e}")
+            logger.warning("OpenAI extraction failed, using fallback", extra={"company": company_name, "error": str(e)})
             # Fallback: Try to extract website from search results directly
             return self._fallback_extraction(company_name, search_results)
 
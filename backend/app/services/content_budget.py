@@ -0,0 +1,285 @@
+"""
+Content Budgeter
+Selects the most informative blocks of scraped text so prompts fit a token budget
+"""
+
+import re
+import math
+import logging
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+
+# Phrases that mark cookie banners, legal footers and navigation chrome
+BOILERPLATE_PATTERNS = [
+    r'\bcookies?\b.*\b(accept|consent|settings|preferences|policy)\b',
+    r'\b(accept|reject) all\b',
+    r'\ball rights reserved\b',
+    r'\bprivacy policy\b',
+    r'\bterms (of|and) (use|service|conditions)\b',
+    r'\bskip to (main )?content\b',
+    r'\bsubscribe to our newsletter\b',
+    r'\benable javascript\b',
+    r'\b(log ?in|sign ?in|sign up|create an account)\b',
+    r'©|\(c\) ?\d{4}|\bcopyright\b',
+]
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'from',
+    'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'this', 'that', 'we', 'our', 'you',
+    'your', 'us', 'as', 'not', 'but', 'all', 'more', 'can', 'will', 'has', 'have', 'they',
+    'their', 'where', 'both',
+}
+
+# Instruction words that describe the output rather than the company
+PROMPT_WORDS = {
+    'list', 'names', 'specific', 'real', 'types', 'include', 'based', 'own', 'would', 'could',
+    'website', 'social', 'media', 'json', 'format', 'field', 'fields', 'consider', 'comprehensive',
+}
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'&-]*")
+_BOILERPLATE_RE = re.compile('|'.join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Lines shorter than this are treated as menu/link items and merged together
+SHORT_LINE_CHARS = 40
+
+
+def _term(word: str) -> str:
+    """Fold plurals and possessives so 'industries' matches 'industry' and "customers'" matches 'customer'."""
+    word = word.rstrip("'").removesuffix("'s")
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith('sses'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def relevance_terms(*texts: Optional[str]) -> Set[str]:
+    """
+    Terms that mark a block as relevant: the content words of the given
+    texts, e.g. the analysis fields a prompt asks for and the company's
+    name and industry.
+    """
+    terms = set()
+    for text in texts:
+        for word in _WORD_RE.findall((text or '').lower()):
+            if len(word) > 2 and word not in STOPWORDS and word not in PROMPT_WORDS:
+                terms.add(_term(word))
+    return terms
+
+
+class ContentBudgeter:
+    """
+    Splits scraped page text into blocks, drops boilerplate and near-duplicate
+    blocks, ranks the rest by information density and relevance, and packs the
+    best blocks into a token budget. Relevance terms (see relevance_terms) are
+    set once and can be replaced per call.
+    """
+
+    def __init__(self, model: str = "gpt-4o", relevance_terms: Optional[Iterable[str]] = None,
+                 duplicate_threshold: float = 0.8):
+        self.model = model
+        self.relevance_terms = {_term(term) for term in relevance_terms or ()}
+        self.duplicate_threshold = duplicate_threshold
+        self._encoder = None
+        self._encoder_loaded = False
+
+    @property
+    def encoder(self):
+        """
+        Tokenizer for the model, loaded on first use. tiktoken downloads the
+        encoding file the first time, so a failure (e.g. offline host) falls
+        back to the character estimate instead of breaking the agent.
+        """
+        if not self._encoder_loaded:
+            self._encoder_loaded = True
+            if tiktoken is not None:
+                try:
+                    try:
+                        self._encoder = tiktoken.encoding_for_model(self.model)
+                    except KeyError:
+                        self._encoder = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logger.warning("Tokenizer unavailable, estimating tokens from length", extra={"error": str(e)})
+        return self._encoder
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the model tokenizer (falls back to ~4 chars per token)."""
+        if not text:
+            return 0
+        if self.encoder is not None:
+            return len(self.encoder.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / 4)
+
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most max_tokens tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoder is not None:
+            tokens = self.encoder.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoder.decode(tokens[:max_tokens])
+        return text[:max_tokens * 4]
+
+    def split_blocks(self, text: str) -> List[str]:
+        """
+        Split text into blocks. Long lines are blocks on their own; runs of
+        short lines (menus, link lists, footers) are merged into one block so
+        they can be scored and dropped as a unit.
+        """
+        blocks = []
+        short_run = []
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                if short_run:
+                    blocks.append('\n'.join(short_run))
+                    short_run = []
+                continue
+            if len(line) < SHORT_LINE_CHARS:
+                short_run.append(line)
+                continue
+            if short_run:
+                blocks.append('\n'.join(short_run))
+                short_run = []
+            blocks.append(line)
+        if short_run:
+            blocks.append('\n'.join(short_run))
+        return blocks
+
+    def is_boilerplate(self, block: str) -> bool:
+        """Detect cookie banners, legal notices and navigation-only blocks."""
+        words = _WORD_RE.findall(block.lower())
+        if len(words) < 3:
+            return True
+        if _BOILERPLATE_RE.search(block) and len(words) < 60:
+            return True
+        lines = block.split('\n')
+        # Many very short lines with no sentence punctuation: a nav menu
+        if len(lines) >= 4 and len(words) / len(lines) < 3 and not re.search(r'[.!?]', block):
+            return True
+        return False
+
+    def score_block(self, block: str, terms: Optional[Set[str]] = None) -> float:
+        """Score a block by information density and relevance to the terms (default: relevance_terms)."""
+        words = _WORD_RE.findall(block.lower())
+        if not words:
+            return 0.0
+        content_words = [w for w in words if w not in STOPWORDS]
+        if not content_words:
+            return 0.0
+
+        # Lexical diversity of non-stopwords, damped for very short blocks
+        diversity = len(set(content_words)) / len(content_words)
+        length_factor = min(1.0, len(words) / 25)
+        # Prose (sentences) carries more information than label lists
+        lines = block.split('\n')
+        prose_factor = 1.0 if len(words) / len(lines) >= 6 else 0.5
+
+        terms = self.relevance_terms if terms is None else terms
+        relevance_hits = sum(1 for w in content_words if _term(w) in terms)
+        relevance = min(1.0, relevance_hits / max(1, len(content_words)) * 5)
+
+        return diversity * length_factor * prose_factor * (1.0 + 2.0 * relevance)
+
+    def _shingles(self, block: str) -> Set[str]:
+        words = _WORD_RE.findall(block.lower())
+        if len(words) < 3:
+            return {' '.join(words)}
+        return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def _is_near_duplicate(self, shingles: Set[str], kept: List[Set[str]]) -> bool:
+        for other in kept:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= self.duplicate_threshold:
+                return True
+        return False
+
+    def select(self, text: str, max_tokens: int, kept: Optional[List[Set[str]]] = None,
+               terms: Optional[Set[str]] = None) -> str:
+        """
+        Return the best blocks of text that fit into max_tokens, in their
+        original order.
+
+        Args:
+            text: Scraped page text
+            max_tokens: Token budget for the selected content
+            kept: Shingle sets of blocks already selected from other sources;
+                  pass the same list across calls to dedupe between sources
+            terms: Relevance terms for this call, replacing relevance_terms
+
+        Returns:
+            The selected content joined with newlines
+        """
+        if not text or max_tokens <= 0:
+            return ""
+        if kept is None:
+            kept = []
+
+        candidates = []
+        seen_hashes = set()
+        for position, block in enumerate(self.split_blocks(text)):
+            if self.is_boilerplate(block):
+                continue
+            digest = hashlib.md5(re.sub(r'\W+', '', block.lower()).encode()).hexdigest()
+            if digest in seen_hashes:
+                continue
+            seen_hashes.add(digest)
+            candidates.append((self.score_block(block, terms), position, block))
+
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+
+        selected = []
+        used_tokens = 0
+        for score, position, block in candidates:
+            if score <= 0:
+                break
+            shingles = self._shingles(block)
+            if self._is_near_duplicate(shingles, kept):
+                continue
+            tokens = self.count_tokens(block) + 1  # newline separator
+            remaining = max_tokens - used_tokens
+            if tokens > remaining:
+                # Keep the head of a high-value block if a useful amount still fits
+                if remaining < 50:
+                    continue
+                block = self.truncate_to_tokens(block, remaining - 1)
+                tokens = remaining
+            selected.append((position, block))
+            kept.append(shingles)
+            used_tokens += tokens
+            if used_tokens >= max_tokens:
+                break
+
+        selected.sort()
+        return '\n'.join(block for _, block in selected)
+
+    def select_sources(self, sources: Dict[str, str], max_tokens: int,
+                       kept: Optional[List[Set[str]]] = None, terms: Optional[Set[str]] = None) -> Dict[str, str]:
+        """
+        Split one token budget across several sources (e.g. social profiles).
+        Budget left unused by short sources is passed on to the following ones.
+        Near-duplicate blocks are removed across sources.
+        """
+        selected = {}
+        if kept is None:
+            kept = []
+        remaining = max_tokens
+        names = [name for name, text in sources.items() if text]
+        for index, name in enumerate(names):
+            share = remaining // (len(names) - index)
+            chosen = self.select(sources[name], share, kept, terms)
+            if chosen:
+                selected[name] = chosen
+                remaining -= self.count_tokens(chosen)
+        return selected
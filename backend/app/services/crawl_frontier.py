@@ -0,0 +1,175 @@
+"""
+Crawl Frontier
+Budgeted, relevance-ordered crawl of one company site for contact, location and team pages
+"""
+
+import os
+import heapq
+import hashlib
+import logging
+from typing import List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from app.services.metrics import record_crawl_page
+from app.services.sitemap import score_contact_url
+
+logger = logging.getLogger(__name__)
+
+# Per-site budgets; the homepage counts towards pages and bytes
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "6"))
+CRAWL_MAX_BYTES = int(os.getenv("CRAWL_MAX_BYTES", str(3 * 1024 * 1024)))
+# Link hops from the homepage (sitemap entries count as one hop)
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+# Pages fetched at once from one site
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "3"))
+
+# Query parameters that never change page content
+_TRACKING_PREFIXES = ('utm_', 'mc_')
+_TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'ref'}
+# Links that are not HTML pages
+_SKIP_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.zip', '.mp4',
+    '.doc', '.docx', '.xls', '.xlsx',
+)
+
+
+def _site(parsed) -> str:
+    host = (parsed.hostname or "").lower()
+    host = host[4:] if host.startswith("www.") else host
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    return host
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL for deduplication: lowercase host without www, no
+    fragment, no trailing slash, no tracking parameters, sorted query.
+    The scheme is dropped so http and https variants collapse too.
+    """
+    parsed = urlparse(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PREFIXES) and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunparse(("", _site(parsed), parsed.path.rstrip('/') or '/', "", urlencode(query), ""))
+
+
+class CrawlFrontier:
+    """
+    Priority queue of pages still to visit on one site: the homepage (depth
+    0) first, then links by contact/location relevance (see
+    sitemap.score_contact_url; links scoring 0 are never queued). Enforces a
+    page budget, a byte budget and a depth limit, and skips pages already
+    seen under another URL: by canonical URL (redirect targets included) or
+    by content hash. When the homepage redirects to another host (e.g.
+    acme.com -> www.acme-corp.com), that host counts as the same site.
+    """
+
+    def __init__(self, root_url: str, max_pages: int = CRAWL_MAX_PAGES,
+                 max_bytes: int = CRAWL_MAX_BYTES, max_depth: int = CRAWL_MAX_DEPTH):
+        self.root_url = root_url
+        self.site_hosts: Set[str] = {_site(urlparse(root_url))}
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_depth = max_depth
+        self.pages_fetched = 0
+        self.bytes_fetched = 0
+        self.duplicates = 0
+        self._queue: List[Tuple[float, int, str, int]] = [(float('-inf'), 0, root_url, 0)]
+        self._seen: Set[str] = {canonical_url(root_url)}
+        self._hashes: Set[str] = set()
+        self._in_flight = 0
+        self._sequence = 0
+
+    def add(self, url: str, anchor_text: str = "", depth: int = 1, bonus: float = 0.0) -> bool:
+        """Queue a link if it is on this site, relevant, within depth and new."""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or depth > self.max_depth:
+            return False
+        if parsed.path.lower().endswith(_SKIP_EXTENSIONS) or _site(parsed) not in self.site_hosts:
+            return False
+        score = score_contact_url(url, anchor_text)
+        if score <= 0:
+            return False
+        canonical = canonical_url(url)
+        if canonical in self._seen:
+            return False
+        self._seen.add(canonical)
+        # Shallower pages win ties; the sequence keeps insertion order stable
+        self._sequence += 1
+        heapq.heappush(self._queue, (-(score + bonus) + 0.1 * depth, self._sequence, url, depth))
+        return True
+
+    def add_links(self, soup, page_url: str, depth: int) -> int:
+        """Queue the relevant same-site links of a fetched page."""
+        added = 0
+        for link in soup.find_all('a', href=True):
+            href = link['href'].strip()
+            if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+                continue
+            # Homepage/page links are known to exist, so they beat sitemap-only entries on ties
+            if self.add(urljoin(page_url, href), link.get_text(separator=' ').strip(), depth, bonus=0.5):
+                added += 1
+        return added
+
+    @property
+    def exhausted(self) -> bool:
+        return self.pages_fetched + self._in_flight >= self.max_pages or self.bytes_fetched >= self.max_bytes
+
+    def pop_batch(self, size: int = CRAWL_CONCURRENCY) -> List[Tuple[str, int]]:
+        """Next (url, depth) pairs to fetch, within the remaining page budget."""
+        batch = []
+        while self._queue and len(batch) < size and not self.exhausted:
+            _, _, url, depth = heapq.heappop(self._queue)
+            batch.append((url, depth))
+            self._in_flight += 1
+        return batch
+
+    def record(self, url: str, content: Optional[bytes], final_url: Optional[str] = None) -> bool:
+        """
+        Account for a popped page once fetched (None content when the fetch failed).
+
+        Args:
+            url: URL as popped
+            final_url: URL after redirects
+
+        Returns:
+            True when the page is new and should be parsed
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+        if url == self.root_url and final_url:
+            self.site_hosts.add(_site(urlparse(final_url)))
+        # Failed fetches count against the page budget too
+        self.pages_fetched += 1
+        if content is None:
+            record_crawl_page("error")
+            return False
+        self.bytes_fetched += len(content)
+        digest = hashlib.sha1(content).hexdigest()
+        redirected = canonical_url(final_url) if final_url else None
+        # Redirected to a page that is already queued or fetched
+        if digest in self._hashes or (redirected != canonical_url(url) and redirected in self._seen):
+            self.duplicates += 1
+            record_crawl_page("duplicate")
+            return False
+        self._hashes.add(digest)
+        if redirected:
+            self._seen.add(redirected)
+        record_crawl_page("fetched")
+        return True
+
+    def mark_seen(self, url: str):
+        """
+        Never queue `url`, e.g. a fetched page's rel=canonical. It does not
+        reject the page itself: many sites point every page's canonical at /.
+        """
+        self._seen.add(canonical_url(url))
+
+    def summary(self) -> dict:
+        return {
+            "pages": self.pages_fetched,
+            "bytes": self.bytes_fetched,
+            "duplicates": self.duplicates,
+            "queued": len(self._queue),
+        }
@@ -0,0 +1,89 @@
+"""
+Freshness
+Per-field-group provenance on CompanyLead and planning of minimal re-enrichment
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.models.schemas import CompanyLead, FieldProvenance
+
+# CompanyLead fields covered by each provenance group
+FIELD_GROUPS: Dict[str, List[str]] = {
+    "social": ["linkedin_url", "twitter_url", "facebook_url", "instagram_url", "youtube_url", "whatsapp_url", "tiktok_url"],
+    "contact": ["main_address", "email_addresses", "phone_numbers"],
+    "branches": ["branches"],
+    "key_contacts": ["key_contacts"],
+}
+
+# How long data in each group stays fresh
+GROUP_TTL_DAYS: Dict[str, int] = {
+    "social": int(os.getenv("SOCIAL_TTL_DAYS", "30")),
+    "contact": int(os.getenv("CONTACT_TTL_DAYS", "14")),
+    "branches": int(os.getenv("BRANCHES_TTL_DAYS", "30")),
+    "key_contacts": int(os.getenv("KEY_CONTACTS_TTL_DAYS", "60")),
+}
+# A fetch that found nothing is retried after this long, a failed one sooner
+EMPTY_RETRY_DAYS = int(os.getenv("EMPTY_RETRY_DAYS", "7"))
+FAILED_RETRY_DAYS = int(os.getenv("FAILED_RETRY_DAYS", "1"))
+
+# The fetch that fills each group; contact and branches share one crawl
+GROUP_FETCH: Dict[str, str] = {
+    "social": "social_links",
+    "contact": "contact_info",
+    "branches": "contact_info",
+    "key_contacts": "llm_contacts",
+}
+ALL_FETCHES: Set[str] = set(GROUP_FETCH.values())
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def is_group_empty(lead: CompanyLead, group: str) -> bool:
+    return not any(getattr(lead, field) for field in FIELD_GROUPS[group])
+
+
+def stamp(lead: CompanyLead, group: str, source: str, failed: bool = False, now: Optional[datetime] = None):
+    """Record where a group's data came from and when, with ok / empty / failed status."""
+    status = "failed" if failed else ("empty" if is_group_empty(lead, group) else "ok")
+    lead.field_provenance[group] = FieldProvenance(
+        source=source, fetched_at=(now or _now()).isoformat(), status=status
+    )
+
+
+def stale_groups(lead: CompanyLead, force: Iterable[str] = (), now: Optional[datetime] = None) -> List[str]:
+    """
+    Groups that need refreshing: never fetched, older than their TTL, or
+    empty/failed and past the retry window. `force` groups are always included.
+    """
+    now = now or _now()
+    stale = []
+    for group in FIELD_GROUPS:
+        provenance = lead.field_provenance.get(group)
+        if group in force or provenance is None:
+            stale.append(group)
+            continue
+        try:
+            age = now - datetime.fromisoformat(provenance.fetched_at)
+        except ValueError:
+            stale.append(group)
+            continue
+        if provenance.status == "failed":
+            max_age = timedelta(days=FAILED_RETRY_DAYS)
+        elif provenance.status == "empty" or is_group_empty(lead, group):
+            max_age = timedelta(days=EMPTY_RETRY_DAYS)
+        else:
+            max_age = timedelta(days=GROUP_TTL_DAYS[group])
+        if age >= max_age:
+            stale.append(group)
+    return stale
+
+
+def plan_fetches(groups: Optional[Iterable[str]]) -> Set[str]:
+    """Fetches needed to refresh the given groups (all fetches when groups is None)."""
+    if groups is None:
+        return set(ALL_FETCHES)
+    return {GROUP_FETCH[group] for group in groups}
@@ -0,0 +1,200 @@
+"""
+Host Latency
+Per-host fetch latency history used for adaptive timeouts, hedged requests and slow-fetch reporting
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Set
+from urllib.parse import urlparse, urlunparse
+
+import httpx
+
+from app.services.metrics import observe_hedged_fetch, record_slow_fetch
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per host, and how many are needed before adapting to them
+SAMPLE_WINDOW = int(os.getenv("HOST_LATENCY_WINDOW", "50"))
+MIN_SAMPLES = int(os.getenv("HOST_LATENCY_MIN_SAMPLES", "3"))
+MAX_HOSTS = int(os.getenv("HOST_LATENCY_MAX_HOSTS", "10000"))
+# Adaptive timeout = p95 x multiplier, clamped to [MIN_FETCH_TIMEOUT, caller's default]
+TIMEOUT_MULTIPLIER = float(os.getenv("HOST_TIMEOUT_MULTIPLIER", "3"))
+MIN_FETCH_TIMEOUT = float(os.getenv("MIN_FETCH_TIMEOUT", "2"))
+CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+# Hosts that timed out this many times in a row only get a short probe,
+# until DEAD_HOST_COOLDOWN seconds after their last timeout
+DEAD_HOST_TIMEOUTS = 2
+DEAD_HOST_COOLDOWN = float(os.getenv("DEAD_HOST_COOLDOWN_SECONDS", "300"))
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "true").lower() == "true"
+# Fetches slower than p95 x this factor are reported as slow
+SLOW_FETCH_FACTOR = float(os.getenv("SLOW_FETCH_FACTOR", "2"))
+
+
+def host_key(url: str) -> str:
+    """www.example.com and example.com share one history."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def alternate_url(url: str) -> Optional[str]:
+    """The same page on the other of www/apex, used as the hedge target."""
+    parsed = urlparse(url)
+    host = parsed.hostname
+    if not host or host.replace(".", "").isdigit() or host == "localhost":
+        return None
+    other = host[4:] if host.startswith("www.") else f"www.{host}"
+    netloc = other if parsed.port is None else f"{other}:{parsed.port}"
+    return urlunparse(parsed._replace(netloc=netloc))
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class _HostStats:
+    def __init__(self):
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.consecutive_timeouts = 0
+        self.last_timeout = 0.0
+
+    @property
+    def probing(self) -> bool:
+        return (self.consecutive_timeouts >= DEAD_HOST_TIMEOUTS
+                and time.monotonic() - self.last_timeout < DEAD_HOST_COOLDOWN)
+
+
+class HostLatencyTracker:
+    """
+    Remembers recent successful fetch latencies per host. Once a host has
+    MIN_SAMPLES, its timeout shrinks to a multiple of its p95 (never above
+    the caller's default), so a host that usually answers in 300ms no
+    longer holds a slot for 15s. A host that keeps timing out is only
+    probed with MIN_FETCH_TIMEOUT for a cooldown, after which it gets its
+    normal timeout again (a host slower than the probe could otherwise
+    never recover). Hosts without history fall back to the
+    p95 across all hosts for hedging.
+    """
+
+    def __init__(self):
+        self._hosts: "OrderedDict[str, _HostStats]" = OrderedDict()
+        self._global: Deque[float] = deque(maxlen=SAMPLE_WINDOW * 10)
+
+    def _stats(self, key: str) -> _HostStats:
+        stats = self._hosts.get(key)
+        if stats is None:
+            stats = self._hosts[key] = _HostStats()
+            if len(self._hosts) > MAX_HOSTS:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(key)
+        return stats
+
+    def p95(self, url: str) -> Optional[float]:
+        stats = self._hosts.get(host_key(url))
+        if stats is None or len(stats.samples) < MIN_SAMPLES:
+            return None
+        return _percentile(stats.samples, 0.95)
+
+    def hedge_delay(self, url: str) -> Optional[float]:
+        """How long to wait before hedging: the host's p95, else the p95 of all hosts."""
+        delay = self.p95(url)
+        if delay is None and len(self._global) >= MIN_SAMPLES * 10:
+            delay = _percentile(self._global, 0.95)
+        return delay
+
+    def timeout_for(self, url: str, default: float) -> httpx.Timeout:
+        stats = self._hosts.get(host_key(url))
+        total = default
+        if stats is not None and stats.probing:
+            total = min(default, MIN_FETCH_TIMEOUT)
+        elif stats is not None and len(stats.samples) >= MIN_SAMPLES:
+            adaptive = _percentile(stats.samples, 0.95) * TIMEOUT_MULTIPLIER
+            total = min(default, max(MIN_FETCH_TIMEOUT, adaptive))
+        return httpx.Timeout(total, connect=min(total, CONNECT_TIMEOUT))
+
+    def record(self, url: str, seconds: float):
+        stats = self._stats(host_key(url))
+        threshold = None
+        if len(stats.samples) >= MIN_SAMPLES:
+            threshold = max(MIN_FETCH_TIMEOUT / 2, _percentile(stats.samples, 0.95) * SLOW_FETCH_FACTOR)
+        stats.samples.append(seconds)
+        stats.consecutive_timeouts = 0
+        self._global.append(seconds)
+        if threshold is not None and seconds > threshold:
+            record_slow_fetch()
+            logger.warning("Unusually slow fetch", extra={
+                "host": host_key(url), "seconds": round(seconds, 3), "threshold": round(threshold, 3)
+            })
+
+    def record_timeout(self, url: str):
+        stats = self._stats(host_key(url))
+        stats.consecutive_timeouts += 1
+        stats.last_timeout = time.monotonic()
+
+
+async def _timed_get(client: httpx.AsyncClient, url: str, headers: dict, timeout: httpx.Timeout) -> httpx.Response:
+    start = time.perf_counter()
+    try:
+        response = await client.get(url, headers=headers, timeout=timeout)
+    except httpx.TimeoutException:
+        host_latency.record_timeout(url)
+        raise
+    host_latency.record(url, time.perf_counter() - start)
+    return response
+
+
+async def fetch(client: httpx.AsyncClient, url: str, headers: dict, timeout: float) -> httpx.Response:
+    """
+    GET `url` with a per-host adaptive timeout. When the request is still
+    running after the host's p95, a hedged request for the www/apex variant
+    is started and whichever returns a usable response first wins; the other
+    is cancelled. The primary's response is usable below 500, the hedge's
+    only when it is 2xx/3xx: a 404 from the variant host must not beat the
+    real page.
+
+    Args:
+        timeout: Upper bound in seconds; used as-is for hosts without history
+    """
+    primary = asyncio.ensure_future(_timed_get(client, url, headers, host_latency.timeout_for(url, timeout)))
+    hedge_url = alternate_url(url) if HEDGE_REQUESTS else None
+    delay = host_latency.hedge_delay(url) if hedge_url else None
+    if delay is None or delay >= timeout:
+        return await primary
+
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+    except asyncio.CancelledError:
+        primary.cancel()
+        raise
+    if done:
+        return primary.result()
+
+    hedge = asyncio.ensure_future(_timed_get(client, hedge_url, headers, host_latency.timeout_for(hedge_url, timeout)))
+    pending: Set[asyncio.Future] = {primary, hedge}
+    failure = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                usable_below = 400 if task is hedge else 500
+                if task.exception() is None and task.result().status_code < usable_below:
+                    observe_hedged_fetch("hedge" if task is hedge else "primary")
+                    return task.result()
+                # Prefer reporting the primary's outcome when both fail
+                if failure is None or task is primary:
+                    failure = task
+        observe_hedged_fetch("failed")
+        return failure.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# Singleton instance shared by all scrapers
+host_latency = HostLatencyTracker()
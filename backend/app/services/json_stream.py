@@ -0,0 +1,101 @@
+"""
+JSON Stream
+Incremental scanner that pulls completed array items out of a JSON document while it is still being generated
+"""
+
+import json
+import logging
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStreamer:
+    """
+    Feed the document in chunks of any size. Every complete item of the
+    watched top-level arrays (e.g. "keywords" in {"keywords": [{...}, ...]})
+    is returned by the feed() call that completes it. The scanner only
+    tracks nesting, strings and the current root key, so it costs one pass
+    over the text; the full document is kept for the final json.loads.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = set(keys)
+        self._chunks: List[str] = []
+        # "{" / "[" for each open container, root first
+        self._stack: List[str] = []
+        self._root_key: Optional[str] = None
+        self._expect_key = False
+        self._in_string = False
+        self._escape = False
+        # Characters of a root-level key being read
+        self._key: Optional[List[str]] = None
+        # Pieces of the array item being captured
+        self._parts: Optional[List[str]] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def _in_watched_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "[" and self._root_key in self.keys
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return (root key, item) for each item it completes."""
+        self._chunks.append(chunk)
+        completed = []
+        start = 0
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key is not None:
+                        self._root_key = "".join(self._key)
+                        self._key = None
+                    elif self._parts is not None and len(self._stack) == 2:
+                        completed.append(self._finish(chunk, start, i))
+                    continue
+                if self._key is not None:
+                    self._key.append(ch)
+            elif ch == '"':
+                self._in_string = True
+                if len(self._stack) == 1 and self._expect_key:
+                    self._key = []
+                elif self._parts is None and self._in_watched_array():
+                    self._parts, start = [], i
+            elif ch == "{" or ch == "[":
+                if self._parts is None and self._in_watched_array():
+                    self._parts, start = [], i
+                self._stack.append(ch)
+                self._expect_key = ch == "{"
+            elif ch == "}" or ch == "]":
+                if self._stack:
+                    self._stack.pop()
+                if self._parts is not None and len(self._stack) == 2:
+                    completed.append(self._finish(chunk, start, i))
+                self._expect_key = False
+            elif ch == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1] == "{"
+            elif ch == ":":
+                self._expect_key = False
+        if self._parts is not None:
+            self._parts.append(chunk[start:])
+        return [item for item in completed if item is not None]
+
+    def _finish(self, chunk: str, start: int, end: int) -> Optional[Tuple[str, Any]]:
+        self._parts.append(chunk[start:end + 1])
+        text = "".join(self._parts)
+        self._parts = None
+        try:
+            return self._root_key, json.loads(text)
+        except json.JSONDecodeError:
+            logger.debug("Skipping malformed streamed item", extra={"key": self._root_key})
+            return None
+
+    def result(self) -> Any:
+        """Parse the complete document."""
+        return json.loads(self.text)
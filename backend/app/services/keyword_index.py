@@ -0,0 +1,154 @@
+"""
+Keyword Index
+Canonicalizes proposed keywords and collapses near-duplicates across categories
+"""
+
+import re
+from typing import Dict, List, Optional, Set
+
+# Words that carry no meaning for matching ("dentists in" == "dentists")
+STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'for', 'in', 'on', 'at', 'to', 'with', '&'}
+
+# Words ending in "s" that are not plurals
+NON_PLURAL_ENDINGS = ('ss', 'us', 'is')
+
+
+def stem(word: str) -> str:
+    """Light English stemmer: folds plurals and common -ing/-ed endings."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith(('ches', 'shes', 'sses', 'xes', 'zes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(NON_PLURAL_ENDINGS):
+        word = word[:-1]
+
+    for suffix in ('ing', 'ed'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            # "shipping" -> "shipp" -> "ship"
+            if len(word) > 4 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+    return word
+
+
+def clean_keyword(keyword: str) -> str:
+    """Normalize case, punctuation and whitespace while keeping the wording readable."""
+    text = keyword.lower().replace('&', ' & ')
+    text = re.sub(r"[^\w&'\s]+", ' ', text)
+    text = text.replace("'", '')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def keyword_tokens(keyword: str) -> List[str]:
+    """Stemmed content tokens of a keyword, in order."""
+    return [stem(t) for t in clean_keyword(keyword).split() if t not in STOPWORDS]
+
+
+class KeywordIndex:
+    """
+    Index of canonical keywords. Each added keyword is either registered as a
+    new canonical entry or recorded as an alias of an existing one when its
+    stemmed token set matches (or is similar enough to) that entry.
+    """
+
+    def __init__(self, similarity_threshold: float = 1.0):
+        # 1.0 collapses only identical token sets ("dental clinics" / "Clinic, Dental");
+        # lower values also merge overlapping phrases
+        self.similarity_threshold = similarity_threshold
+        self.canonical: List[str] = []
+        self.aliases: Dict[str, List[str]] = {}
+        self._token_sets: List[frozenset] = []
+        self._by_key: Dict[frozenset, int] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        self.total_added = 0
+
+    def _find(self, tokens: frozenset) -> Optional[int]:
+        if tokens in self._by_key:
+            return self._by_key[tokens]
+        if self.similarity_threshold >= 1.0:
+            return None
+        # Only compare against entries sharing at least one token
+        candidates = set()
+        for token in tokens:
+            candidates |= self._by_token.get(token, set())
+        best, best_score = None, 0.0
+        for idx in candidates:
+            other = self._token_sets[idx]
+            score = len(tokens & other) / len(tokens | other)
+            if score >= self.similarity_threshold and score > best_score:
+                best, best_score = idx, score
+        return best
+
+    def add(self, keyword: str) -> Optional[str]:
+        """
+        Add a keyword and return its canonical form, or None when the keyword
+        has no usable content.
+        """
+        if not isinstance(keyword, str):
+            return None
+        cleaned = clean_keyword(keyword)
+        tokens = frozenset(keyword_tokens(keyword))
+        if not tokens:
+            return None
+        self.total_added += 1
+
+        idx = self._find(tokens)
+        if idx is not None:
+            canonical = self.canonical[idx]
+            if cleaned != canonical and cleaned not in self.aliases[canonical]:
+                self.aliases[canonical].append(cleaned)
+            return canonical
+
+        idx = len(self.canonical)
+        self.canonical.append(cleaned)
+        self.aliases[cleaned] = []
+        self._token_sets.append(tokens)
+        self._by_key[tokens] = idx
+        for token in tokens:
+            self._by_token.setdefault(token, set()).add(idx)
+        return cleaned
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Share of added keywords that were collapsed into an existing entry."""
+        if not self.total_added:
+            return 0.0
+        return round(1 - len(self.canonical) / self.total_added, 4)
+
+    def collapse_categories(self, categories: List[dict]) -> List[dict]:
+        """
+        Collapse duplicates within and across categories. A keyword stays in the
+        first category it appears in; categories left empty are dropped.
+
+        Args:
+            categories: [{"category_name": str, "keywords": [str]}]
+
+        Returns:
+            [{"category_name": str, "keywords": [canonical], "aliases": {canonical: [alias]}}]
+        """
+        collapsed = [self.collapse_category(category) for category in categories]
+
+        # Aliases are filled in once all categories are processed
+        for category in collapsed:
+            category["aliases"] = {k: self.aliases[k] for k in category["keywords"] if self.aliases[k]}
+        return [c for c in collapsed if c["keywords"]]
+
+    def collapse_category(self, category: dict) -> dict:
+        """
+        Add one category's keywords, keeping only those not seen in earlier
+        categories. Used directly when categories arrive one at a time.
+
+        Returns:
+            {"category_name": str, "keywords": [canonical]}
+        """
+        keywords = []
+        for keyword in category.get("keywords", []):
+            known = len(self.canonical)
+            canonical = self.add(keyword)
+            # Only newly created canonical entries belong to this category
+            if canonical is not None and len(self.canonical) > known:
+                keywords.append(canonical)
+        return {"category_name": category.get("category_name", "General"), "keywords": keywords}
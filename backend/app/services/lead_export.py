@@ -0,0 +1,262 @@
+"""
+Lead Export
+Streams stored leads as CSV, XLSX or Parquet through a configurable column mapping
+"""
+
+import io
+import os
+import csv
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+# (header, field path). Paths are dotted; "list[]" joins every item and
+# "list[0]" picks one. Paths under the exploded list resolve against the
+# current item, e.g. "key_contacts.email" with explode="key_contacts".
+DEFAULT_COLUMNS: List[Tuple[str, str]] = [
+    ("Company Name", "company_name"),
+    ("Website", "website"),
+    ("Industry", "industry"),
+    ("Company Size", "company_size"),
+    ("Location", "location"),
+    ("Main Address", "main_address"),
+    ("LinkedIn", "linkedin_url"),
+    ("Twitter", "twitter_url"),
+    ("Instagram", "instagram_url"),
+    ("Facebook", "facebook_url"),
+    ("WhatsApp", "whatsapp_url"),
+    ("YouTube", "youtube_url"),
+    ("Email Addresses", "email_addresses[]"),
+    ("Phone Numbers", "phone_numbers[].number"),
+    ("Branches", "branches[].name"),
+    ("Branch Addresses", "branches[].address"),
+    ("Channel Source", "channel_source"),
+    ("Keywords Matched", "keywords_matched[]"),
+    ("Confidence Score", "confidence_score"),
+    ("Relevance Score", "relevance_score"),
+    ("Enrichment Status", "enrichment_status"),
+    ("Contact Name", "key_contacts.full_name"),
+    ("Contact Designation", "key_contacts.designation"),
+    ("Contact Role", "key_contacts.role_category"),
+    ("Contact Email", "key_contacts.email"),
+    ("Contact Phone", "key_contacts.phone"),
+    ("Contact LinkedIn", "key_contacts.linkedin_url"),
+    ("Contact Twitter", "key_contacts.twitter_url"),
+    ("Contact Facebook", "key_contacts.facebook_url"),
+    ("Contact Instagram", "key_contacts.instagram_url"),
+    ("Contact WhatsApp", "key_contacts.whatsapp_number"),
+]
+DEFAULT_EXPLODE = "key_contacts"
+
+# Columns typed as numbers in Parquet; everything else is a string
+NUMERIC_FIELDS = {"confidence_score", "relevance_score"}
+
+LIST_SEPARATOR = "; "
+# Rows per Parquet row group / CSV write batch
+BATCH_ROWS = 2000
+READ_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parse_columns(spec: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    Parse "Header=path,path2,..." into (header, path) pairs. A bare path is
+    used as its own header. None returns the default mapping.
+    """
+    if not spec:
+        return list(DEFAULT_COLUMNS)
+    columns = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        header, _, path = entry.rpartition("=")
+        columns.append((header.strip() or path.strip(), path.strip()))
+    return columns
+
+
+def _parse_path(path: str) -> List[Tuple[str, Optional[str]]]:
+    """"a.b[].c" -> [("a", None), ("b", ""), ("c", None)]; the second item is the list index."""
+    steps = []
+    for part in path.split("."):
+        name, bracket, index = part.partition("[")
+        steps.append((name, index.rstrip("]") if bracket else None))
+    return steps
+
+
+def _resolve(value: Any, steps: List[Tuple[str, Optional[str]]]) -> Any:
+    for i, (name, index) in enumerate(steps):
+        if value is None:
+            return None
+        if name:
+            value = value.get(name) if isinstance(value, dict) else None
+        if index is None:
+            continue
+        if not isinstance(value, list):
+            return None
+        if index == "":
+            rest = steps[i + 1:]
+            items = [_resolve(item, rest) for item in value]
+            return LIST_SEPARATOR.join(str(v) for v in items if v not in (None, ""))
+        try:
+            value = value[int(index)]
+        except (ValueError, IndexError):
+            return None
+    return _to_cell(value)
+
+
+def _to_cell(value: Any) -> Any:
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(str(v) for v in value if v not in (None, ""))
+    if isinstance(value, dict):
+        return LIST_SEPARATOR.join(f"{k}: {v}" for k, v in value.items() if v not in (None, ""))
+    return value
+
+
+def iter_rows(leads: Iterable[Dict], columns: List[Tuple[str, str]], explode: Optional[str] = DEFAULT_EXPLODE) -> Iterator[List[Any]]:
+    """
+    Flatten leads into rows. With `explode`, one row per item of that list
+    (at least one per lead); lead-level cells are resolved once per lead.
+    """
+    lead_columns, item_columns = [], []
+    for position, (_, path) in enumerate(columns):
+        steps = _parse_path(path)
+        if explode and steps[0] == (explode, None):
+            item_columns.append((position, steps[1:]))
+        else:
+            lead_columns.append((position, steps))
+
+    for lead in leads:
+        base: List[Any] = [None] * len(columns)
+        for position, steps in lead_columns:
+            base[position] = _resolve(lead, steps)
+        items = (lead.get(explode) or [None]) if item_columns else [None]
+        for item in items:
+            if item is None:
+                yield base
+                continue
+            row = list(base)
+            for position, steps in item_columns:
+                row[position] = _resolve(item, steps)
+            yield row
+
+
+def stream_csv(rows: Iterator[List[Any]], headers: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the UTF-8 file correctly
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+        pending += 1
+        if pending >= BATCH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _stream_file(path: str) -> Iterator[bytes]:
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(READ_CHUNK_BYTES):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+def _temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def stream_xlsx(rows: Iterator[List[Any]], headers: List[str]) -> Iterator[bytes]:
+    """
+    XLSX is a zip and cannot be emitted row by row, so rows are written in
+    xlsxwriter's constant_memory mode to a temp file, which is then streamed.
+    """
+    path = _temp_path(".xlsx")
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+        try:
+            sheet = workbook.add_worksheet("Leads")
+            bold = workbook.add_format({"bold": True})
+            sheet.write_row(0, 0, headers, bold)
+            for r, row in enumerate(rows, start=1):
+                sheet.write_row(r, 0, ["" if v is None else v for v in row])
+        finally:
+            workbook.close()
+    except BaseException:
+        os.unlink(path)
+        raise
+    yield from _stream_file(path)
+
+
+def stream_parquet(rows: Iterator[List[Any]], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    """Write row groups of BATCH_ROWS to a temp Parquet file, then stream it."""
+    schema = pa.schema([
+        (header, pa.float64() if path in NUMERIC_FIELDS else pa.string()) for header, path in columns
+    ])
+    numeric = [path in NUMERIC_FIELDS for _, path in columns]
+    path = _temp_path(".parquet")
+    try:
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        try:
+            batch: List[List[Any]] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= BATCH_ROWS:
+                    writer.write_table(_table(batch, schema, numeric))
+                    batch = []
+            if batch:
+                writer.write_table(_table(batch, schema, numeric))
+        finally:
+            writer.close()
+    except BaseException:
+        os.unlink(path)
+        raise
+    yield from _stream_file(path)
+
+
+def _table(batch: List[List[Any]], schema: pa.Schema, numeric: List[bool]) -> pa.Table:
+    arrays = []
+    for i, is_numeric in enumerate(numeric):
+        values = [row[i] for row in batch]
+        if not is_numeric:
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pa.array(values, type=schema.field(i).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def export_leads(leads: Iterable[Dict], fmt: str, columns: List[Tuple[str, str]],
+                 explode: Optional[str] = DEFAULT_EXPLODE) -> Iterator[bytes]:
+    """
+    Stream leads in the given format.
+
+    Args:
+        leads: Iterator of lead dicts (read lazily from the result store)
+        fmt: csv, xlsx or parquet
+        columns: (header, path) pairs, see DEFAULT_COLUMNS
+        explode: List field to emit one row per item for, or None
+    """
+    rows = iter_rows(leads, columns, explode)
+    headers = [header for header, _ in columns]
+    if fmt == "csv":
+        return stream_csv(rows, headers)
+    if fmt == "xlsx":
+        return stream_xlsx(rows, headers)
+    if fmt == "parquet":
+        return stream_parquet(rows, columns)
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,116 @@
+"""
+Lead Ranker
+Scores discovered leads against the ICP locally (BM25 over sparse term matrices)
+so only the most promising leads go through full enrichment
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.models.schemas import CompanyLead
+from app.services.keyword_index import keyword_tokens
+
+
+class LeadRanker:
+    """
+    BM25 ranker over lead documents (name, industry, location, homepage snippet).
+    The query is built from the ICP profile, keywords and target industries;
+    industries are weighted higher because they are the strongest fit signal.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, industry_weight: float = 2.0):
+        self.k1 = k1
+        self.b = b
+        self.industry_weight = industry_weight
+
+    def _lead_document(self, lead: CompanyLead, snippet: str = "") -> List[str]:
+        parts = [lead.company_name, lead.industry or "", lead.location or "", snippet or ""]
+        return keyword_tokens(' '.join(parts))
+
+    def _query_weights(self, icp_profile: List[str], keywords: List[str],
+                       industries: List[str]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for text in icp_profile + keywords:
+            for token in keyword_tokens(text):
+                weights[token] = weights.get(token, 0.0) + 1.0
+        for text in industries:
+            for token in keyword_tokens(text):
+                weights[token] = weights.get(token, 0.0) + self.industry_weight
+        return weights
+
+    def score(self, leads: List[CompanyLead], icp_profile: List[str], keywords: List[str],
+              industries: List[str], snippets: Optional[Dict[int, str]] = None) -> np.ndarray:
+        """
+        Compute BM25 relevance for each lead, normalized to 0..1.
+
+        Args:
+            leads: Discovered leads
+            icp_profile: ICP descriptions from the research step
+            keywords: Selected keywords
+            industries: Target industries
+            snippets: Optional homepage text per lead index
+
+        Returns:
+            Array of scores aligned with leads
+        """
+        if not leads:
+            return np.zeros(0)
+        snippets = snippets or {}
+        documents = [self._lead_document(lead, snippets.get(i, "")) for i, lead in enumerate(leads)]
+
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        if not vocabulary:
+            return np.zeros(len(leads))
+
+        # Duplicate (row, col) pairs are summed into term frequencies
+        tf = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(documents), len(vocabulary))
+        )
+        tf.sum_duplicates()
+
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() or 1.0
+        df = np.bincount(tf.indices, minlength=len(vocabulary))
+        idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+
+        # BM25 term weights computed on the non-zero entries only
+        row_of_entry = np.repeat(np.arange(len(documents)), np.diff(tf.indptr))
+        norm = self.k1 * (1 - self.b + self.b * doc_len[row_of_entry] / avg_len)
+        bm25 = tf.copy()
+        bm25.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + norm)
+
+        query = np.zeros(len(vocabulary))
+        for token, weight in self._query_weights(icp_profile, keywords, industries).items():
+            if token in vocabulary:
+                query[vocabulary[token]] = weight
+
+        scores = bm25 @ query
+        top = scores.max()
+        return scores / top if top > 0 else scores
+
+    def rank(self, leads: List[CompanyLead], icp_profile: List[str], keywords: List[str],
+             industries: List[str], snippets: Optional[Dict[int, str]] = None,
+             top_k: Optional[int] = None, min_score: Optional[float] = None) -> List[CompanyLead]:
+        """
+        Store a relevance_score on every lead and return the leads selected for
+        enrichment (best first). Without top_k or min_score every lead is selected.
+        """
+        scores = self.score(leads, icp_profile, keywords, industries, snippets)
+        for lead, value in zip(leads, scores):
+            lead.relevance_score = round(float(value), 4)
+
+        order = np.argsort(-scores, kind="stable")
+        selected = [leads[i] for i in order]
+        if min_score is not None:
+            selected = [lead for lead in selected if lead.relevance_score >= min_score]
+        if top_k is not None:
+            selected = selected[:top_k]
+        return selected
@@ -0,0 +1,261 @@
+"""
+Lead Store
+SQLite store of every generated lead with indexed filters, FTS5 search and cursor pagination
+"""
+
+import os
+import json
+import base64
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.models.schemas import CompanyLead
+
+logger = logging.getLogger(__name__)
+
+LEAD_DB_PATH = os.getenv("LEAD_DB_PATH", "leads.db")
+MAX_PAGE_SIZE = 500
+
+SORT_COLUMNS = {"discovered_at", "confidence_score", "relevance_score"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    domain TEXT UNIQUE,
+    company_name TEXT NOT NULL,
+    industry TEXT COLLATE NOCASE,
+    location TEXT COLLATE NOCASE,
+    channel_source TEXT COLLATE NOCASE,
+    confidence_score REAL NOT NULL DEFAULT 0,
+    relevance_score REAL NOT NULL DEFAULT 0,
+    enrichment_status TEXT,
+    discovered_at TEXT NOT NULL,
+    summary TEXT,
+    result_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_industry ON leads(industry);
+CREATE INDEX IF NOT EXISTS idx_leads_location ON leads(location);
+CREATE INDEX IF NOT EXISTS idx_leads_channel ON leads(channel_source);
+CREATE INDEX IF NOT EXISTS idx_leads_confidence ON leads(confidence_score, id);
+CREATE INDEX IF NOT EXISTS idx_leads_relevance ON leads(relevance_score, id);
+CREATE INDEX IF NOT EXISTS idx_leads_discovered ON leads(discovered_at, id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+    company_name, summary, content='leads', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS leads_ai AFTER INSERT ON leads BEGIN
+    INSERT INTO leads_fts(rowid, company_name, summary) VALUES (new.id, new.company_name, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_ad AFTER DELETE ON leads BEGIN
+    INSERT INTO leads_fts(leads_fts, rowid, company_name, summary) VALUES ('delete', old.id, old.company_name, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_au AFTER UPDATE ON leads BEGIN
+    INSERT INTO leads_fts(leads_fts, rowid, company_name, summary) VALUES ('delete', old.id, old.company_name, old.summary);
+    INSERT INTO leads_fts(rowid, company_name, summary) VALUES (new.id, new.company_name, new.summary);
+END;
+"""
+
+UPSERT = """
+INSERT INTO leads (domain, company_name, industry, location, channel_source, confidence_score,
+                   relevance_score, enrichment_status, discovered_at, summary, result_id, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(domain) DO UPDATE SET
+    company_name = excluded.company_name, industry = excluded.industry, location = excluded.location,
+    channel_source = excluded.channel_source, confidence_score = excluded.confidence_score,
+    relevance_score = excluded.relevance_score, enrichment_status = excluded.enrichment_status,
+    discovered_at = excluded.discovered_at, summary = excluded.summary,
+    result_id = COALESCE(excluded.result_id, leads.result_id), data = excluded.data
+WHERE leads.enrichment_status IS NOT 'enriched' OR excluded.enrichment_status = 'enriched'
+"""
+
+# Leads without a website have no domain to conflict on; they are matched by name
+UPDATE_BY_ID = """
+UPDATE leads SET company_name = ?, industry = ?, location = ?, channel_source = ?, confidence_score = ?,
+    relevance_score = ?, enrichment_status = ?, discovered_at = ?, summary = ?,
+    result_id = COALESCE(?, result_id), data = ?
+WHERE id = ?
+"""
+
+
+def lead_domain(url: Optional[str]) -> Optional[str]:
+    """Normalized registrable host used as the lead's identity ("www." stripped)."""
+    if not url:
+        return None
+    host = urlparse(url if "://" in url else f"https://{url}").netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else (host or None)
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, as a prefix."""
+    terms = [t.replace('"', '') for t in text.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
+
+
+def encode_cursor(value, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, int]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(value, (str, int, float, type(None))) or isinstance(row_id, bool):
+            raise TypeError(value)
+        return value, int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+class LeadStore:
+    """
+    Leads are upserted by domain, so regenerating a company refreshes its
+    row instead of duplicating it. The full CompanyLead is kept as JSON next
+    to the indexed columns.
+    """
+
+    def __init__(self, path: str = LEAD_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; calls arrive via asyncio.to_thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def add_leads(self, leads: Iterable[CompanyLead], result_id: Optional[str] = None) -> int:
+        """
+        Upsert leads by domain, or by company name for leads without a
+        website. An enriched row is never replaced by a skipped, pending or
+        failed copy of the same company, whether from another channel in this
+        batch or from a later run.
+        """
+        by_key: Dict[Tuple[str, str], CompanyLead] = {}
+        for lead in leads:
+            domain = lead_domain(lead.website)
+            key = ("domain", domain) if domain else ("name", lead.company_name.lower())
+            current = by_key.get(key)
+            if current is None or lead.enrichment_status == "enriched" or current.enrichment_status != "enriched":
+                by_key[key] = lead
+        rows, unnamed = [], []
+        for (kind, _), lead in by_key.items():
+            row = (
+                lead_domain(lead.website), lead.company_name, lead.industry, lead.location, lead.channel_source,
+                lead.confidence_score, lead.relevance_score or 0.0, lead.enrichment_status, lead.discovered_at,
+                lead.summary, result_id, lead.model_dump_json(),
+            )
+            (rows if kind == "domain" else unnamed).append(row)
+        conn = self._connect()
+        with conn:
+            conn.executemany(UPSERT, rows)
+            for row in unnamed:
+                existing = conn.execute(
+                    "SELECT id, enrichment_status FROM leads WHERE domain IS NULL AND company_name = ? COLLATE NOCASE",
+                    (row[1],)
+                ).fetchone()
+                if existing is None:
+                    conn.execute(UPSERT, row)
+                elif existing[1] != "enriched" or row[7] == "enriched":
+                    conn.execute(UPDATE_BY_ID, (*row[1:], existing[0]))
+        return len(rows) + len(unnamed)
+
+    def query(self, q: Optional[str] = None, industry: Optional[str] = None, location: Optional[str] = None,
+              channel: Optional[str] = None, domain: Optional[str] = None,
+              min_confidence: Optional[float] = None, discovered_after: Optional[str] = None,
+              sort: str = "discovered_at", limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Filter and page through stored leads, newest / highest first.
+
+        Args:
+            q: Full-text search over company name and homepage summary
+            industry, channel, domain: Exact (case-insensitive) matches
+            location: Substring match, e.g. "Germany"
+            min_confidence: Minimum confidence_score
+            discovered_after: ISO timestamp lower bound
+            sort: discovered_at, confidence_score or relevance_score (descending)
+            limit: Page size (max MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            {"leads": [CompanyLead dict, ...], "next_cursor": str or None}
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {', '.join(sorted(SORT_COLUMNS))}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where, params = [], []
+        if q and fts_query(q):
+            where.append("id IN (SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?)")
+            params.append(fts_query(q))
+        for column, value in (("industry", industry), ("channel_source", channel)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if domain:
+            where.append("domain = ?")
+            params.append(lead_domain(domain))
+        if location:
+            where.append("location LIKE ?")
+            params.append(f"%{location}%")
+        if min_confidence is not None:
+            where.append("confidence_score >= ?")
+            params.append(min_confidence)
+        if discovered_after:
+            where.append("discovered_at >= ?")
+            params.append(discovered_after)
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            where.append(f"({sort}, id) < (?, ?)")
+            params.extend([value, row_id])
+
+        sql = f"SELECT id, {sort}, data FROM leads"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {sort} DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return {"leads": [json.loads(data) for _, _, data in rows[:limit]], "next_cursor": next_cursor}
+
+    def get_leads(self, domains: List[str]) -> List[Dict]:
+        """Stored leads for the given websites or domains, in no particular order."""
+        keys = [d for d in (lead_domain(domain) for domain in domains) if d]
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        rows = self._connect().execute(f"SELECT data FROM leads WHERE domain IN ({placeholders})", keys).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def leads_after(self, last_id: int = 0, batch_size: int = MAX_PAGE_SIZE) -> List[Tuple[int, Dict]]:
+        """
+        The next batch of stored leads in id order, for scanning the whole
+        store a page at a time (pass the last id returned).
+        """
+        rows = self._connect().execute(
+            "SELECT id, data FROM leads WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+        ).fetchall()
+        return [(row_id, json.loads(data)) for row_id, data in rows]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+
+# Singleton instance shared by the agent and the query endpoint
+lead_store = LeadStore()
@@ -0,0 +1,268 @@
+"""
+Main Content Extraction
+Readability-style extraction of a page's main text, title, description and headings without navigation chrome
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+logger = logging.getLogger(__name__)
+
+# Elements that never hold page content
+REMOVE_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'form', 'button', 'select', 'input']
+# Site chrome; <header> only outside <article>/<main>, where it can hold the title
+CHROME_TAGS = ['nav', 'footer', 'aside']
+
+_NEGATIVE_RE = re.compile(
+    r'nav|menu|footer|sidebar|cookie|consent|banner|breadcrumb|social|share|comment|popup|modal|'
+    r'newsletter|subscribe|signup|login|masthead|widget|related|promo|advert|sponsor|skip',
+    re.IGNORECASE,
+)
+_POSITIVE_RE = re.compile(r'article|content|main|body|post|entry|story|text|about|intro|hero|section', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Block elements whose text forms the lines of the main content
+TEXT_BLOCKS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'blockquote', 'pre', 'td', 'dd', 'dt', 'address', 'figcaption']
+# Paragraph-like elements that are scored and vote for their ancestors
+SCORED_TAGS = ['p', 'pre', 'td', 'blockquote', 'li', 'dd', 'address']
+# Phrasing elements; runs of these and bare text inside a container (page
+# builders often put copy straight into a <div>) are read as one line
+INLINE_TAGS = {'a', 'span', 'strong', 'b', 'em', 'i', 'u', 'small', 'mark', 'sup', 'sub', 'abbr',
+               'time', 'code', 'label', 'font', 'br', 'img', 'cite', 'q'}
+TAG_WEIGHTS = {'article': 10, 'main': 10, 'section': 5, 'div': 5, 'td': 3, 'blockquote': 3,
+               'ul': -3, 'ol': -3, 'form': -3, 'dl': -3, 'th': -5, 'li': -3}
+
+MIN_PARAGRAPH_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+# Below this much main text, fall back to all remaining body text
+MIN_MAIN_TEXT_CHARS = 200
+MAX_HEADINGS = 20
+
+
+def _text(node) -> str:
+    return _WHITESPACE_RE.sub(' ', node.get_text(separator=' ')).strip()
+
+
+def _text_length(node) -> int:
+    """Approximate visible text length, cheaper than normalizing whitespace."""
+    return len(node.get_text(separator=' ', strip=True))
+
+
+def link_density(node: Tag) -> float:
+    """Share of a node's text that sits inside links (menus and link lists score near 1)."""
+    text_length = _text_length(node)
+    if not text_length:
+        return 0.0
+    link_length = sum(_text_length(a) for a in node.find_all('a'))
+    return min(1.0, link_length / text_length)
+
+
+def _class_weight(node: Tag) -> int:
+    names = ' '.join(node.get('class') or []) + ' ' + (node.get('id') or '')
+    weight = 0
+    if _NEGATIVE_RE.search(names):
+        weight -= 25
+    if _POSITIVE_RE.search(names):
+        weight += 25
+    return weight
+
+
+def _strip_chrome(body: Tag):
+    for node in body.find_all(REMOVE_TAGS):
+        node.decompose()
+    for node in body.find_all(CHROME_TAGS):
+        node.decompose()
+    for node in body.find_all('header'):
+        if not node.find_parent(['article', 'main']):
+            node.decompose()
+    # Cookie banners, share bars, sidebars etc. marked only by class or id.
+    # Containers that also look like content, or hold most of the page
+    # (e.g. <div class="wrapper has-sidebar">), stay.
+    page_chars = _text_length(body)
+    chrome = [
+        node for node in body.find_all(['div', 'section', 'ul', 'ol', 'p', 'span'])
+        if _class_weight(node) < 0 and not node.find(['main', 'article']) and _text_length(node) < page_chars / 2
+    ]
+    removed = set()
+    for node in chrome:
+        # Nested chrome goes with its outermost match
+        if not any(id(parent) in removed for parent in node.parents):
+            removed.add(id(node))
+            node.decompose()
+
+
+def _score_candidates(body: Tag) -> Tuple[Dict[int, float], Dict[int, Tag]]:
+    """
+    Each paragraph with enough text scores 1 + commas + length/100 (max 3)
+    and adds it to its parent in full and its grandparent by half. Parents
+    start from a tag and class/id prior; the totals are scaled down by link
+    density, so menus and link lists lose to real prose.
+
+    Returns:
+        ({id(node): score}, {id(node): node})
+    """
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Tag] = {}
+    for paragraph in body.find_all(SCORED_TAGS):
+        text = _text(paragraph)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        points = 1 + text.count(',') + min(len(text) / 100, 3)
+        for level, ancestor in enumerate((paragraph.parent, paragraph.parent.parent if paragraph.parent else None)):
+            if not isinstance(ancestor, Tag):
+                break
+            key = id(ancestor)
+            if key not in scores:
+                nodes[key] = ancestor
+                scores[key] = TAG_WEIGHTS.get(ancestor.name, 0) + _class_weight(ancestor)
+            scores[key] += points if level == 0 else points / 2
+    return {key: score * (1 - link_density(nodes[key])) for key, score in scores.items()}, nodes
+
+
+def _main_node(body: Tag) -> Tag:
+    scores, nodes = _score_candidates(body)
+    if not scores:
+        return body
+    top_key = max(scores, key=scores.get)
+    top = nodes[top_key]
+    # Content is often split across sibling containers; widen to the parent
+    # when siblings score close to the winner
+    parent = top.parent
+    if top is not body and isinstance(parent, Tag):
+        threshold = max(10.0, scores[top_key] * 0.2)
+        strong_siblings = sum(
+            1 for sibling in parent.find_all(recursive=False)
+            if sibling is not top and scores.get(id(sibling), 0) >= threshold
+        )
+        if strong_siblings:
+            return parent
+    return top
+
+
+def _is_inline(node) -> bool:
+    if type(node) is NavigableString:
+        return True
+    return isinstance(node, Tag) and node.name in INLINE_TAGS and node.find(lambda t: t.name not in INLINE_TAGS) is None
+
+
+def _outer_blocks(root: Tag) -> List:
+    """
+    Outermost block elements under root in document order (p inside li is
+    read with the li), plus each run of bare text and inline elements found
+    directly inside other containers, as a list of nodes.
+    """
+    blocks = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list) or (node.name in TEXT_BLOCKS and node is not root):
+            blocks.append(node)
+        else:
+            # Children are pushed in reverse so they pop in document order
+            items, run = [], []
+            for child in node.contents:
+                if _is_inline(child):
+                    run.append(child)
+                    continue
+                if run:
+                    items.append(run)
+                    run = []
+                if isinstance(child, Tag):
+                    items.append(child)
+            if run:
+                items.append(run)
+            stack.extend(reversed(items))
+    return blocks
+
+
+def _run_text(run: List) -> Tuple[str, float]:
+    """Text of an inline run and the share of it inside links."""
+    text = _WHITESPACE_RE.sub(' ', ' '.join(
+        str(node) if type(node) is NavigableString else node.get_text(separator=' ') for node in run
+    )).strip()
+    if not text:
+        return text, 0.0
+    link_length = sum(
+        _text_length(a) for node in run if isinstance(node, Tag)
+        for a in ([node] if node.name == 'a' else node.find_all('a'))
+    )
+    return text, min(1.0, link_length / len(text))
+
+
+def _lines(root: Tag) -> List[str]:
+    """Text of each block element and inline run once, skipping link-dominated ones."""
+    lines = []
+    for node in _outer_blocks(root):
+        if isinstance(node, list):
+            text, density = _run_text(node)
+            if text and density <= MAX_LINK_DENSITY:
+                lines.append(text)
+            continue
+        text = _text(node)
+        if not text or (node.name not in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6') and link_density(node) > MAX_LINK_DENSITY):
+            continue
+        lines.append(text)
+    # Text placed directly in divs without block markup
+    if not lines:
+        lines = [line for line in (l.strip() for l in root.get_text(separator='\n').splitlines()) if line]
+    return lines
+
+
+def _meta(soup: BeautifulSoup, *candidates: Dict[str, str]) -> Optional[str]:
+    for attrs in candidates:
+        meta = soup.find('meta', attrs=attrs)
+        if meta and meta.get('content'):
+            return _WHITESPACE_RE.sub(' ', meta['content']).strip()
+    return None
+
+
+def extract_main_content(soup: BeautifulSoup) -> Dict:
+    """
+    Split a parsed page into its useful sections. Modifies `soup`.
+
+    Returns:
+        {"title", "description", "headings", "main_text"}; main_text falls
+        back to all non-chrome body text when no clear main block is found
+    """
+    title = _meta(soup, {'property': 'og:title'})
+    if not title and soup.title and soup.title.string:
+        title = _WHITESPACE_RE.sub(' ', soup.title.string).strip()
+    description = _meta(soup, {'name': 'description'}, {'property': 'og:description'})
+
+    body = soup.body or soup
+    _strip_chrome(body)
+
+    headings = []
+    for heading in body.find_all(['h1', 'h2', 'h3']):
+        text = _text(heading)
+        if text and text not in headings:
+            headings.append(text)
+        if len(headings) >= MAX_HEADINGS:
+            break
+
+    lines = _lines(_main_node(body))
+    main_text = '\n'.join(dict.fromkeys(lines))
+    if len(main_text) < MIN_MAIN_TEXT_CHARS:
+        main_text = '\n'.join(dict.fromkeys(_lines(body)))
+
+    return {"title": title, "description": description, "headings": headings, "main_text": main_text}
+
+
+def format_main_content(content: Dict) -> str:
+    """Render extracted sections as labelled plain text for prompts."""
+    parts = []
+    if content.get("title"):
+        parts.append(f"Title: {content['title']}")
+    if content.get("description"):
+        parts.append(f"Description: {content['description']}")
+    main_lines = set((content.get("main_text") or "").splitlines())
+    # Headings of sections outside the main text, as an outline of the rest of the page
+    headings = [h for h in content.get("headings", []) if h not in main_lines]
+    if headings:
+        parts.append("Headings: " + " | ".join(headings))
+    if content.get("main_text"):
+        parts.append(content["main_text"])
+    return '\n'.join(parts)
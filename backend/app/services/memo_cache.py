@@ -0,0 +1,76 @@
+"""
+Memo Cache
+Size-bounded LRU store and canonical, order-insensitive keys for memoizing agent calls
+"""
+
+import re
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Normalize a value so that equivalent inputs produce the same key:
+    strings are lowercased with collapsed whitespace, and lists are
+    deduplicated and sorted (order-insensitive).
+    """
+    if isinstance(value, str):
+        return re.sub(r'\s+', ' ', value).strip().lower()
+    if isinstance(value, dict):
+        return {k: canonicalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, set)):
+        items = [canonicalize(v) for v in value]
+        unique = {json.dumps(i, sort_keys=True): i for i in items if i not in ("", None)}
+        return [unique[k] for k in sorted(unique)]
+    return value
+
+
+def prompt_version(*templates: str) -> str:
+    """Short hash of prompt templates; changes whenever a template changes."""
+    digest = hashlib.sha256('\x00'.join(templates).encode('utf-8')).hexdigest()
+    return digest[:12]
+
+
+def canonical_key(namespace: str, version: str, payload: dict) -> str:
+    """Build a cache key from a namespace, a prompt version and a canonicalized payload."""
+    body = json.dumps(canonicalize(payload), sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+    return f"{namespace}:{version}:{digest}"
+
+
+class LRUCache:
+    """Least-recently-used cache holding at most max_size entries."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
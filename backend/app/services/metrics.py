@@ -0,0 +1,259 @@
+"""
+Metrics
+Prometheus counters and histograms for scraper fetches, parsing, search, LLM
+calls, model routing, admission control, pipeline queues, the seen-set and API
+endpoints. Labels are kept low-cardinality (no URLs, hosts or company names).
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.services.tracing import current_span, span
+
+logger = logging.getLogger(__name__)
+
+# Buckets sized for network calls (fetches, LLM) and for CPU-bound parsing
+NETWORK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+SCRAPER_FETCHES = Counter(
+    "scraper_fetches_total", "Scraper HTTP fetches", ["status", "outcome"]
+)
+SCRAPER_FETCH_SECONDS = Histogram(
+    "scraper_fetch_seconds", "Scraper HTTP fetch latency", ["outcome"], buckets=NETWORK_BUCKETS
+)
+PARSE_SECONDS = Histogram(
+    "parse_seconds", "HTML parsing and extraction time", ["extractor"], buckets=PARSE_BUCKETS
+)
+HEDGED_FETCHES = Counter(
+    "scraper_hedged_fetches_total", "Fetches that started a hedge request, by which request answered", ["winner"]
+)
+SLOW_FETCHES = Counter(
+    "scraper_slow_fetches_total", "Fetches far slower than their host's p95"
+)
+CRAWL_PAGES = Counter(
+    "scraper_crawl_pages_total", "Pages fetched by the per-site crawl frontier", ["outcome"]
+)
+SEEN_FILTER_CHECKS = Counter(
+    "seen_filter_checks_total", "Seen-set checks: leads new or seen, Bloom keys not confirmed (false_positive)", ["result"]
+)
+SEARCH_CALLS = Counter(
+    "search_calls_total", "Web search calls", ["provider", "outcome"]
+)
+SEARCH_SECONDS = Histogram(
+    "search_seconds", "Web search latency", ["provider"], buckets=NETWORK_BUCKETS
+)
+LLM_CALLS = Counter(
+    "llm_calls_total", "LLM chat completion calls", ["agent", "model", "outcome"]
+)
+LLM_SECONDS = Histogram(
+    "llm_call_seconds", "LLM chat completion latency", ["agent", "model"], buckets=NETWORK_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens by direction; in_cached is the part of in served from the provider's prompt cache",
+    ["agent", "model", "direction"]
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds", "Time until the first streamed LLM token", ["agent", "model"],
+    buckets=NETWORK_BUCKETS
+)
+LLM_ROUTE_ATTEMPTS = Counter(
+    "llm_route_attempts_total", "Routed LLM attempts per model tier", ["task", "model", "outcome"]
+)
+LLM_ROUTE_ATTEMPT_SECONDS = Histogram(
+    "llm_route_attempt_seconds", "Latency of one routed LLM attempt", ["task", "model"], buckets=NETWORK_BUCKETS
+)
+LLM_ROUTE_CALLS = Counter(
+    "llm_route_calls_total", "Routed LLM calls by the tier that answered (escalations = tiers skipped)",
+    ["task", "model", "escalations"]
+)
+LLM_ROUTE_SECONDS = Histogram(
+    "llm_route_seconds", "End-to-end routed LLM call latency, escalations included", ["task"], buckets=NETWORK_BUCKETS
+)
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total", "Memoized LLM result lookups", ["agent", "result"]
+)
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total", "Agent calls that started work (leader) or joined an identical in-flight call (follower)",
+    ["group", "role"]
+)
+ADMISSION_ACTIVE = Gauge(
+    "admission_active", "Jobs holding an admission slot", ["lane"]
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued", "Jobs waiting for an admission slot", ["lane"]
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time admitted jobs waited for a slot", ["lane"], buckets=NETWORK_BUCKETS
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Requests rejected with 429 by admission control", ["lane", "reason"]
+)
+PIPELINE_QUEUE_DEPTH = Gauge(
+    "pipeline_queue_depth", "Items waiting in a lead generation stage", ["stage"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "API request latency", ["method", "endpoint", "status"], buckets=NETWORK_BUCKETS
+)
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class InstrumentedAsyncClient(httpx.AsyncClient):
+    """
+    httpx client that records every fetch (redirects included) as one
+    observation, plus an http.fetch span when a trace is active.
+    """
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        with span("http.fetch", domain=request.url.host, path=request.url.path) as fetch_span:
+            try:
+                response = await super().send(request, **kwargs)
+            except httpx.TimeoutException:
+                self._observe("none", "timeout", start)
+                raise
+            except Exception:
+                self._observe("none", "error", start)
+                raise
+            if fetch_span:
+                fetch_span.set(http_status=response.status_code)
+        outcome = "ok" if response.status_code < 400 else "http_error"
+        self._observe(_status_class(response.status_code), outcome, start)
+        return response
+
+    @staticmethod
+    def _observe(status: str, outcome: str, start: float):
+        SCRAPER_FETCHES.labels(status=status, outcome=outcome).inc()
+        SCRAPER_FETCH_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_parse(extractor: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PARSE_SECONDS.labels(extractor=extractor).observe(time.perf_counter() - start)
+
+
+def observe_hedged_fetch(winner: str):
+    HEDGED_FETCHES.labels(winner=winner).inc()
+
+
+def record_slow_fetch():
+    SLOW_FETCHES.inc()
+
+
+def record_crawl_page(outcome: str):
+    CRAWL_PAGES.labels(outcome=outcome).inc()
+
+
+def record_seen_check(result: str, count: int = 1):
+    SEEN_FILTER_CHECKS.labels(result=result).inc(count)
+
+
+def observe_search(provider: str, outcome: str, seconds: float):
+    SEARCH_CALLS.labels(provider=provider, outcome=outcome).inc()
+    SEARCH_SECONDS.labels(provider=provider).observe(seconds)
+
+
+def observe_route_attempt(task: str, model: str, outcome: str, seconds: float):
+    LLM_ROUTE_ATTEMPTS.labels(task=task, model=model, outcome=outcome).inc()
+    LLM_ROUTE_ATTEMPT_SECONDS.labels(task=task, model=model).observe(seconds)
+
+
+def observe_route_call(task: str, model: str, escalations: int, seconds: float):
+    LLM_ROUTE_CALLS.labels(task=task, model=model, escalations=str(escalations)).inc()
+    LLM_ROUTE_SECONDS.labels(task=task).observe(seconds)
+
+
+def record_coalesced_call(group: str, joined: bool):
+    COALESCED_CALLS.labels(group=group, role="follower" if joined else "leader").inc()
+
+
+def set_admission_load(lane: str, active: int, queued: int):
+    ADMISSION_ACTIVE.labels(lane=lane).set(active)
+    ADMISSION_QUEUED.labels(lane=lane).set(queued)
+
+
+def observe_admission(lane: str, waited: float):
+    ADMISSION_WAIT_SECONDS.labels(lane=lane).observe(waited)
+
+
+def record_admission_rejection(lane: str, reason: str):
+    ADMISSION_REJECTIONS.labels(lane=lane, reason=reason).inc()
+
+
+def record_cache_lookup(agent: str, hit: bool):
+    LLM_CACHE_LOOKUPS.labels(agent=agent, result="hit" if hit else "miss").inc()
+
+
+def instrument_openai(client, agent: str):
+    """Record latency, outcome and token usage of client.chat.completions.create."""
+    completions = client.chat.completions
+    original = completions.create
+
+    async def create(**kwargs):
+        model = kwargs.get("model", "unknown")
+        start = time.perf_counter()
+        try:
+            response = await original(**kwargs)
+        except Exception:
+            LLM_CALLS.labels(agent=agent, model=model, outcome="error").inc()
+            LLM_SECONDS.labels(agent=agent, model=model).observe(time.perf_counter() - start)
+            raise
+        if kwargs.get("stream"):
+            return _observe_stream(response, agent, model, start)
+        LLM_CALLS.labels(agent=agent, model=model, outcome="ok").inc()
+        LLM_SECONDS.labels(agent=agent, model=model).observe(time.perf_counter() - start)
+        _record_usage(agent, model, getattr(response, "usage", None))
+        return response
+
+    completions.create = create
+    return client
+
+
+async def _observe_stream(stream, agent: str, model: str, start: float):
+    """Pass streamed chunks through; latency covers the whole stream, usage comes in the last chunk."""
+    usage = None
+    first_token = True
+    try:
+        async for chunk in stream:
+            if first_token and chunk.choices:
+                LLM_TIME_TO_FIRST_TOKEN.labels(agent=agent, model=model).observe(time.perf_counter() - start)
+                first_token = False
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+    except Exception:
+        LLM_CALLS.labels(agent=agent, model=model, outcome="error").inc()
+        LLM_SECONDS.labels(agent=agent, model=model).observe(time.perf_counter() - start)
+        raise
+    LLM_CALLS.labels(agent=agent, model=model, outcome="ok").inc()
+    LLM_SECONDS.labels(agent=agent, model=model).observe(time.perf_counter() - start)
+    _record_usage(agent, model, usage)
+
+
+def _record_usage(agent: str, model: str, usage: Optional[object]):
+    """Count prompt (cached and uncached) and completion tokens of one call."""
+    if usage is None:
+        return
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    LLM_TOKENS.labels(agent=agent, model=model, direction="in").inc(prompt_tokens)
+    LLM_TOKENS.labels(agent=agent, model=model, direction="in_cached").inc(cached_tokens)
+    LLM_TOKENS.labels(agent=agent, model=model, direction="out").inc(completion_tokens)
+    tokens = {"prompt_tokens": prompt_tokens, "cached_tokens": cached_tokens, "completion_tokens": completion_tokens}
+    logger.debug("LLM token usage", extra={"agent": agent, "model": model, **tokens})
+    llm_span = current_span()
+    if llm_span:
+        llm_span.set(**tokens)
@@ -0,0 +1,144 @@
+"""
+Model Router
+Sends each LLM task to the cheapest model tier whose output passes a task validator, escalating on failure
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.metrics import observe_route_attempt, observe_route_call
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Model tiers per task, cheapest first. Override with MODEL_ROUTE_<TASK>,
+# e.g. MODEL_ROUTE_KEY_CONTACTS="gpt-4o-mini,gpt-4o".
+DEFAULT_ROUTES: Dict[str, str] = {
+    "company_lookup": "gpt-4o-mini,gpt-4o",
+    "key_contacts": "gpt-4o-mini,gpt-4o",
+    "discover_companies": "gpt-4o-mini,gpt-4o",
+    "strategy": "gpt-4o-mini,gpt-4o",
+    "keywords": "gpt-4o",
+    "research": "gpt-4o",
+}
+
+# A validator returns (parsed output, problem). A problem escalates to the
+# next tier; on the last tier any parseable output is accepted.
+Validator = Callable[[str], Tuple[Any, Optional[str]]]
+
+
+class RouteError(Exception):
+    """Every tier failed or returned output that could not be parsed."""
+
+
+def _load_json(content: Optional[str]) -> Any:
+    content = (content or "").strip()
+    # Some models wrap JSON in markdown fences
+    if content.startswith("```"):
+        content = content.strip("`")
+        content = content[4:] if content.startswith("json") else content
+    return json.loads(content)
+
+
+def json_validator(required: Tuple[str, ...] = (), min_items: Optional[Dict[str, int]] = None,
+                   item_fields: Optional[Dict[str, Tuple[str, ...]]] = None) -> Validator:
+    """
+    Validator for JSON object output.
+
+    Args:
+        required: Keys that must be present and non-empty
+        min_items: Minimum length of list fields, e.g. {"companies": 5}
+        item_fields: Keys every item of a list field must fill, e.g.
+            {"key_contacts": ("full_name", "designation")}
+    """
+    min_items = min_items or {}
+    item_fields = item_fields or {}
+
+    def validate(content: str) -> Tuple[Any, Optional[str]]:
+        try:
+            data = _load_json(content)
+        except (ValueError, TypeError):
+            return None, "invalid_json"
+        if not isinstance(data, dict):
+            return None, "not_an_object"
+        for key in required:
+            if data.get(key) in (None, "", [], {}):
+                return data, f"missing:{key}"
+        for key, minimum in min_items.items():
+            items = data.get(key)
+            if not isinstance(items, list) or len(items) < minimum:
+                return data, f"too_few:{key}"
+        for key, fields in item_fields.items():
+            for item in data.get(key) or []:
+                if not isinstance(item, dict) or any(
+                    item.get(field) in (None, "", "Unknown") for field in fields
+                ):
+                    return data, f"incomplete:{key}"
+        return data, None
+
+    return validate
+
+
+class ModelRouter:
+    def __init__(self, routes: Optional[Dict[str, str]] = None):
+        routes = dict(routes or DEFAULT_ROUTES)
+        self.routes: Dict[str, List[str]] = {}
+        for task, tiers in routes.items():
+            configured = os.getenv(f"MODEL_ROUTE_{task.upper()}", tiers)
+            self.routes[task] = [m.strip() for m in configured.split(",") if m.strip()]
+
+    def tiers(self, task: str) -> List[str]:
+        return self.routes[task]
+
+    def top_model(self, task: str) -> str:
+        """Largest tier, for calls that cannot be retried (e.g. streamed to the client)."""
+        return self.routes[task][-1]
+
+    async def complete(self, client, task: str, messages: List[Dict], validate: Validator,
+                       **kwargs) -> Tuple[Any, str]:
+        """
+        Run a chat completion on the task's tiers in order until one passes
+        `validate`.
+
+        Returns:
+            (parsed output, model that produced it)
+
+        Raises:
+            RouteError: when no tier produced parseable output
+        """
+        tiers = self.routes[task]
+        start = time.perf_counter()
+        last_error = None
+        for position, model in enumerate(tiers):
+            final = position == len(tiers) - 1
+            attempt_start = time.perf_counter()
+            with span(f"llm.{task}", model=model) as attempt_span:
+                try:
+                    response = await client.chat.completions.create(model=model, messages=messages, **kwargs)
+                except Exception as e:
+                    last_error = e
+                    observe_route_attempt(task, model, "error", time.perf_counter() - attempt_start)
+                    logger.warning("Model call failed", extra={"task": task, "model": model, "error": str(e)})
+                    if attempt_span:
+                        attempt_span.set(outcome="error")
+                    continue
+                data, problem = validate(response.choices[0].message.content)
+                accepted = problem is None or (final and data is not None)
+                outcome = "accepted" if accepted else "escalated"
+                observe_route_attempt(task, model, outcome, time.perf_counter() - attempt_start)
+                if attempt_span:
+                    attempt_span.set(outcome=outcome, problem=problem)
+            if accepted:
+                observe_route_call(task, model, position, time.perf_counter() - start)
+                return data, model
+            last_error = RouteError(f"{model} output rejected: {problem}")
+            logger.info("Escalating model tier", extra={"task": task, "model": model, "problem": problem})
+        observe_route_call(task, "none", len(tiers), time.perf_counter() - start)
+        raise RouteError(f"All model tiers failed for {task}: {last_error}")
+
+
+# Singleton instance shared by all agents
+model_router = ModelRouter()
@@ -0,0 +1,259 @@
+"""
+Request Profiler
+Opt-in sampling profiler for single API requests.
+
+A background thread samples the request's asyncio task, and every task it
+spawns (singleflight leaders, gather() children), every few milliseconds
+and records two collapsed-stack profiles (flamegraph.pl / speedscope format):
+  - wall: each task's await chain, so time spent waiting on fetches and LLM
+    calls shows up under the coroutine that awaited it
+  - cpu: the event loop thread's Python stack while one of these tasks is running
+Nothing runs unless a request asks for profiling with a valid token.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import hmac
+import asyncio
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Profiling is disabled unless a token is configured
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+# Relative paths are resolved against the backend directory, not the working directory
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+# Stop sampling runaway requests after this long
+PROFILE_MAX_SECONDS = 600
+
+PROFILE_KINDS = ("wall", "cpu")
+
+# Profiler of the request whose context is running. Tasks copy the context
+# they are created in, so the task factory below can attribute them.
+_active_profiler: ContextVar[Optional["RequestProfiler"]] = ContextVar("active_profiler", default=None)
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN and token and hmac.compare_digest(token, PROFILE_TOKEN))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+
+def _await_chain(coro) -> List[str]:
+    """Outermost-first frames of a coroutine and everything it is awaiting."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        awaited = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        if awaited is not None and not hasattr(awaited, "cr_frame") and not hasattr(awaited, "gi_frame"):
+            # Futures, gather() and to_thread(): the chain ends in something that is not a coroutine
+            stack.append(f"[awaiting {type(awaited).__name__}]")
+            break
+        coro = awaited
+    return stack
+
+
+def _thread_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """Register tasks created under a profiled request with its profiler; installed once per loop."""
+    previous = loop.get_task_factory()
+    if getattr(previous, "registers_profiled_tasks", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        profiler = context.get(_active_profiler) if context is not None else _active_profiler.get()
+        if profiler is not None:
+            profiler.track(task)
+        return task
+
+    factory.registers_profiled_tasks = True
+    loop.set_task_factory(factory)
+
+
+class RequestProfiler:
+    """Samples a request's asyncio tasks from a background thread."""
+
+    def __init__(self, label: str, interval: float = PROFILE_INTERVAL):
+        self.profile_id = uuid.uuid4().hex[:16]
+        self.label = label
+        self.interval = interval
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self.samples = 0
+        self._tasks = set()
+        self._tasks_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.task = asyncio.current_task()
+        self.loop = asyncio.get_running_loop()
+        self.track(self.task)
+        _install_task_factory(self.loop)
+        self._context_token = _active_profiler.set(self)
+        self.loop_thread_id = threading.get_ident()
+        self._cpu_clock = time.pthread_getcpuclockid(self.loop_thread_id) if hasattr(time, "pthread_getcpuclockid") else None
+        self._cpu_start = self._loop_cpu_time()
+        self._wall_start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profile_id}", daemon=True)
+        self._thread.start()
+
+    def track(self, task: asyncio.Task):
+        with self._tasks_lock:
+            self._tasks.add(task)
+
+    def detach(self):
+        """Stop attributing new tasks to this profiler; call from the task that called start()."""
+        _active_profiler.reset(self._context_token)
+
+    def stop(self) -> Dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.save()
+
+    def _loop_cpu_time(self) -> Optional[float]:
+        return time.clock_gettime(self._cpu_clock) if self._cpu_clock is not None else None
+
+    def _run(self):
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def _sample(self):
+        self.samples += 1
+        with self._tasks_lock:
+            self._tasks = {task for task in self._tasks if not task.done()}
+            tasks = list(self._tasks)
+        frame = sys._current_frames().get(self.loop_thread_id)
+        running = asyncio.current_task(self.loop) if frame is not None else None
+        for task in tasks:
+            chain = _await_chain(task.get_coro())
+            if not chain:
+                continue
+            if task is not running:
+                self.wall[";".join(chain + ["[waiting]"])] += 1
+                continue
+            # A running coroutine has no await chain; take the loop thread's real
+            # stack from the task's outermost coroutine down
+            stack = _thread_stack(frame)
+            if chain[0] in stack:
+                stack = stack[stack.index(chain[0]):]
+            self.wall[";".join(stack + ["[running]"])] += 1
+            self.cpu[";".join(stack)] += 1
+
+    def save(self) -> Dict:
+        cpu_start, cpu_end = self._cpu_start, self._loop_cpu_time()
+        meta = {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "wall_seconds": round(time.perf_counter() - self._wall_start, 4),
+            # CPU time of the event loop thread; includes any concurrent requests
+            "loop_cpu_seconds": round(cpu_end - cpu_start, 4) if cpu_start is not None else None,
+            "created_at": time.time(),
+        }
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        for kind, counts in (("wall", self.wall), ("cpu", self.cpu)):
+            with open(os.path.join(PROFILE_DIR, f"{self.profile_id}.{kind}.collapsed"), "w") as f:
+                for stack, count in counts.most_common():
+                    f.write(f"{stack} {count}\n")
+        with open(os.path.join(PROFILE_DIR, f"{self.profile_id}.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        logger.info("Request profile saved", extra=meta)
+        return meta
+
+
+def load_profile(profile_id: str, kind: Optional[str] = None):
+    """Profile metadata (kind=None) or the collapsed stacks of one kind; None if unknown."""
+    if not profile_id.isalnum() or (kind is not None and kind not in PROFILE_KINDS):
+        return None
+    name = f"{profile_id}.json" if kind is None else f"{profile_id}.{kind}.collapsed"
+    path = os.path.join(PROFILE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f) if kind is None else f.read()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when it carries an `X-Profile`
+    header or `profile=1` query flag plus a valid `X-Profile-Token`. The
+    profile id is returned in the `X-Profile-Id` response header. Without a
+    valid token the flag is ignored and the request is served unprofiled.
+
+    It must sit below any BaseHTTPMiddleware so that it runs in the same
+    task as the endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        token = headers.get(b"x-profile-token", b"").decode()
+        if not is_authorized(token):
+            logger.debug("Ignoring profile request without a valid token", extra={"path": scope["path"]})
+            await self.app(scope, receive, send)
+            return
+
+        profiler = RequestProfiler(label=f"{scope['method']} {scope['path']}")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) +
+                               [(b"x-profile-id", profiler.profile_id.encode())])
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # Stop sampling before handing the join and file writes to a thread
+            profiler.detach()
+            profiler._stop.set()
+            await asyncio.to_thread(profiler.stop)
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        # Cheap checks first so unprofiled requests pay almost nothing
+        if b"profile=" in scope.get("query_string", b""):
+            query = scope["query_string"].decode()
+            if any(part in ("profile=1", "profile=true") for part in query.split("&")):
+                return True
+        return any(name == b"x-profile" for name, _ in scope.get("headers") or [])
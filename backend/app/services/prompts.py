@@ -0,0 +1,30 @@
+"""
+Prompts
+System prompt templates kept byte-identical across requests so provider-side prompt caching applies
+"""
+
+import inspect
+import textwrap
+from typing import Dict, List
+
+
+class PromptTemplate:
+    """
+    Static instructions for one task. Providers cache the longest prompt
+    prefix they have seen recently (OpenAI from 1024 tokens), so nothing
+    request-specific may be interpolated into the instructions: per-request
+    values (channel, limits, company context) go in the user message, which
+    always comes last. Instructions are dedented once so indentation does
+    not cost tokens.
+    """
+
+    def __init__(self, name: str, instructions: str):
+        self.name = name
+        self.instructions = inspect.cleandoc(instructions)
+
+    def messages(self, user_prompt: str) -> List[Dict]:
+        """Chat messages: the cacheable static prefix, then the request-specific tail."""
+        return [
+            {"role": "system", "content": self.instructions},
+            {"role": "user", "content": textwrap.dedent(user_prompt).strip()},
+        ]
@@ -0,0 +1,260 @@
+"""
+Record / Replay
+Captures HTTP responses, search results and chat completions into a compact,
+content-addressed archive and serves them back deterministically.
+
+Configure with environment variables:
+    REPLAY_MODE=record|replay   (unset = off, no overhead)
+    REPLAY_ARCHIVE=./replay_archive
+    REPLAY_SIMULATE_LATENCY=true   (replay with the recorded latencies)
+"""
+
+import os
+import json
+import gzip
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Response headers that no longer apply once the body is stored decoded
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie'}
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _key(*parts: Any) -> str:
+    return _digest(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'))
+
+
+class ReplayStore:
+    """
+    Archive layout:
+        index.jsonl      one entry per recorded call: kind, key, blob hash, metadata, latency
+        blobs/ab/<hash>  gzip-compressed payloads, stored once per distinct content
+
+    Calls with the same key are replayed in the order they were recorded; once
+    exhausted, the last recording is reused.
+    """
+
+    def __init__(self, mode: Optional[str], path: str, simulate_latency: bool = False):
+        self.mode = mode if mode in ("record", "replay") else None
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        if self.mode:
+            os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        if self.mode == "replay":
+            self._load_index()
+
+    @classmethod
+    def from_env(cls) -> "ReplayStore":
+        return cls(
+            mode=os.getenv("REPLAY_MODE"),
+            path=os.getenv("REPLAY_ARCHIVE", "./replay_archive"),
+            simulate_latency=os.getenv("REPLAY_SIMULATE_LATENCY", "false").lower() == "true",
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    # --- Archive storage ---
+
+    def _load_index(self):
+        index_path = os.path.join(self.path, "index.jsonl")
+        if not os.path.exists(index_path):
+            logger.warning("Replay archive has no index; every call will miss", extra={"path": self.path})
+            return
+        with open(index_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logger.info("Loaded replay archive", extra={"path": self.path, "recordings": sum(len(v) for v in self._entries.values())})
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.path, "blobs", blob[:2], blob)
+
+    def _write_blob(self, data: bytes) -> str:
+        blob = _digest(data)
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(gzip.compress(data))
+        return blob
+
+    def _read_blob(self, blob: str) -> bytes:
+        with open(self._blob_path(blob), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def record(self, kind: str, key: str, payload: bytes, latency: float, meta: Optional[Dict] = None):
+        with self._lock:
+            entry = {"kind": kind, "key": key, "blob": self._write_blob(payload),
+                     "latency": round(latency, 4), "meta": meta or {}}
+            with open(os.path.join(self.path, "index.jsonl"), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    async def arecord(self, kind: str, key: str, payload: bytes, latency: float, meta: Optional[Dict] = None):
+        """record() from async code, with the file writes off the event loop."""
+        await asyncio.to_thread(self.record, kind, key, payload, latency, meta)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Next recorded entry for a key (with its payload), or None when never recorded."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            position = min(self._cursor[key], len(entries) - 1)
+            self._cursor[key] += 1
+            entry = dict(entries[position])
+        entry["payload"] = self._read_blob(entry["blob"])
+        return entry
+
+    # --- HTTP ---
+
+    def http_transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        """Transport for httpx clients; None when record/replay is off."""
+        if self.mode == "record":
+            return RecordingTransport(self)
+        if self.mode == "replay":
+            return ReplayTransport(self)
+        return None
+
+    @staticmethod
+    def http_key(request: httpx.Request) -> str:
+        return _key("http", request.method, str(request.url), _digest(request.content or b""))
+
+    # --- Search ---
+
+    def search(self, query: str, max_results: int, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Run (or replay) a synchronous search call."""
+        if not self.enabled:
+            return fetch()
+        key = _key("search", query, max_results)
+        if self.mode == "replay":
+            entry = self.lookup(key)
+            if entry is None:
+                logger.warning("Replay miss for search", extra={"query": query})
+                return []
+            if self.simulate_latency:
+                time.sleep(entry["latency"])
+            return json.loads(entry["payload"])
+        start = time.perf_counter()
+        results = fetch()
+        self.record("search", key, json.dumps(results).encode("utf-8"), time.perf_counter() - start,
+                    {"query": query})
+        return results
+
+    # --- LLM ---
+
+    def wrap_openai(self, client):
+        """Route client.chat.completions.create through the archive. No-op when off."""
+        if not self.enabled:
+            return client
+        completions = client.chat.completions
+        original = completions.create
+        store = self
+
+        async def create(**kwargs):
+            key = _key("llm", {k: v for k, v in kwargs.items() if k not in ("timeout", "extra_headers")})
+            if store.mode == "replay":
+                entry = store.lookup(key)
+                if entry is None:
+                    raise RuntimeError(f"Replay miss for chat completion (model={kwargs.get('model')})")
+                if store.simulate_latency:
+                    await asyncio.sleep(entry["latency"])
+                if kwargs.get("stream"):
+                    return _replay_chunks(json.loads(entry["payload"]))
+                from openai.types.chat import ChatCompletion
+                return ChatCompletion.model_validate_json(entry["payload"])
+            start = time.perf_counter()
+            response = await original(**kwargs)
+            if kwargs.get("stream"):
+                return store._record_chunks(key, response, start, kwargs.get("model"))
+            await store.arecord("llm", key, response.model_dump_json().encode("utf-8"),
+                                time.perf_counter() - start, {"model": kwargs.get("model")})
+            return response
+
+        completions.create = create
+        return client
+
+    async def _record_chunks(self, key: str, stream, start: float, model: Optional[str]):
+        """Pass a streamed completion through, archiving its chunks once it has finished."""
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk.model_dump(mode="json"))
+            yield chunk
+        await self.arecord("llm", key, json.dumps(chunks).encode("utf-8"), time.perf_counter() - start,
+                           {"model": model, "stream": True})
+
+
+async def _replay_chunks(chunks: List[Dict]):
+    from openai.types.chat import ChatCompletionChunk
+    for chunk in chunks:
+        yield ChatCompletionChunk.model_validate(chunk)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests and records every response. httpx ignores
+    HTTP(S)_PROXY / NO_PROXY once a client has a custom transport, so
+    requests go through an inner client that trusts the environment, and
+    are routed exactly like live traffic. Redirects are left to the outer
+    client, so each hop is recorded.
+    """
+
+    def __init__(self, store: ReplayStore, inner: Optional[httpx.AsyncClient] = None):
+        self.store = store
+        self.inner = inner or httpx.AsyncClient(verify=False, trust_env=True, follow_redirects=False)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        start = time.perf_counter()
+        response = await self.inner.send(request, stream=True)
+        try:
+            # Body is read (and decoded) fully so it can be archived
+            decoded = httpx.Response(response.status_code, headers=response.headers, stream=response.stream)
+            body = await decoded.aread()
+        finally:
+            await response.aclose()
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS]
+        await self.store.arecord("http", ReplayStore.http_key(request), body, time.perf_counter() - start,
+                                 {"url": str(request.url), "status": response.status_code, "headers": headers})
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded responses; unknown requests fail like an unreachable host."""
+
+    def __init__(self, store: ReplayStore):
+        self.store = store
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        entry = self.store.lookup(ReplayStore.http_key(request))
+        if entry is None:
+            raise httpx.ConnectError(f"Replay miss for {request.method} {request.url}", request=request)
+        if self.store.simulate_latency:
+            await asyncio.sleep(entry["latency"])
+        meta = entry["meta"]
+        return httpx.Response(meta["status"], headers=meta["headers"], content=entry["payload"], request=request)
+
+
+# Singleton instance configured from the environment
+replay_store = ReplayStore.from_env()
@@ -0,0 +1,206 @@
+"""
+Responses
+Fast JSON encoding and gzip/brotli compression for large API payloads
+"""
+
+import os
+import json
+import zlib
+from typing import AsyncIterator, Dict, List, Optional
+
+import brotli
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+# Brotli quality 4 compresses better than gzip -6 at similar speed
+BROTLI_QUALITY = 4
+
+# Already-compressed formats are passed through untouched
+INCOMPRESSIBLE_TYPES = (
+    "image/", "video/", "audio/", "application/zip", "application/gzip",
+    "application/vnd.openxmlformats", "application/vnd.apache.parquet", "application/octet-stream",
+)
+# Event streams are compressed chunk by chunk from the first byte, never held back
+EVENT_STREAM_TYPES = ("application/x-ndjson", "text/event-stream")
+
+
+def _empty_fields(model: BaseModel) -> dict:
+    """Pydantic exclude spec for empty list/dict fields, recursing into nested models."""
+    spec = {}
+    for name, value in model.__dict__.items():
+        if isinstance(value, (list, dict)) and not value:
+            spec[name] = True
+        elif isinstance(value, BaseModel):
+            nested = _empty_fields(value)
+            if nested:
+                spec[name] = nested
+        elif isinstance(value, list) and isinstance(value[0], BaseModel):
+            items = {i: nested for i, item in enumerate(value) if (nested := _empty_fields(item))}
+            if items:
+                spec[name] = items
+    return spec
+
+
+def model_response(model: BaseModel, compact: bool = False) -> Response:
+    """
+    Serialize a Pydantic model straight to JSON bytes.
+
+    Args:
+        model: Response model instance
+        compact: Omit null fields and empty lists/objects (smaller, but
+            clients must treat missing keys as empty)
+    """
+    if compact:
+        body = model.model_dump_json(exclude_none=True, exclude=_empty_fields(model) or None).encode()
+    else:
+        body = model.model_dump_json().encode()
+    return Response(content=body, media_type="application/json")
+
+
+def ndjson_response(events: AsyncIterator[Dict]) -> StreamingResponse:
+    """Stream events as newline-delimited JSON, one line per event."""
+    async def lines():
+        async for event in events:
+            yield json.dumps(event) + "\n"
+    # no-transform/X-Accel-Buffering keep proxies from buffering the stream
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"})
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush so streamed rows reach the client promptly."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _with_vary(headers: List) -> List:
+    """Response headers plus Vary: Accept-Encoding, unless a Vary header already covers it."""
+    for name, value in headers:
+        if name.lower() == b"vary" and (b"accept-encoding" in value.lower() or value.strip() == b"*"):
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+def _compressible(headers: Dict[bytes, bytes]) -> bool:
+    content_type = headers.get(b"content-type", b"").decode("latin-1")
+    return b"content-encoding" not in headers and not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with brotli or gzip, whichever
+    the client prefers. Small bodies, already-encoded responses and
+    compressed media types are passed through. Streaming responses are
+    compressed chunk by chunk. Every compressible response carries
+    Vary: Accept-Encoding, compressed or not, so caches keep the variants apart.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((v.decode("latin-1") for k, v in scope.get("headers") or [] if k == b"accept-encoding"), "")
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    headers = {k.lower(): v for k, v in message.get("headers", [])}
+                    if _compressible(headers):
+                        message = dict(message, headers=_with_vary(list(message.get("headers", []))))
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+        eager = False
+        # Streamed chunks are held back until there is enough to be worth compressing
+        pending: List[bytes] = []
+        pending_size = 0
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough, eager, pending_size
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                eager = content_type.startswith(EVENT_STREAM_TYPES)
+                if not _compressible(headers):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                pending.append(body)
+                pending_size += len(body)
+                if more_body and pending_size < self.minimum_size and not eager:
+                    return
+                body = b"".join(pending)
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(dict(start_message, headers=_with_vary(list(start_message.get("headers", [])))))
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                compressor = _Compressor(encoding)
+                headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+                headers = _with_vary(headers + [(b"content-encoding", encoding.encode())])
+                if not more_body:
+                    body = compressor.chunk(body) + compressor.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send(dict(start_message, headers=headers))
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(dict(start_message, headers=headers))
+
+            data = compressor.chunk(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,103 @@
+"""
+Result Store
+Keeps lead generation results on disk so they can be exported without re-running generation
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+from typing import Dict, Iterator, Optional
+
+from app.models.schemas import LeadGenerationResult
+
+logger = logging.getLogger(__name__)
+
+# Relative paths are resolved against the backend directory, not the working directory
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           os.getenv("RESULTS_DIR", "results"))
+# Results older than this, or beyond the newest RESULT_MAX_COUNT, are deleted (0 disables a limit)
+RESULT_RETENTION_DAYS = float(os.getenv("RESULT_RETENTION_DAYS", "30"))
+RESULT_MAX_COUNT = int(os.getenv("RESULT_MAX_COUNT", "1000"))
+# Saves within this many seconds of the last prune skip the directory scan
+PRUNE_INTERVAL_SECONDS = 60
+
+
+class ResultStore:
+    """
+    One JSON Lines file of leads per result plus a small metadata file.
+    Leads are read back one line at a time, so consumers run in constant memory.
+    Old results are pruned on save (see RESULT_RETENTION_DAYS, RESULT_MAX_COUNT).
+    """
+
+    def __init__(self, path: str = RESULTS_DIR, retention_days: float = RESULT_RETENTION_DAYS,
+                 max_count: int = RESULT_MAX_COUNT):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_count = max_count
+        self._last_prune = 0.0
+
+    def _file(self, result_id: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{result_id}{suffix}")
+
+    def save(self, result: LeadGenerationResult) -> str:
+        """Persist a result and return its id."""
+        result_id = uuid.uuid4().hex
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(result_id, ".jsonl"), "w", encoding="utf-8") as f:
+            for lead in result.companies:
+                f.write(lead.model_dump_json())
+                f.write("\n")
+        meta = result.model_dump(mode="json", exclude={"companies", "trace"})
+        meta["result_id"] = result_id
+        with open(self._file(result_id, ".meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        logger.info("Stored lead result", extra={"result_id": result_id, "leads": len(result.companies)})
+        if time.monotonic() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self.prune()
+        return result_id
+
+    def prune(self) -> int:
+        """Delete results past the retention age or count; returns how many were removed."""
+        self._last_prune = time.monotonic()
+        try:
+            entries = [(entry.stat().st_mtime, entry.name) for entry in os.scandir(self.path) if entry.name.endswith(".jsonl")]
+        except FileNotFoundError:
+            return 0
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days > 0 else None
+        expired = [
+            name for index, (mtime, name) in enumerate(entries)
+            if (self.max_count > 0 and index >= self.max_count) or (cutoff is not None and mtime < cutoff)
+        ]
+        for name in expired:
+            result_id = name[:-len(".jsonl")]
+            for suffix in (".jsonl", ".meta.json"):
+                try:
+                    os.remove(self._file(result_id, suffix))
+                except FileNotFoundError:
+                    pass
+        if expired:
+            logger.info("Pruned lead results", extra={"removed": len(expired), "kept": len(entries) - len(expired)})
+        return len(expired)
+
+    def exists(self, result_id: str) -> bool:
+        return result_id.isalnum() and os.path.exists(self._file(result_id, ".jsonl"))
+
+    def get_meta(self, result_id: str) -> Optional[Dict]:
+        if not self.exists(result_id):
+            return None
+        with open(self._file(result_id, ".meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_leads(self, result_id: str) -> Iterator[Dict]:
+        """Yield the stored leads as dicts, one at a time."""
+        with open(self._file(result_id, ".jsonl"), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+# Singleton instance shared by the agent and the export endpoints
+result_store = ResultStore()
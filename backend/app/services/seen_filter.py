@@ -0,0 +1,248 @@
+"""
+Seen Filter
+Persistent set of company domains and names already enriched or imported (e.g. from the CRM), so discovery skips them
+"""
+
+import os
+import re
+import math
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from app.models.schemas import CompanyLead
+from app.services.lead_store import LEAD_DB_PATH, lead_domain
+from app.services.metrics import record_seen_check
+
+logger = logging.getLogger(__name__)
+
+# Bloom filter sizing; it is rebuilt twice as large when the store outgrows it
+SEEN_FILTER_CAPACITY = int(os.getenv("SEEN_FILTER_CAPACITY", "1000000"))
+SEEN_FILTER_ERROR_RATE = float(os.getenv("SEEN_FILTER_ERROR_RATE", "0.001"))
+# Known company names listed in the discovery prompt
+SEEN_PROMPT_EXCLUSIONS = int(os.getenv("SEEN_PROMPT_EXCLUSIONS", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_entities (
+    key TEXT PRIMARY KEY,
+    label TEXT,
+    industry TEXT COLLATE NOCASE,
+    source TEXT,
+    added_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seen_added ON seen_entities(added_at);
+"""
+
+# Legal-form suffixes ignored when comparing company names
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'gmbh', 'ag', 'sa', 'sas', 'sarl', 'srl', 'spa', 'bv', 'nv', 'oy', 'ab', 'as', 'pty', 'pvt', 'kg',
+}
+_NAME_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_company_name(name: Optional[str]) -> Optional[str]:
+    """'The Acme Corp., Inc.' -> 'acme', 'Müller & Söhne GmbH' -> 'muller and sohne'."""
+    if not name:
+        return None
+    folded = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode().lower()
+    tokens = _NAME_TOKEN_RE.findall(folded.replace('&', ' and '))
+    while tokens and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    if tokens and tokens[0] == 'the' and len(tokens) > 1:
+        tokens = tokens[1:]
+    return ' '.join(tokens) or None
+
+
+def entity_keys(website: Optional[str] = None, company_name: Optional[str] = None) -> List[str]:
+    """
+    Keys stored for an entry. A company known by its domain is stored as
+    domain:<domain> plus label:<name>, which only matches leads without a
+    website; a name on its own (an imported exclusion) is stored as
+    name:<name> and matches any lead with that name.
+    """
+    domain = lead_domain(website)
+    name = normalize_company_name(company_name)
+    if domain:
+        return [f"domain:{domain}"] + ([f"label:{name}"] if name else [])
+    return [f"name:{name}"] if name else []
+
+
+def lookup_keys(website: Optional[str] = None, company_name: Optional[str] = None) -> List[str]:
+    """
+    Keys that mark a discovered lead as seen. Different companies share
+    names once legal suffixes are stripped ("Summit Dental LLC"), so a lead
+    with a website is matched on its domain and on name-only exclusions.
+    """
+    domain = lead_domain(website)
+    name = normalize_company_name(company_name)
+    keys = [f"domain:{domain}"] if domain else []
+    if name:
+        keys.append(f"name:{name}")
+        if not domain:
+            keys.append(f"label:{name}")
+    return keys
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> bool:
+        """Set the key's bits; returns False (and leaves count alone) when they were all set already."""
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenFilter:
+    """
+    Domains and normalized company names (see entity_keys) live in an exact
+    SQLite table next to the lead store; a Bloom filter over the same keys,
+    built from the table on first use, answers most lookups in memory. Only
+    Bloom hits are confirmed against the table, so a false positive never
+    drops a new lead.
+    """
+
+    def __init__(self, path: str = LEAD_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._bloom: Optional[BloomFilter] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; calls arrive via asyncio.to_thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def _rebuild(self, conn: sqlite3.Connection, minimum: int = 0) -> BloomFilter:
+        total = conn.execute("SELECT COUNT(*) FROM seen_entities").fetchone()[0]
+        bloom = BloomFilter(max(SEEN_FILTER_CAPACITY, 2 * max(total, minimum)), SEEN_FILTER_ERROR_RATE)
+        for (key,) in conn.execute("SELECT key FROM seen_entities"):
+            bloom.add(key)
+        logger.info("Built seen filter", extra={"entries": total, "bits": bloom.size, "hashes": bloom.hashes})
+        return bloom
+
+    def _filter(self, conn: sqlite3.Connection) -> BloomFilter:
+        if self._bloom is None:
+            with self._lock:
+                if self._bloom is None:
+                    self._bloom = self._rebuild(conn)
+        return self._bloom
+
+    def seen_keys(self, keys: Iterable[str]) -> set:
+        """The subset of keys already in the store."""
+        conn = self._connect()
+        bloom = self._filter(conn)
+        candidates = [key for key in set(keys) if key in bloom]
+        if not candidates:
+            return set()
+        placeholders = ",".join("?" * len(candidates))
+        confirmed = {row[0] for row in conn.execute(
+            f"SELECT key FROM seen_entities WHERE key IN ({placeholders})", candidates
+        )}
+        if len(confirmed) < len(candidates):
+            record_seen_check("false_positive", len(candidates) - len(confirmed))
+        return confirmed
+
+    def filter_new(self, leads: List[CompanyLead]) -> Tuple[List[CompanyLead], List[CompanyLead]]:
+        """Split leads into (new, already seen), see lookup_keys."""
+        lead_keys = [lookup_keys(lead.website, lead.company_name) for lead in leads]
+        seen = self.seen_keys(key for keys in lead_keys for key in keys)
+        new, skipped = [], []
+        for lead, keys in zip(leads, lead_keys):
+            (skipped if any(key in seen for key in keys) else new).append(lead)
+        record_seen_check("new", len(new))
+        record_seen_check("seen", len(skipped))
+        return new, skipped
+
+    def add(self, entries: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]], source: str) -> int:
+        """
+        Record (website or domain, company name, industry) entries.
+
+        Returns:
+            Number of keys that were not in the store yet
+        """
+        now = datetime.utcnow().isoformat()
+        rows = {}
+        for website, company_name, industry in entries:
+            for key in entity_keys(website, company_name):
+                rows.setdefault(key, (key, company_name or website, industry, source, now))
+        if not rows:
+            return 0
+        conn = self._connect()
+        bloom = self._filter(conn)
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_entities (key, label, industry, source, added_at) VALUES (?, ?, ?, ?, ?)",
+                list(rows.values())
+            )
+            added = conn.total_changes - before
+        with self._lock:
+            if bloom.count + added > bloom.capacity:
+                self._bloom = self._rebuild(conn, minimum=bloom.count + added)
+            else:
+                for key in rows:
+                    bloom.add(key)
+        return added
+
+    def add_leads(self, leads: Iterable[CompanyLead], source: str = "enriched") -> int:
+        return self.add(((lead.website, lead.company_name, lead.industry) for lead in leads), source)
+
+    def prompt_exclusions(self, industries: List[str], limit: int = SEEN_PROMPT_EXCLUSIONS) -> List[str]:
+        """Known company names to list in the discovery prompt, target industries first, newest first."""
+        if limit <= 0:
+            return []
+        conn = self._connect()
+        industry_set = [i.lower() for i in industries]
+        placeholders = ",".join("?" * len(industry_set)) or "''"
+        rows = conn.execute(
+            f"""SELECT label FROM seen_entities WHERE key LIKE 'name:%' OR key LIKE 'label:%'
+                ORDER BY (lower(industry) IN ({placeholders})) DESC, added_at DESC LIMIT ?""",
+            (*industry_set, limit)
+        ).fetchall()
+        return [row[0] for row in rows if row[0]]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM seen_entities").fetchone()[0]
+
+
+# Singleton instance shared across agents and API endpoints
+seen_filter = SeenFilter()
@@ -0,0 +1,90 @@
+"""
+Singleflight
+Coalesces identical concurrent calls so callers share one in-flight task and its result
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from app.services.metrics import record_coalesced_call
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    The first caller for a key starts the work as a task. Callers arriving
+    while it runs wait on the same task and get the same result or
+    exception. Pydantic results are deep-copied for the callers that joined,
+    so one request cannot mutate another's response. A caller that is
+    cancelled only stops waiting; the task is cancelled when its last
+    waiter has left. Work that needs an admission slot takes it inside the
+    task (see `admit`), so callers that join do not hold slots of their own.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 admit: Optional[Callable[[], AsyncContextManager]] = None) -> Any:
+        """
+        Run fn() once per key at a time and return its result.
+
+        Args:
+            admit: Context manager factory, e.g. AdmissionLane.admit, that
+                   the leader's work runs inside
+        """
+        call = self._calls.get(key)
+        joined = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(self._run(fn, admit)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, call))
+        record_coalesced_call(self.name, joined)
+        if joined:
+            logger.debug("Joined in-flight call", extra={"group": self.name, "waiters": call.waiters + 1})
+
+        call.waiters += 1
+        try:
+            # shield: cancelling this caller must not cancel work others wait on
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+        if joined and isinstance(result, BaseModel):
+            return result.model_copy(deep=True)
+        if joined and isinstance(result, dict):
+            return dict(result)
+        return result
+
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[Any]], admit: Optional[Callable[[], AsyncContextManager]]) -> Any:
+        if admit is None:
+            return await fn()
+        async with admit():
+            return await fn()
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finished(self, key: str, call: _Call):
+        self._forget(key, call)
+        # Mark the exception retrieved when every waiter left just as it failed
+        if not call.task.cancelled():
+            call.task.exception()
@@ -0,0 +1,247 @@
+"""
+Sitemap Discovery
+Finds contact / location pages from robots.txt and sitemap.xml instead of guessing URLs
+"""
+
+import os
+import re
+import logging
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import httpx
+
+from app.services.host_latency import host_latency
+from app.services.memo_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# How long fetched sitemap URL lists are reused per host; sites where
+# nothing was found (no sitemap, or the fetch failed) are retried sooner
+SITEMAP_CACHE_TTL = int(os.getenv("SITEMAP_CACHE_TTL", "86400"))
+SITEMAP_EMPTY_CACHE_TTL = int(os.getenv("SITEMAP_EMPTY_CACHE_TTL", "300"))
+# Per-site budget so huge sitemaps cannot stall enrichment: sitemap files
+# fetched (index and children included) and bytes read across them,
+# counted after gzip decompression
+MAX_SITEMAP_URLS = 5000
+MAX_SITEMAP_FILES = int(os.getenv("SITEMAP_MAX_FILES", "3"))
+MAX_SITEMAP_BYTES = int(os.getenv("SITEMAP_MAX_BYTES", str(512 * 1024)))
+
+# Path keywords and their weight for contact/location relevance
+CONTACT_PATH_WEIGHTS = [
+    ('contact', 10), ('location', 8), ('branch', 8), ('office', 7), ('store-locator', 8),
+    ('stores', 6), ('store', 4), ('showroom', 6), ('find-us', 7), ('visit', 4),
+    ('dealer', 4), ('where-to-buy', 5), ('directory', 5), ('about', 3), ('leadership', 3),
+    ('team', 2), ('careers', 2), ('jobs', 1), ('company', 1),
+]
+# Path segments that indicate content pages rather than contact pages
+NOISE_PATH_PARTS = ['blog', 'news', 'tag', 'category', 'product', 'post', 'wp-content', 'article', 'event']
+
+# Sitemap file names that are likely to list static pages
+SITEMAP_NAME_WEIGHTS = [('page', 5), ('location', 5), ('store', 4), ('contact', 5), ('main', 2)]
+
+_LOC_TAG = re.compile(r'(\{.*\})?loc$')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+# Endings a path word may add to a keyword: /locations, /contactus
+_WORD_SUFFIXES = ('', 's', 'es', 'us')
+_KEYWORD_PHRASES = [(keyword.split('-'), weight) for keyword, weight in CONTACT_PATH_WEIGHTS]
+
+
+def _has_phrase(words: List[str], phrase: List[str]) -> bool:
+    """Whether the keyword's words appear in order as whole words (/restore is not /store)."""
+    size = len(phrase)
+    for start in range(len(words) - size + 1):
+        last = words[start + size - 1]
+        if (words[start:start + size - 1] == phrase[:-1] and last.startswith(phrase[-1])
+                and last[len(phrase[-1]):] in _WORD_SUFFIXES):
+            return True
+    return False
+
+
+def score_contact_url(url: str, anchor_text: str = "") -> float:
+    """Score a URL (and optional anchor text) by how likely it is a contact/location page."""
+    path = urlparse(url).path.lower().rstrip('/')
+    if not path:
+        return 0.0
+    segments = [s for s in path.split('/') if s]
+    # Keywords match whole words within one path segment or the anchor text
+    phrases = [_WORD_RE.findall(segment) for segment in segments] + [_WORD_RE.findall(anchor_text.lower())]
+    score = 0.0
+    for phrase, weight in _KEYWORD_PHRASES:
+        if weight > score and any(_has_phrase(words, phrase) for words in phrases):
+            score = weight
+    if score == 0:
+        return 0.0
+    if any(part in segments for part in NOISE_PATH_PARTS):
+        score *= 0.3
+    # Prefer shallow pages: /contact over /blog/2020/contact-our-team
+    return score / (1 + 0.3 * max(0, len(segments) - 1))
+
+
+class SitemapDiscovery:
+    """
+    Fetches robots.txt and sitemaps (including sitemap indexes and gzip files)
+    for a site, stream-parses the URL lists and ranks them by contact/location
+    relevance. URL lists are cached per host.
+    """
+
+    def __init__(self, cache_size: int = 512):
+        self.cache = LRUCache(max_size=cache_size)
+
+    async def _sitemap_locations(self, client: httpx.AsyncClient, base_url: str, headers: Dict) -> List[str]:
+        """Sitemap URLs declared in robots.txt, or the conventional locations."""
+        sitemaps = []
+        try:
+            resp = await client.get(f"{base_url}/robots.txt", headers=headers, timeout=host_latency.timeout_for(base_url, 5.0))
+            if resp.status_code == 200:
+                for line in resp.text.splitlines():
+                    if line.lower().startswith('sitemap:'):
+                        sitemaps.append(line.split(':', 1)[1].strip())
+        except Exception as e:
+            logger.debug("robots.txt fetch failed", extra={"url": base_url, "error": str(e)})
+        return sitemaps or [f"{base_url}/sitemap.xml", f"{base_url}/sitemap_index.xml"]
+
+    async def _parse_sitemap(self, client: httpx.AsyncClient, url: str, headers: Dict,
+                             max_bytes: int = MAX_SITEMAP_BYTES) -> Tuple[bool, List[str], int]:
+        """
+        Stream a sitemap and collect its <loc> entries, stopping after max_bytes
+        received or, for a gzip sitemap, max_bytes decompressed.
+
+        Returns:
+            (is_index, locations, bytes used) where is_index is True for a sitemap index
+        """
+        parser = XMLPullParser(events=('start', 'end'))
+        decompressor = None
+        is_index = None
+        locations = []
+        received = 0
+        parsed = 0
+
+        async with client.stream('GET', url, headers=headers, timeout=host_latency.timeout_for(url, 10.0)) as resp:
+            if resp.status_code != 200:
+                return False, [], 0
+            async for chunk in resp.aiter_bytes():
+                chunk = chunk[:max_bytes - received]
+                if received == 0 and chunk[:2] == b'\x1f\x8b':
+                    # gzip sitemap (sitemap.xml.gz served without Content-Encoding)
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                received += len(chunk)
+                if decompressor is not None:
+                    # max_length keeps a gzip bomb from inflating past the budget
+                    chunk = decompressor.decompress(chunk, max_bytes - parsed)
+                parsed += len(chunk)
+                try:
+                    parser.feed(chunk)
+                    for event, elem in parser.read_events():
+                        if event == 'start' and is_index is None:
+                            is_index = elem.tag.endswith('sitemapindex')
+                        elif event == 'end' and _LOC_TAG.search(elem.tag) and elem.text:
+                            if len(locations) < MAX_SITEMAP_URLS:
+                                locations.append(elem.text.strip())
+                            elem.clear()
+                except ParseError:
+                    break
+                if len(locations) >= MAX_SITEMAP_URLS or max(received, parsed) >= max_bytes:
+                    break
+        return bool(is_index), locations, max(received, parsed)
+
+    async def get_site_urls(self, client: httpx.AsyncClient, base_url: str, headers: Dict) -> List[str]:
+        """All page URLs listed in the site's sitemaps (cached per host)."""
+        host = urlparse(base_url).netloc.lower()
+        cached = self.cache.get(host)
+        if cached is not None:
+            fetched_at, urls = cached
+            if time.time() - fetched_at < (SITEMAP_CACHE_TTL if urls else SITEMAP_EMPTY_CACHE_TTL):
+                return urls
+
+        urls: List[str] = []
+        files, received = 0, 0
+
+        async def parse(url: str) -> Tuple[bool, List[str]]:
+            nonlocal files, received
+            files += 1
+            is_index, locations, size = await self._parse_sitemap(
+                client, url, headers, max_bytes=MAX_SITEMAP_BYTES - received
+            )
+            received += size
+            return is_index, locations
+
+        def within_budget() -> bool:
+            return files < MAX_SITEMAP_FILES and received < MAX_SITEMAP_BYTES
+
+        for sitemap_url in await self._sitemap_locations(client, base_url, headers):
+            if not within_budget():
+                break
+            try:
+                is_index, locations = await parse(sitemap_url)
+            except Exception as e:
+                logger.debug("Sitemap fetch failed", extra={"url": sitemap_url, "error": str(e)})
+                continue
+            if is_index:
+                # Follow the child sitemaps most likely to list static pages
+                children = sorted(
+                    locations,
+                    key=lambda u: -max([w for name, w in SITEMAP_NAME_WEIGHTS if name in u.lower()] or [0])
+                )
+                for child in children:
+                    if not within_budget():
+                        break
+                    try:
+                        urls.extend((await parse(child))[1])
+                    except Exception as e:
+                        logger.debug("Child sitemap fetch failed", extra={"url": child, "error": str(e)})
+            else:
+                urls.extend(locations)
+            if urls:
+                break
+
+        self.cache.set(host, (time.time(), urls))
+        return urls
+
+    async def find_contact_pages(self, client: httpx.AsyncClient, base_url: str, headers: Dict,
+                                 limit: int = 3, extra_candidates: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Rank candidate pages by contact/location relevance and return the best ones.
+
+        Args:
+            client: Shared HTTP client
+            base_url: Site root, e.g. https://example.com
+            headers: Request headers
+            limit: Maximum number of pages to return
+            extra_candidates: {url: anchor_text} found on the homepage
+
+        Returns:
+            Up to `limit` same-site URLs, best first
+        """
+        site_host = urlparse(base_url).netloc.lower().removeprefix('www.')
+        scored: Dict[str, float] = {}
+
+        for url in await self.get_site_urls(client, base_url, headers):
+            scored[url] = score_contact_url(url)
+        for url, anchor_text in (extra_candidates or {}).items():
+            # Homepage links are known to exist, so they win ties with sitemap entries
+            scored[url] = max(scored.get(url, 0.0), score_contact_url(url, anchor_text) + 0.5)
+
+        ranked = []
+        seen_paths = set()
+        for url, score in sorted(scored.items(), key=lambda item: -item[1]):
+            if score <= 0:
+                break
+            parsed = urlparse(url)
+            if parsed.netloc.lower().removeprefix('www.') != site_host:
+                continue
+            path = parsed.path.rstrip('/').lower()
+            if path in seen_paths or not path:
+                continue
+            seen_paths.add(path)
+            ranked.append(url)
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+
+# Singleton instance so the per-host cache is shared across agents
+sitemap_discovery = SitemapDiscovery()
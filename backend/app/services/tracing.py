@@ -0,0 +1,144 @@
+"""
+Tracing
+Opt-in, per-request span timelines for the lead generation pipeline.
+
+Spans nest through a context variable, so concurrent tasks started with
+asyncio.gather get the right parent. When no trace is active, span() is a
+no-op and costs one context variable lookup.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Write every finished trace as Chrome trace JSON (open in Perfetto / chrome://tracing)
+TRACE_EXPORT_DIR = os.getenv("TRACE_EXPORT_DIR")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "track", "start", "end", "status", "attributes")
+
+    def __init__(self, span_id: int, parent: Optional["Span"], name: str, new_track: bool, attributes: Dict):
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        # Spans that run concurrently with their siblings get their own track
+        self.track = span_id if new_track or parent is None else parent.track
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+
+    def _ms(self, t: float) -> float:
+        return round((t - self.started) * 1000, 3)
+
+    def to_spans(self) -> List[Dict]:
+        """Flat span list in start order; rebuild the tree from parent_id."""
+        return [
+            {
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "name": s.name,
+                "start_ms": self._ms(s.start),
+                "duration_ms": round(((s.end or s.start) - s.start) * 1000, 3),
+                "status": s.status,
+                "attributes": s.attributes,
+            }
+            for s in sorted(self.spans, key=lambda s: s.start)
+        ]
+
+    def to_chrome_trace(self) -> Dict:
+        """Chrome trace event format with one thread track per concurrent branch."""
+        events = []
+        for s in self.spans:
+            events.append({
+                "name": s.name, "ph": "X", "pid": 1, "tid": s.track,
+                "ts": round((s.start - self.started) * 1e6), "dur": round(((s.end or s.start) - s.start) * 1e6),
+                "args": dict(s.attributes, span_id=s.span_id, parent_id=s.parent_id, status=s.status),
+            })
+            if s.track == s.span_id:
+                label = " ".join([s.name] + [str(v) for v in s.attributes.values()][:1])
+                events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": s.track, "args": {"name": label}})
+        return {"traceEvents": events, "otherData": {"trace_id": self.trace_id}}
+
+
+@contextmanager
+def start_trace(enabled: bool = True):
+    """Activate a trace for the enclosed block. Yields the Trace, or None when disabled."""
+    if not enabled and not TRACE_EXPORT_DIR:
+        yield None
+        return
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if TRACE_EXPORT_DIR:
+            _export(trace)
+
+
+@contextmanager
+def span(name: str, new_track: bool = False, **attributes):
+    """
+    Time the enclosed block as a child of the current span.
+
+    Args:
+        name: Stage name, e.g. "enrich_lead"
+        new_track: Put this span on its own timeline track (use for concurrent work)
+        attributes: Low-cost context such as channel, company or domain
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = Span(next(trace._ids), _current_span.get(), name, new_track, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, or None when no trace is active."""
+    return _current_span.get() if _current_trace.get() is not None else None
+
+
+def _export(trace: Trace):
+    try:
+        os.makedirs(TRACE_EXPORT_DIR, exist_ok=True)
+        path = os.path.join(TRACE_EXPORT_DIR, f"{trace.trace_id}.json")
+        with open(path, "w") as f:
+            json.dump(trace.to_chrome_trace(), f)
+        logger.info("Trace exported", extra={"trace_id": trace.trace_id, "path": path, "spans": len(trace.spans)})
+    except OSError as e:
+        logger.warning("Trace export failed", extra={"trace_id": trace.trace_id, "error": str(e)})
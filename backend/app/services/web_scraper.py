@@ -2,41 +2,125 @@ from duckduckgo_search import DDGS
 import httpx
 from bs4 import BeautifulSoup
 import asyncio
+import os
 import re
-from typing import Dict, Optional
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from app.services.sitemap import sitemap_discovery
+from app.services.replay import replay_store
+from app.services.crawl_frontier import CrawlFrontier
+from app.services.host_latency import fetch
+from app.services.main_content import extract_main_content, format_main_content
+from app.services.metrics import InstrumentedAsyncClient, observe_search, track_parse
+
+logger = logging.getLogger(__name__)
+
+# Homepage responses reused by the snippet, social-link and contact steps of
+# one lead instead of fetching the homepage once per step
+HOMEPAGE_CACHE_SECONDS = float(os.getenv("HOMEPAGE_CACHE_SECONDS", "300"))
+HOMEPAGE_CACHE_BYTES = int(os.getenv("HOMEPAGE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+SOCIAL_LINK_FIELDS = [
+    'linkedin_url', 'twitter_url', 'facebook_url', 'instagram_url', 'youtube_url', 'github_url',
+    'whatsapp_url', 'tiktok_url', 'pinterest_url', 'snapchat_url', 'threads_url', 'tripadvisor_url',
+]
 
 class WebScraper:
     def __init__(self):
         # Don't create persistent DDGS instance - create fresh one per search
-        pass
+        self._homepages: "OrderedDict[str, Tuple[float, httpx.Response]]" = OrderedDict()
+        self._homepage_bytes = 0
+
+    def _http_client(self) -> httpx.AsyncClient:
+        """HTTP client for page fetches (recorded or replayed when REPLAY_MODE is set)."""
+        return InstrumentedAsyncClient(follow_redirects=True, verify=False, transport=replay_store.http_transport())
+
+    async def _fetch_homepage(self, client: httpx.AsyncClient, url: str, headers: Dict,
+                              timeout: float) -> httpx.Response:
+        """fetch() with a short-lived cache of successful responses per URL."""
+        cached = self._homepages.get(url)
+        if cached and time.monotonic() - cached[0] < HOMEPAGE_CACHE_SECONDS:
+            self._homepages.move_to_end(url)
+            return cached[1]
+        resp = await fetch(client, url, headers, timeout)
+        size = len(resp.content)
+        if resp.status_code == 200 and size <= HOMEPAGE_CACHE_BYTES // 8:
+            if url in self._homepages:
+                self._homepage_bytes -= len(self._homepages.pop(url)[1].content)
+            self._homepages[url] = (time.monotonic(), resp)
+            self._homepage_bytes += size
+            while self._homepage_bytes > HOMEPAGE_CACHE_BYTES:
+                _, (_, evicted) = self._homepages.popitem(last=False)
+                self._homepage_bytes -= len(evicted.content)
+        return resp
 
     def search(self, query: str, max_results: int = 3):
+        start = time.perf_counter()
         try:
             with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=max_results))
+                results = replay_store.search(
+                    query, max_results, lambda: list(ddgs.text(query, max_results=max_results))
+                )
+                observe_search("duckduckgo", "ok" if results else "empty", time.perf_counter() - start)
                 return results
         except Exception as e:
-            print(f"Search error: {e}")
+            observe_search("duckduckgo", "error", time.perf_counter() - start)
+            logger.warning("Search error", extra={"query": query, "error": str(e)})
             return []
 
-    async def get_content(self, url: str):
+    async def get_content(self, url: str, max_chars: Optional[int] = 8000):
+        """
+        Page text for LLM prompts: title, meta description, an outline of
+        headings and the main content, without navigation, cookie notices,
+        sidebars and footers (see main_content.extract_main_content).
+        """
+        sections = await self.get_page_sections(url)
+        text = format_main_content(sections) if sections else ""
+        return text[:max_chars] if max_chars else text # Truncate to reasonable context window
+    
+    async def get_page_sections(self, url: str) -> Optional[Dict]:
+        """Structured main content of a page ({"title", "description", "headings", "main_text"}), None on failure."""
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        async with httpx.AsyncClient(follow_redirects=True, verify=False) as client:
+        async with self._http_client() as client:
+            try:
+                resp = await fetch(client, url, headers, 10.0)
+                if resp.status_code == 200:
+                    with track_parse("page_text"):
+                        return extract_main_content(BeautifulSoup(resp.text, 'html.parser'))
+            except Exception as e:
+                logger.warning("Error fetching page", extra={"url": url, "error": str(e)})
+        return None
+    
+    async def get_snippet(self, url: str, timeout: float = 5.0) -> str:
+        """
+        Fetch a short homepage snippet (title, meta description, first heading)
+        for cheap relevance ranking before full enrichment.
+        """
+        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+        async with self._http_client() as client:
             try:
-                resp = await client.get(url, headers=headers, timeout=10.0)
+                resp = await self._fetch_homepage(client, url, headers, timeout)
                 if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    # Strip script and style elements
-                    for script in soup(["script", "style"]):
-                        script.extract()
-                    text = soup.get_text()
-                    lines = (line.strip() for line in text.splitlines())
-                    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                    text = '\n'.join(chunk for chunk in chunks if chunk)
-                    return text[:8000] # Truncate to reasonable context window
+                    with track_parse("snippet"):
+                        soup = BeautifulSoup(resp.text, 'html.parser')
+                    parts = []
+                    if soup.title and soup.title.string:
+                        parts.append(soup.title.string.strip())
+                    for attrs in ({'name': 'description'}, {'property': 'og:description'}):
+                        meta = soup.find('meta', attrs=attrs)
+                        if meta and meta.get('content'):
+                            parts.append(meta['content'].strip())
+                            break
+                    heading = soup.find('h1')
+                    if heading:
+                        parts.append(heading.get_text(separator=' ').strip())
+                    return ' '.join(parts)[:1000]
             except Exception as e:
-                print(f"Error fetching {url}: {e}")
-                return ""
+                logger.warning("Error fetching snippet", extra={"url": url, "error": str(e)})
         return ""
     
     async def extract_social_media_links(self, url: str) -> Dict[str, Optional[str]]:
@@ -44,123 +128,122 @@ class WebScraper:
         Extract social media links directly from HTML by parsing href attributes.
         Prioritizes footer links as they typically contain official social profiles.
         """
-        social_links = {
-            'linkedin_url': None,
-            'twitter_url': None,
-            'facebook_url': None,
-            'instagram_url': None,
-            'youtube_url': None,
-            'github_url': None,
-            'whatsapp_url': None,
-            'tiktok_url': None,
-            'pinterest_url': None,
-            'snapchat_url': None,
-            'threads_url': None,
-            'tripadvisor_url': None,
-        }
+        social_links = dict.fromkeys(SOCIAL_LINK_FIELDS)
         
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
-        async with httpx.AsyncClient(follow_redirects=True, verify=False) as client:
+        async with self._http_client() as client:
             try:
-                resp = await client.get(url, headers=headers, timeout=15.0)
+                resp = await self._fetch_homepage(client, url, headers, 15.0)
                 if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    
-                    # Priority 1: Look for links in footer first (most reliable)
-                    footer_elements = soup.find_all(['footer', 'div', 'section'], 
-                        class_=lambda x: x and any(f in x.lower() for f in ['footer', 'foot', 'bottom', 'social']))
-                    
-                    # Priority 2: Also check header and nav for social links
-                    header_elements = soup.find_all(['header', 'nav', 'div'], 
-                        class_=lambda x: x and any(h in str(x).lower() for h in ['header', 'nav', 'social', 'top']))
-                    
-                    # Combine priority elements with all links as fallback
-                    priority_links = []
-                    for elem in footer_elements + header_elements:
-                        priority_links.extend(elem.find_all('a', href=True))
-                    
-                    # Fallback to all links if none found in priority areas
-                    all_links = soup.find_all('a', href=True)
-                    
-                    # Process priority links first, then all links
-                    links_to_process = priority_links + [l for l in all_links if l not in priority_links]
-                    
-                    for link in links_to_process:
-                        href = link.get('href', '').lower()
-                        original_href = link.get('href', '')
-                        
-                        # LinkedIn
-                        if ('linkedin.com/company/' in href or 'linkedin.com/in/' in href) and not social_links['linkedin_url']:
-                            clean_url = original_href.split('?')[0]
-                            social_links['linkedin_url'] = self._normalize_url(clean_url)
-                        
-                        # Twitter/X
-                        elif ('twitter.com/' in href or 'x.com/' in href) and not social_links['twitter_url']:
-                            if '/status/' not in href and '/intent/' not in href and '/share' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['twitter_url'] = self._normalize_url(clean_url)
-                        
-                        # Facebook
-                        elif 'facebook.com/' in href and not social_links['facebook_url']:
-                            if '/sharer/' not in href and '/share' not in href and '/plugins/' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['facebook_url'] = self._normalize_url(clean_url)
-                        
-                        # Instagram
-                        elif 'instagram.com/' in href and not social_links['instagram_url']:
-                            if '/p/' not in href and '/reel/' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['instagram_url'] = self._normalize_url(clean_url)
-                        
-                        # YouTube
-                        elif ('youtube.com/' in href or 'youtu.be/' in href) and not social_links['youtube_url']:
-                            if '/watch' not in href and '/embed/' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['youtube_url'] = self._normalize_url(clean_url)
-                        
-                        # GitHub
-                        elif 'github.com/' in href and not social_links['github_url']:
-                            clean_url = original_href.split('?')[0]
-                            social_links['github_url'] = self._normalize_url(clean_url)
-                        
-                        # WhatsApp - multiple formats
-                        elif ('wa.me/' in href or 'whatsapp.com/' in href or 'api.whatsapp.com/' in href) and not social_links['whatsapp_url']:
-                            social_links['whatsapp_url'] = original_href
-                        
-                        # TikTok
-                        elif 'tiktok.com/' in href and not social_links['tiktok_url']:
-                            if '/video/' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['tiktok_url'] = self._normalize_url(clean_url)
-                        
-                        # Pinterest
-                        elif 'pinterest.com/' in href and not social_links['pinterest_url']:
-                            if '/pin/' not in href:
-                                clean_url = original_href.split('?')[0]
-                                social_links['pinterest_url'] = self._normalize_url(clean_url)
-                        
-                        # Snapchat
-                        elif 'snapchat.com/' in href and not social_links['snapchat_url']:
-                            clean_url = original_href.split('?')[0]
-                            social_links['snapchat_url'] = self._normalize_url(clean_url)
-                        
-                        # Threads
-                        elif 'threads.net/' in href and not social_links['threads_url']:
-                            clean_url = original_href.split('?')[0]
-                            social_links['threads_url'] = self._normalize_url(clean_url)
-                        
-                        # TripAdvisor
-                        elif 'tripadvisor.com/' in href and not social_links['tripadvisor_url']:
-                            clean_url = original_href.split('?')[0]
-                            social_links['tripadvisor_url'] = self._normalize_url(clean_url)
+                    with track_parse("social_links"):
+                        soup = BeautifulSoup(resp.text, 'html.parser')
+                        social_links = self._extract_social_links_from_soup(soup)
                     
-                    # Count found links
-                    found_count = sum(1 for v in social_links.values() if v is not None)
-                    print(f"✓ Extracted {found_count} social media links from {url}")
-                    print(f"  Links found: {[k.replace('_url', '') for k, v in social_links.items() if v]}")
+                    found = [k.replace('_url', '') for k, v in social_links.items() if v]
+                    logger.info("Extracted social media links", extra={"url": url, "count": len(found), "platforms": found})
                     
             except Exception as e:
-                print(f"Error extracting social links from {url}: {e}")
+                logger.warning("Error extracting social links", extra={"url": url, "error": str(e)})
+        
+        return social_links
+    
+    def _extract_social_links_from_soup(self, soup: BeautifulSoup) -> Dict[str, Optional[str]]:
+        """Find social media profile links in a parsed page, footer and header links first."""
+        social_links = dict.fromkeys(SOCIAL_LINK_FIELDS)
+        
+        # Priority 1: Look for links in footer first (most reliable)
+        footer_elements = soup.find_all(['footer', 'div', 'section'], 
+            class_=lambda x: x and any(f in x.lower() for f in ['footer', 'foot', 'bottom', 'social']))
+        
+        # Priority 2: Also check header and nav for social links
+        header_elements = soup.find_all(['header', 'nav', 'div'], 
+            class_=lambda x: x and any(h in str(x).lower() for h in ['header', 'nav', 'social', 'top']))
+        
+        # Combine priority elements with all links as fallback
+        priority_links = []
+        for elem in footer_elements + header_elements:
+            priority_links.extend(elem.find_all('a', href=True))
+        
+        # Fallback to all links if none found in priority areas
+        all_links = soup.find_all('a', href=True)
+        
+        # Process priority links first, then all links, each element once
+        # (nested footer/social containers list the same links twice)
+        seen_links = set()
+        links_to_process = []
+        for link in priority_links + all_links:
+            if id(link) not in seen_links:
+                seen_links.add(id(link))
+                links_to_process.append(link)
+        
+        for link in links_to_process:
+            href = link.get('href', '').lower()
+            original_href = link.get('href', '')
+            
+            # LinkedIn
+            if ('linkedin.com/company/' in href or 'linkedin.com/in/' in href) and not social_links['linkedin_url']:
+                clean_url = original_href.split('?')[0]
+                social_links['linkedin_url'] = self._normalize_url(clean_url)
+            
+            # Twitter/X
+            elif ('twitter.com/' in href or 'x.com/' in href) and not social_links['twitter_url']:
+                if '/status/' not in href and '/intent/' not in href and '/share' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['twitter_url'] = self._normalize_url(clean_url)
+            
+            # Facebook
+            elif 'facebook.com/' in href and not social_links['facebook_url']:
+                if '/sharer/' not in href and '/share' not in href and '/plugins/' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['facebook_url'] = self._normalize_url(clean_url)
+            
+            # Instagram
+            elif 'instagram.com/' in href and not social_links['instagram_url']:
+                if '/p/' not in href and '/reel/' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['instagram_url'] = self._normalize_url(clean_url)
+            
+            # YouTube
+            elif ('youtube.com/' in href or 'youtu.be/' in href) and not social_links['youtube_url']:
+                if '/watch' not in href and '/embed/' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['youtube_url'] = self._normalize_url(clean_url)
+            
+            # GitHub
+            elif 'github.com/' in href and not social_links['github_url']:
+                clean_url = original_href.split('?')[0]
+                social_links['github_url'] = self._normalize_url(clean_url)
+            
+            # WhatsApp - multiple formats
+            elif ('wa.me/' in href or 'whatsapp.com/' in href or 'api.whatsapp.com/' in href) and not social_links['whatsapp_url']:
+                social_links['whatsapp_url'] = original_href
+            
+            # TikTok
+            elif 'tiktok.com/' in href and not social_links['tiktok_url']:
+                if '/video/' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['tiktok_url'] = self._normalize_url(clean_url)
+            
+            # Pinterest
+            elif 'pinterest.com/' in href and not social_links['pinterest_url']:
+                if '/pin/' not in href:
+                    clean_url = original_href.split('?')[0]
+                    social_links['pinterest_url'] = self._normalize_url(clean_url)
+            
+            # Snapchat
+            elif 'snapchat.com/' in href and not social_links['snapchat_url']:
+                clean_url = original_href.split('?')[0]
+                social_links['snapchat_url'] = self._normalize_url(clean_url)
+            
+            # Threads
+            elif 'threads.net/' in href and not social_links['threads_url']:
+                clean_url = original_href.split('?')[0]
+                social_links['threads_url'] = self._normalize_url(clean_url)
+            
+            # TripAdvisor
+            elif 'tripadvisor.com/' in href and not social_links['tripadvisor_url']:
+                clean_url = original_href.split('?')[0]
+                social_links['tripadvisor_url'] = self._normalize_url(clean_url)
         
         return social_links
     
@@ -189,61 +272,72 @@ class WebScraper:
         
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
         
-        async with httpx.AsyncClient(follow_redirects=True, verify=False) as client:
+        async with self._http_client() as client:
             try:
-                # Try to fetch main page and contact page
-                pages_to_check = [url]
-                
-                # Common contact page URLs
-                base_url = url.rstrip('/')
-                contact_pages = [
-                    f"{base_url}/contact",
-                    f"{base_url}/contact-us",
-                    f"{base_url}/locations",
-                    f"{base_url}/about",
-                    f"{base_url}/about-us",
-                ]
-                
-                # First get the main page to find contact links
-                resp = await client.get(url, headers=headers, timeout=15.0)
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    
-                    # Look for contact page links
-                    for link in soup.find_all('a', href=True):
-                        href = link.get('href', '').lower()
-                        if any(keyword in href for keyword in ['contact', 'location', 'office', 'branch', 'store']):
-                            full_url = self._make_absolute_url(base_url, link['href'])
-                            if full_url not in pages_to_check:
-                                pages_to_check.append(full_url)
-                    
-                    # Extract from main page
-                    self._extract_from_soup(soup, contact_info)
-                
-                # Check additional pages (limit to 3 to avoid too many requests)
-                for page_url in pages_to_check[1:4]:
-                    try:
-                        resp = await client.get(page_url, headers=headers, timeout=10.0)
-                        if resp.status_code == 200:
-                            soup = BeautifulSoup(resp.text, 'html.parser')
-                            self._extract_from_soup(soup, contact_info)
-                    except:
-                        continue
+                # Crawl the homepage, then the most contact/location-like pages
+                # linked from it or listed in the sitemap, within the site budget
+                frontier = CrawlFrontier(url)
+                while True:
+                    batch = frontier.pop_batch()
+                    if not batch:
+                        break
+                    responses = await asyncio.gather(*(
+                        self._fetch_crawl_page(client, page_url, headers, depth) for page_url, depth in batch
+                    ))
+                    for (page_url, depth), resp in zip(batch, responses):
+                        ok = resp is not None and resp.status_code == 200
+                        if ok and frontier.record(page_url, resp.content, str(resp.url)):
+                            with track_parse("contact_info"):
+                                soup = BeautifulSoup(resp.text, 'html.parser')
+                                self._extract_from_soup(soup, contact_info)
+                                canonical = soup.find('link', rel='canonical', href=True)
+                                if canonical:
+                                    frontier.mark_seen(urljoin(str(resp.url), canonical['href']))
+                                if depth < frontier.max_depth:
+                                    frontier.add_links(soup, str(resp.url), depth + 1)
+                        elif not ok:
+                            frontier.record(page_url, None)
+                        
+                        if depth == 0 and resp is not None:
+                            # Sitemaps also list pages linked only from JavaScript-rendered menus
+                            site_root = f"{urlparse(str(resp.url)).scheme}://{urlparse(str(resp.url)).netloc}"
+                            for page in await sitemap_discovery.find_contact_pages(
+                                client, site_root, headers, limit=frontier.max_pages
+                            ):
+                                frontier.add(page, depth=1)
                 
                 # Deduplicate
                 contact_info['phone_numbers'] = list(set(contact_info['phone_numbers']))
                 contact_info['email_addresses'] = list(set(contact_info['email_addresses']))
                 
                 # Log results
-                print(f"✓ Extracted contact info from {url}")
-                print(f"  Main address: {contact_info['main_address'][:50] if contact_info['main_address'] else 'Not found'}...")
-                print(f"  Phones: {len(contact_info['phone_numbers'])}, Emails: {len(contact_info['email_addresses'])}, Branches: {len(contact_info['branches'])}")
+                logger.info("Extracted contact info", extra={
+                    "url": url,
+                    "main_address": contact_info['main_address'][:50] if contact_info['main_address'] else None,
+                    "phones": len(contact_info['phone_numbers']),
+                    "emails": len(contact_info['email_addresses']),
+                    "branches": len(contact_info['branches']),
+                    "crawl": frontier.summary(),
+                })
                 
             except Exception as e:
-                print(f"Error extracting contact info from {url}: {e}")
+                logger.warning("Error extracting contact info", extra={"url": url, "error": str(e)})
         
         return contact_info
     
+    async def _fetch_crawl_page(self, client: httpx.AsyncClient, url: str, headers: Dict,
+                                depth: int) -> Optional[httpx.Response]:
+        """Fetch one frontier page; only a failed homepage fetch is raised."""
+        try:
+            if depth == 0:
+                return await self._fetch_homepage(client, url, headers, 15.0)
+            return await fetch(client, url, headers, 10.0)
+        except Exception:
+            if depth == 0:
+                raise
+            logger.debug("Crawl page fetch failed", extra={"url": url})
+            return None
+    
     def _extract_from_soup(self, soup: BeautifulSoup, contact_info: Dict):
         """Extract contact information from a BeautifulSoup object."""
         
@@ -378,7 +472,12 @@ class WebScraper:
                             branch['address'] = ', '.join(p for p in parts if p)
                         else:
                             branch['address'] = str(addr)
-                    if branch['name'] or branch['address']:
+                    # The same JSON-LD is often repeated on every page of the site
+                    is_duplicate = any(
+                        (b.get('name'), b.get('address')) == (branch['name'], branch['address'])
+                        for b in contact_info['branches']
+                    )
+                    if (branch['name'] or branch['address']) and not is_duplicate:
                         contact_info['branches'].append(branch)
     
     def _extract_branch_info(self, container) -> Dict:
@@ -423,14 +522,3 @@ class WebScraper:
                     break
         
         return branch
-    
-    def _make_absolute_url(self, base_url: str, href: str) -> str:
-        """Convert relative URL to absolute."""
-        if href.startswith('http'):
-            return href
-        elif href.startswith('//'):
-            return 'https:' + href
-        elif href.startswith('/'):
-            return base_url.rstrip('/') + href
-        else:
-            return base_url.rstrip('/') + '/' + href
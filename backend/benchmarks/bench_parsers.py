@@ -0,0 +1,191 @@
+"""
+Parser Microbenchmarks
+Times the CPU-heavy extractors of WebScraper over the parser corpus and
+compares against a stored baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parsers                      # run and compare
+    python -m benchmarks.bench_parsers --update-baseline    # store a new baseline
+    python -m benchmarks.bench_parsers --threshold 0.2      # fail on >20% regressions
+
+The committed baseline (parser_corpus/baseline.json) shows where time goes
+and how it moved between changes; absolute timings are machine-specific, so
+re-record it on the machine (or CI runner) that gates on --threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from app.services.main_content import extract_main_content
+from app.services.web_scraper import WebScraper
+from benchmarks.parser_corpus import CORPUS_VERSION, load_corpus
+
+# Committed next to the corpus manifest so regressions can be compared across changes
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "parser_corpus", "baseline.json")
+# Differences below this many seconds are noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.0005
+
+
+def _empty_contact_info() -> Dict:
+    return {'main_address': None, 'phone_numbers': [], 'email_addresses': [], 'branches': []}
+
+
+def _location_containers(soup: BeautifulSoup):
+    return soup.find_all(['div', 'section', 'article'],
+                         class_=lambda x: x and any(k in str(x).lower() for k in ['location', 'branch', 'office', 'store', 'showroom']))
+
+
+def _json_ld_blocks(soup: BeautifulSoup) -> List[Dict]:
+    blocks = []
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string)
+        except Exception:
+            continue
+        blocks.extend(d for d in (data if isinstance(data, list) else [data]) if isinstance(d, dict))
+    return blocks
+
+
+def build_cases(scraper: WebScraper, html: str) -> Dict[str, Callable[[], object]]:
+    """
+    One callable per extractor. Each extractor gets a freshly parsed soup
+    prepared outside the timed region, except parse_html which times parsing.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    json_ld = _json_ld_blocks(soup)
+    containers = _location_containers(soup)
+
+    def social():
+        return scraper._extract_social_links_from_soup(soup)
+
+    def contact():
+        return scraper._extract_from_soup(soup, _empty_contact_info())
+
+    def structured():
+        info = _empty_contact_info()
+        for data in json_ld:
+            scraper._extract_from_structured_data(data, info)
+        return info
+
+    def branches():
+        return [scraper._extract_branch_info(c) for c in containers]
+
+    return {
+        "parse_html": lambda: BeautifulSoup(html, 'html.parser'),
+        "extract_social_media_links": social,
+        "_extract_from_soup": contact,
+        "_extract_from_structured_data": structured,
+        "_extract_branch_info": branches,
+        # Modifies the soup, so this case includes parsing a fresh copy
+        "extract_main_content": lambda: extract_main_content(BeautifulSoup(html, 'html.parser')),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Median wall time over `repeat` runs plus peak traced allocation of one run."""
+    fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median_s": statistics.median(times), "min_s": min(times), "peak_alloc_kib": round(peak / 1024, 1)}
+
+
+def run(repeat: int) -> Dict:
+    scraper = WebScraper()
+    corpus = load_corpus()
+    results = {}
+    for page, html in corpus.items():
+        results[page] = {"bytes": len(html.encode("utf-8"))}
+        for extractor, fn in build_cases(scraper, html).items():
+            results[page][extractor] = measure(fn, repeat)
+    return {"corpus_version": CORPUS_VERSION, "repeat": repeat, "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return human-readable regressions beyond the threshold."""
+    if baseline.get("corpus_version") != current["corpus_version"]:
+        print(f"Baseline corpus v{baseline.get('corpus_version')} != v{current['corpus_version']}; skipping comparison")
+        return []
+    regressions = []
+    for page, extractors in current["results"].items():
+        for extractor, stats in extractors.items():
+            if not isinstance(stats, dict):
+                continue
+            base = baseline["results"].get(page, {}).get(extractor)
+            if not base:
+                continue
+            now, before = stats["median_s"], base["median_s"]
+            if now > before * (1 + threshold) and now - before > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{page}/{extractor}: {before * 1000:.2f}ms -> {now * 1000:.2f}ms "
+                                   f"(+{(now / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(current: Dict, baseline: Dict):
+    print(f"{'page':<20} {'extractor':<32} {'median ms':>10} {'base ms':>9} {'peak KiB':>10}")
+    for page, extractors in current["results"].items():
+        for extractor, stats in extractors.items():
+            if not isinstance(stats, dict):
+                continue
+            base = (baseline or {}).get("results", {}).get(page, {}).get(extractor)
+            base_ms = f"{base['median_s'] * 1000:.2f}" if base else "-"
+            print(f"{page:<20} {extractor:<32} {stats['median_s'] * 1000:>10.2f} {base_ms:>9} {stats['peak_alloc_kib']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio before failing")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="Also write the current results to this file")
+    args = parser.parse_args()
+
+    current = run(args.repeat)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(current, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if baseline is None:
+        print("\nNo baseline found; run with --update-baseline to create one")
+        return
+
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Fake OpenAI Server
+OpenAI-compatible /v1/chat/completions endpoint with configurable latency and
+canned JSON answers for each agent prompt
+"""
+
+import json
+import re
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixture_sites import SiteFarm, site_url
+
+
+class CannedResponder:
+    """Builds a plausible JSON answer for each agent prompt."""
+
+    def __init__(self, farm: SiteFarm):
+        self.farm = farm
+        self._next_site = 0
+        self._lock = threading.Lock()
+        self._seen_system_prompts = set()
+
+    def cached_tokens(self, system_prompt: str) -> int:
+        """Mimic OpenAI prompt caching: a repeated system prompt of 1024+ tokens is cached in 128-token steps."""
+        tokens = len(system_prompt) // 4
+        with self._lock:
+            seen = system_prompt in self._seen_system_prompts
+            self._seen_system_prompts.add(system_prompt)
+        return tokens // 128 * 128 if seen and tokens >= 1024 else 0
+
+    def _take_sites(self, count: int):
+        # Hand out different sites to each discovery call so concurrent runs do not share caches
+        with self._lock:
+            start = self._next_site
+            self._next_site = (self._next_site + count) % self.farm.size
+        return [self.farm.sites[(start + i) % self.farm.size] for i in range(count)]
+
+    def respond(self, system_prompt: str, user_prompt: str) -> dict:
+        if "Lead Discovery Agent" in system_prompt:
+            match = re.search(r'Limit to (\d+) companies', system_prompt + user_prompt)
+            count = int(match.group(1)) if match else 10
+            return {"companies": [
+                {"company_name": site.name, "website": site_url(site.index), "industry": site.industry,
+                 "company_size": "11-50", "location": site.city,
+                 "linkedin_url": f"https://linkedin.com/company/company-{site.index}"}
+                for site in self._take_sites(count)
+            ]}
+        if "Contact Research Agent" in system_prompt:
+            return {"key_contacts": [
+                {"full_name": f"Contact {i}", "designation": title, "role_category": "Decision Maker",
+                 "email": f"contact{i}@example.org", "phone": None, "linkedin_url": None}
+                for i, title in enumerate(["CEO", "Head of Operations", "Purchasing Manager"])
+            ]}
+        if "Market Research Agent" in system_prompt:
+            return {
+                "company_summary": "Benchmark company providing services to local businesses.",
+                "icp_profile": ["Dental clinics", "General contractors", "Interior design studios"],
+                "target_industries": ["Dental Clinics", "Construction", "Interior Design"],
+                "target_companies": ["Apex Dental Clinic 1", "Summit General Contractor 2"],
+                "usp": "Fast turnaround", "pain_points": ["Slow suppliers", "Unclear pricing"],
+            }
+        if "Market Intelligence Agent" in system_prompt:
+            return {"keywords": [
+                {"category_name": f"Category {c}", "keywords": [f"{kw} {c}" for kw in
+                                                                  ["dental clinic", "dental clinics", "general contractor", "kitchen remodeler"]]}
+                for c in range(6)
+            ]}
+        if "Channel & Distribution Intelligence Agent" in system_prompt:
+            return {"channels": [{"name": "Google Maps", "relevance_score": 90, "why_it_matters": "Local listings"},
+                                 {"name": "Houzz", "relevance_score": 75, "why_it_matters": "Design firms"}],
+                    "strategy_summary": "Search Maps by keyword and city, then enrich from websites."}
+        if "extracts company information" in system_prompt:
+            site = self._take_sites(1)[0]
+            return {"website": site_url(site.index), "industry": site.industry}
+        return {}
+
+
+def make_handler(responder: CannedResponder, latency: float, jitter: float):
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                return self._send(404, {"error": {"message": "not found"}})
+
+            messages = request.get("messages", [])
+            system_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+            user_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+            content = json.dumps(responder.respond(system_prompt, user_prompt))
+
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+            prompt_tokens = (len(system_prompt) + len(user_prompt)) // 4
+            completion_tokens = len(content) // 4
+            self._send(200, {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens,
+                          "prompt_tokens_details": {"cached_tokens": responder.cached_tokens(system_prompt)}},
+            })
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeOpenAIHandler
+
+
+def start_fake_openai(farm: SiteFarm, latency: float = 0.5, jitter: float = 0.1,
+                      port: int = 0) -> ThreadingHTTPServer:
+    """Start the fake OpenAI server in a daemon thread and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(CannedResponder(farm), latency, jitter))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
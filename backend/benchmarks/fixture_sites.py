@@ -0,0 +1,223 @@
+"""
+Fixture Site Farm
+Generates a deterministic corpus of synthetic company websites and serves them
+from a local HTTP proxy, so the scraper can fetch http://company-N.bench/ URLs
+without touching the network.
+"""
+
+import json
+import gzip
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+BENCH_DOMAIN = "bench"
+
+INDUSTRIES = [
+    ("Dental Clinics", "dental clinic", "family and cosmetic dentistry"),
+    ("Construction", "general contractor", "commercial and residential construction"),
+    ("Interior Design", "interior design studio", "kitchen and bath remodeling"),
+    ("Logistics", "freight forwarder", "warehousing and last-mile delivery"),
+    ("Software", "SaaS company", "workflow automation for small businesses"),
+    ("Hospitality", "boutique hotel", "hotel and event venue services"),
+]
+CITIES = ["Austin, TX", "Denver, CO", "Seattle, WA", "Miami, FL", "Chicago, IL", "Boston, MA"]
+STREETS = ["Main St", "Oak Avenue", "Market Street", "Industrial Rd", "Lake Drive", "Pine Street"]
+
+
+def site_host(index: int) -> str:
+    return f"company-{index}.{BENCH_DOMAIN}"
+
+
+def site_url(index: int) -> str:
+    return f"http://{site_host(index)}"
+
+
+class FixtureSite:
+    """One synthetic company website with homepage, contact, locations and about pages."""
+
+    def __init__(self, index: int, seed: int, slow_fraction: float, broken_fraction: float):
+        rng = random.Random(seed * 100003 + index)
+        self.index = index
+        self.industry, self.business_type, self.offering = rng.choice(INDUSTRIES)
+        self.city = rng.choice(CITIES)
+        self.name = f"{rng.choice(['Apex', 'Summit', 'Bright', 'Harbor', 'Cedar', 'Nova'])} {self.business_type.title()} {index}"
+        self.phone = f"+1 512 {rng.randint(200, 999)} {rng.randint(1000, 9999)}"
+        self.email = f"info@{site_host(index)}"
+        self.address = f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, {self.city} {rng.randint(10000, 99999)}"
+        self.branch_count = rng.randint(0, 6)
+        self.has_sitemap = rng.random() < 0.7
+        self.gzip_sitemap = rng.random() < 0.3
+        self.padding_paragraphs = rng.randint(5, 60)
+
+        roll = rng.random()
+        self.broken = roll < broken_fraction
+        self.slow = not self.broken and roll < broken_fraction + slow_fraction
+
+    def _layout(self, title: str, body: str) -> str:
+        host = site_host(self.index)
+        slug = host.split('.')[0]
+        return f"""<!DOCTYPE html>
+<html><head><title>{title} | {self.name}</title>
+<meta name="description" content="{self.name} is a {self.business_type} in {self.city} offering {self.offering}.">
+<script type="application/ld+json">{json.dumps(self._json_ld())}</script>
+<style>body {{ font-family: sans-serif; }}</style></head>
+<body>
+<header class="site-header"><nav class="main-nav">
+<a href="/">Home</a><a href="/about">About</a><a href="/services">Services</a><a href="/contact">Contact</a>
+</nav></header>
+<div class="cookie-banner">We use cookies to improve your experience. Accept all cookies to continue.</div>
+<main>{body}</main>
+<footer class="site-footer">
+<div class="footer-social">
+<a href="https://www.linkedin.com/company/{slug}">LinkedIn</a>
+<a href="https://twitter.com/{slug}">Twitter</a>
+<a href="https://www.facebook.com/{slug}">Facebook</a>
+<a href="https://www.instagram.com/{slug}">Instagram</a>
+<a href="https://www.youtube.com/@{slug}">YouTube</a>
+<a href="https://wa.me/1512555{self.index:04d}">WhatsApp</a>
+</div>
+<p>Call us: <a href="tel:{self.phone}">{self.phone}</a> | <a href="mailto:{self.email}">{self.email}</a></p>
+<p>&copy; 2024 {self.name}. All rights reserved. Privacy Policy | Terms of Service</p>
+</footer></body></html>"""
+
+    def _json_ld(self) -> Dict:
+        data = {
+            "@context": "https://schema.org",
+            "@type": "LocalBusiness",
+            "name": self.name,
+            "telephone": self.phone,
+            "email": self.email,
+            "address": {"@type": "PostalAddress", "streetAddress": self.address.split(',')[0],
+                        "addressLocality": self.city.split(',')[0], "addressRegion": self.city.split(', ')[1],
+                        "postalCode": self.address.split()[-1], "addressCountry": "US"},
+        }
+        if self.branch_count:
+            data["location"] = [
+                {"name": f"{self.name} Branch {b}", "telephone": f"+1 512 555 {b:04d}",
+                 "address": {"streetAddress": f"{100 + b} Branch Ave", "addressLocality": self.city.split(',')[0]}}
+                for b in range(self.branch_count)
+            ]
+        return data
+
+    def homepage(self) -> str:
+        paragraphs = "\n".join(
+            f"<p>{self.name} helps customers with {self.offering}. Our team serves businesses across "
+            f"{self.city} with dependable service, clear pricing and fast turnaround (section {i}).</p>"
+            for i in range(self.padding_paragraphs)
+        )
+        return self._layout("Home", f"<h1>{self.name}</h1><section class='intro'>{paragraphs}</section>")
+
+    def contact(self) -> str:
+        return self._layout("Contact", f"""<h1>Contact {self.name}</h1>
+<address class="company-address">{self.address}</address>
+<p>Phone: {self.phone}</p><p>Email: {self.email}</p>""")
+
+    def locations(self) -> str:
+        cards = "\n".join(f"""<div class="location-card"><h3>{self.name} Branch {b}</h3>
+<address>{100 + b} Branch Ave, Suite {b}, {self.city}</address><p>Phone: +1 512 555 {b:04d}</p>
+<p>branch{b}@{site_host(self.index)}</p></div>""" for b in range(self.branch_count))
+        return self._layout("Locations", f"<h1>Our Locations</h1>{cards or '<p>Visit our main office.</p>'}")
+
+    def about(self) -> str:
+        return self._layout("About", f"<h1>About {self.name}</h1><p>Founded in 2005, we provide {self.offering}.</p>")
+
+    def robots(self) -> str:
+        lines = ["User-agent: *", "Disallow: /admin"]
+        if self.has_sitemap:
+            name = "sitemap.xml.gz" if self.gzip_sitemap else "sitemap.xml"
+            lines.append(f"Sitemap: {site_url(self.index)}/{name}")
+        return "\n".join(lines) + "\n"
+
+    def sitemap(self) -> str:
+        paths = ["/", "/about", "/services", "/contact", "/locations"] + [f"/blog/post-{i}" for i in range(40)]
+        urls = "".join(f"<url><loc>{site_url(self.index)}{p}</loc></url>" for p in paths)
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+    def render(self, path: str) -> Optional[tuple]:
+        """Return (content_type, body_bytes) for a path, or None for 404."""
+        path = path.rstrip('/') or '/'
+        pages = {
+            '/': self.homepage, '/contact': self.contact, '/contact-us': self.contact,
+            '/locations': self.locations, '/about': self.about, '/about-us': self.about,
+            '/services': self.about,
+        }
+        if path in pages:
+            return "text/html; charset=utf-8", pages[path]().encode()
+        if path == '/robots.txt':
+            return "text/plain", self.robots().encode()
+        if self.has_sitemap and path == '/sitemap.xml' and not self.gzip_sitemap:
+            return "application/xml", self.sitemap().encode()
+        if self.has_sitemap and path == '/sitemap.xml.gz' and self.gzip_sitemap:
+            return "application/x-gzip", gzip.compress(self.sitemap().encode())
+        return None
+
+
+class SiteFarm:
+    """Deterministic collection of fixture sites."""
+
+    def __init__(self, size: int = 500, seed: int = 7, slow_fraction: float = 0.1,
+                 broken_fraction: float = 0.05, slow_delay: float = 2.0):
+        self.size = size
+        self.slow_delay = slow_delay
+        self.sites = [FixtureSite(i, seed, slow_fraction, broken_fraction) for i in range(size)]
+
+    def site_for_host(self, host: str) -> Optional[FixtureSite]:
+        host = host.split(':')[0].lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        if not host.endswith('.' + BENCH_DOMAIN) or not host.startswith('company-'):
+            return None
+        try:
+            index = int(host[len('company-'):-len(BENCH_DOMAIN) - 1])
+        except ValueError:
+            return None
+        return self.sites[index] if 0 <= index < self.size else None
+
+
+def make_handler(farm: SiteFarm):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            # As an HTTP proxy the request line carries the absolute URL
+            parsed = urlparse(self.path)
+            host = parsed.netloc or self.headers.get('Host', '')
+            site = farm.site_for_host(host)
+            if site is None:
+                return self._send(404, "text/plain", b"unknown host")
+            if site.broken:
+                if site.index % 2:
+                    return self._send(500, "text/plain", b"internal error")
+                # Drop the connection without a response
+                self.close_connection = True
+                return
+            if site.slow:
+                time.sleep(farm.slow_delay)
+            page = site.render(parsed.path or '/')
+            if page is None:
+                return self._send(404, "text/html", b"<html><body>Not found</body></html>")
+            self._send(200, *page)
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FixtureHandler
+
+
+def start_site_farm(farm: SiteFarm, port: int = 0) -> ThreadingHTTPServer:
+    """Start the fixture proxy in a daemon thread and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(farm))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
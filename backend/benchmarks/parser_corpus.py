@@ -0,0 +1,198 @@
+"""
+Parser Corpus
+Versioned HTML corpus for the parser microbenchmarks.
+
+Generated pages (small, huge, link-heavy, JSON-LD-heavy, location directory)
+are rebuilt deterministically into parser_corpus/generated/ and checked against
+the hashes in parser_corpus/manifest.json. Real-world pages saved with
+`python -m benchmarks.parser_corpus --add NAME URL` are stored in
+parser_corpus/saved/ and recorded in the manifest.
+"""
+
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from typing import Dict
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "parser_corpus")
+MANIFEST_PATH = os.path.join(CORPUS_DIR, "manifest.json")
+# Bump when the generators change so stale baselines are not compared
+CORPUS_VERSION = 1
+
+SOCIAL = ["https://www.linkedin.com/company/acme", "https://twitter.com/acme", "https://www.facebook.com/acme",
+          "https://www.instagram.com/acme", "https://www.youtube.com/@acme", "https://wa.me/15125550100",
+          "https://www.tiktok.com/@acme", "https://www.pinterest.com/acme", "https://github.com/acme"]
+WORDS = ("quartz granite countertop kitchen design builder contractor supply install custom stone surface "
+         "project quality service customer warranty delivery showroom residential commercial renovation").split()
+
+
+def _footer() -> str:
+    links = "".join(f'<a href="{url}">{url.split("/")[2]}</a>' for url in SOCIAL)
+    return (f'<footer class="site-footer"><div class="footer-social">{links}</div>'
+            f'<p>Call <a href="tel:+15125550100">+1 512 555 0100</a> or '
+            f'<a href="mailto:sales@acme-stone.com">sales@acme-stone.com</a></p>'
+            f'<address class="hq-address">1200 Market Street, Suite 400, Austin, TX 78701</address></footer>')
+
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (f"<!DOCTYPE html><html><head><title>{title}</title>{head}</head><body>"
+            f'<header class="site-header"><nav class="main-nav"><a href="/">Home</a><a href="/contact">Contact</a></nav></header>'
+            f"<main>{body}</main>{_footer()}</body></html>")
+
+
+def _sentence(rng: random.Random, length: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def small_page(rng: random.Random) -> str:
+    body = "".join(f"<p>{_sentence(rng)}</p>" for _ in range(12))
+    return _page("Acme Stone", f"<h1>Acme Stone</h1>{body}")
+
+
+def huge_page(rng: random.Random) -> str:
+    sections = []
+    for s in range(400):
+        paragraphs = "".join(f"<p>{_sentence(rng, 30)} Call 512-555-{1000 + s:04d}.</p>" for _ in range(6))
+        sections.append(f'<section class="article-section"><h2>Section {s}</h2>{paragraphs}</section>')
+    return _page("Acme Stone Guide", "".join(sections))
+
+
+def link_heavy_page(rng: random.Random) -> str:
+    menus = []
+    for m in range(60):
+        links = "".join(f'<li><a href="/products/{m}/{i}?ref=menu">{rng.choice(WORDS)} {i}</a></li>' for i in range(50))
+        menus.append(f'<div class="mega-menu nav-column"><ul>{links}</ul></div>')
+    return _page("Acme Catalog", "".join(menus) + f"<p>{_sentence(rng)}</p>")
+
+
+def jsonld_heavy_page(rng: random.Random) -> str:
+    blocks = []
+    for b in range(40):
+        locations = [
+            {"@type": "LocalBusiness", "name": f"Acme Showroom {b}-{i}", "telephone": f"+1 512 555 {b:02d}{i:02d}",
+             "address": {"streetAddress": f"{100 + i} Stone Rd", "addressLocality": "Austin",
+                         "addressRegion": "TX", "postalCode": "78701"}}
+            for i in range(10)
+        ]
+        data = {"@context": "https://schema.org", "@type": "Organization", "name": f"Acme {b}",
+                "telephone": "+1 512 555 0100", "email": "Sales@Acme-Stone.com",
+                "address": {"streetAddress": "1200 Market Street", "addressLocality": "Austin",
+                            "addressRegion": "TX", "postalCode": "78701", "addressCountry": "US"},
+                "location": locations}
+        blocks.append(f'<script type="application/ld+json">{json.dumps(data)}</script>')
+    return _page("Acme Locations", f"<p>{_sentence(rng)}</p>", head="".join(blocks))
+
+
+def location_directory_page(rng: random.Random) -> str:
+    cards = "".join(
+        f'<div class="location-card branch"><h3>Acme Showroom {i}</h3>'
+        f'<p>{100 + i} Stone Road, Suite {i}, Austin TX</p><p>Phone: 512-555-{i:04d}</p>'
+        f'<p>showroom{i}@acme-stone.com</p></div>'
+        for i in range(300)
+    )
+    return _page("Acme Locations", f'<section class="locations">{cards}</section>')
+
+
+GENERATORS = {
+    "small": small_page,
+    "huge": huge_page,
+    "link_heavy": link_heavy_page,
+    "jsonld_heavy": jsonld_heavy_page,
+    "location_directory": location_directory_page,
+}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest() -> Dict:
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    return {"version": CORPUS_VERSION, "pages": {}}
+
+
+def save_manifest(manifest: Dict):
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def build_generated(manifest: Dict) -> Dict[str, str]:
+    """Write generated pages (if missing) and verify them against the manifest."""
+    out_dir = os.path.join(CORPUS_DIR, "generated")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, generator in GENERATORS.items():
+        path = os.path.join(out_dir, f"{name}.html")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generator(random.Random(f"{CORPUS_VERSION}:{name}")))
+        with open(path, "rb") as f:
+            digest = _sha256(f.read())
+        expected = manifest["pages"].get(name, {}).get("sha256")
+        if expected and expected != digest:
+            raise RuntimeError(f"Corpus page {name} does not match manifest v{manifest['version']}; "
+                               f"delete {out_dir} to regenerate or bump CORPUS_VERSION")
+        manifest["pages"].setdefault(name, {"source": "generated", "sha256": digest,
+                                            "bytes": os.path.getsize(path)})
+        paths[name] = path
+    return paths
+
+
+def load_corpus() -> Dict[str, str]:
+    """Return {page_name: html} for every generated and saved page."""
+    manifest = load_manifest()
+    paths = build_generated(manifest)
+    for name, entry in manifest["pages"].items():
+        if entry.get("source") != "generated":
+            paths[name] = os.path.join(CORPUS_DIR, "saved", f"{name}.html")
+    corpus = {}
+    for name, path in sorted(paths.items()):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            corpus[name] = f.read()
+    return corpus
+
+
+def add_page(name: str, url: str):
+    """Save a real-world page into the corpus."""
+    import httpx
+    resp = httpx.get(url, follow_redirects=True, verify=False, timeout=20.0,
+                     headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'})
+    resp.raise_for_status()
+    data = resp.content
+    os.makedirs(os.path.join(CORPUS_DIR, "saved"), exist_ok=True)
+    with open(os.path.join(CORPUS_DIR, "saved", f"{name}.html"), "wb") as f:
+        f.write(data)
+    manifest = load_manifest()
+    manifest["pages"][name] = {"source": url, "sha256": _sha256(data), "bytes": len(data)}
+    save_manifest(manifest)
+    print(f"Saved {url} as {name} ({len(data)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the parser benchmark corpus")
+    parser.add_argument("--add", nargs=2, metavar=("NAME", "URL"), help="Save a real-world page into the corpus")
+    parser.add_argument("--rebuild-manifest", action="store_true", help="Regenerate pages and record their hashes")
+    args = parser.parse_args()
+    if args.add:
+        add_page(*args.add)
+    elif args.rebuild_manifest:
+        manifest = load_manifest()
+        manifest["version"] = CORPUS_VERSION
+        manifest["pages"] = {k: v for k, v in manifest["pages"].items() if v.get("source") != "generated"}
+        build_generated(manifest)
+        save_manifest(manifest)
+        print(f"Manifest v{CORPUS_VERSION} written with {len(manifest['pages'])} pages")
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Pipeline Benchmark
+Measures /generate-leads and /analyze throughput fully offline: a fixture site
+farm stands in for the web, a fake OpenAI server for the LLM and a stub for
+DuckDuckGo.
+
+Usage (from backend/):
+    python -m benchmarks.run_pipeline --leads 10,50 --concurrency 1,4 --llm-latency 0.5
+
+Each scenario runs in its own process so peak RSS is measured per scenario.
+The lead store, result and profile directories and the replay archive live in
+--state-dir (a fresh temporary directory by default), never in the app's own.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import shutil
+import tempfile
+import subprocess
+from collections import defaultdict
+from typing import Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(timings: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        stage: {"count": len(values), "p50": round(percentile(values, 50), 4), "p95": round(percentile(values, 95), 4)}
+        for stage, values in sorted(timings.items())
+    }
+
+
+def instrument(obj, method_name: str, stage: str, timings: Dict[str, List[float]]):
+    """Wrap an async method on an instance so every call records its duration."""
+    original = getattr(obj, method_name)
+
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            timings[stage].append(time.perf_counter() - start)
+
+    setattr(obj, method_name, timed)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def llm_token_totals() -> Dict[str, int]:
+    """Prompt (in), cached prompt (in_cached) and completion (out) tokens across all agents."""
+    from app.services.metrics import LLM_TOKENS
+    totals: Dict[str, int] = defaultdict(int)
+    for metric in LLM_TOKENS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                totals[sample.labels["direction"]] += int(sample.value)
+    return dict(totals)
+
+
+async def run_scenario(args) -> Dict:
+    """Run one scenario inside the child process (environment already pointed at the fakes)."""
+    from benchmarks import stub_search
+    stub_search.FARM_SIZE = args.sites
+    stub_search.install_stub_search()
+
+    from app.agents.lead_generation_agent import LeadGenerationAgent
+    from app.agents.research_agent import ResearchAgent
+    from app.models.schemas import LeadGenerationRequest, CompanyInput
+    from benchmarks.fixture_sites import site_url
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+
+    lead_agent = LeadGenerationAgent()
+    instrument(lead_agent, "_discover_from_channel", "discovery", timings)
+    instrument(lead_agent, "_rank_leads", "ranking", timings)
+    instrument(lead_agent, "_enrich_company_lead", "enrichment", timings)
+    instrument(lead_agent.scraper, "extract_social_media_links", "social_scrape", timings)
+    instrument(lead_agent.scraper, "extract_contact_info", "contact_scrape", timings)
+    instrument(lead_agent.client.chat.completions, "create", "llm", timings)
+
+    research_agent = ResearchAgent()
+    instrument(research_agent.scraper, "get_content", "page_fetch", timings)
+    instrument(research_agent.client.chat.completions, "create", "llm", timings)
+
+    async def generate(i: int):
+        request = LeadGenerationRequest(
+            selected_channels=["Benchmark Directory"],
+            selected_keywords=["dental clinic", "general contractor", "interior design studio"],
+            target_industries=["Dental Clinics", "Construction"],
+            icp_profile=["Dental clinics", "General contractors"],
+            company_summary="Benchmark supplier of business services.",
+            max_leads_per_channel=args.leads,
+            # Every run enriches the same fixture companies
+            skip_seen=False,
+        )
+        start = time.perf_counter()
+        result = await lead_agent.generate_leads(request)
+        timings["generate_leads"].append(time.perf_counter() - start)
+        return result.total_leads
+
+    async def analyze(i: int):
+        start = time.perf_counter()
+        await research_agent.analyze(CompanyInput(company_name=f"Company {i}", website=site_url(i)))
+        timings["analyze"].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    totals = await asyncio.gather(*(generate(i) for i in range(args.concurrency)))
+    generate_wall = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(analyze(i) for i in range(args.analyze)))
+    analyze_wall = time.perf_counter() - started
+
+    total_leads = sum(totals)
+    return {
+        "leads_per_request": args.leads,
+        "concurrency": args.concurrency,
+        "total_leads": total_leads,
+        "generate_wall_seconds": round(generate_wall, 3),
+        "leads_per_minute": round(total_leads / generate_wall * 60, 1) if generate_wall else 0.0,
+        "analyze_requests": args.analyze,
+        "analyze_wall_seconds": round(analyze_wall, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "llm_tokens": llm_token_totals(),
+        "stages": summarize(timings),
+    }
+
+
+def isolate_state(state_dir: str):
+    """Point every store the app writes at state_dir; must run before app modules are imported."""
+    os.makedirs(state_dir, exist_ok=True)
+    os.environ["LEAD_DB_PATH"] = os.path.join(state_dir, "leads.db")
+    os.environ["RESULTS_DIR"] = os.path.join(state_dir, "results")
+    os.environ["PROFILE_DIR"] = os.path.join(state_dir, "profiles")
+    os.environ["REPLAY_ARCHIVE"] = os.path.join(state_dir, "replay_archive")
+    os.environ.pop("TRACE_EXPORT_DIR", None)
+
+
+def child_main(args):
+    isolate_state(args.state_dir)
+    os.environ["HTTP_PROXY"] = f"http://127.0.0.1:{args.proxy_port}"
+    os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.openai_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "bench"
+    result = asyncio.run(run_scenario(args))
+    with open(args.result_file, "w") as f:
+        json.dump(result, f)
+
+
+def print_report(results: List[Dict]):
+    print(f"\n{'leads':>6} {'conc':>5} {'total':>6} {'leads/min':>10} {'wall s':>8} {'RSS MB':>8}")
+    for r in results:
+        print(f"{r['leads_per_request']:>6} {r['concurrency']:>5} {r['total_leads']:>6} "
+              f"{r['leads_per_minute']:>10} {r['generate_wall_seconds']:>8} {r['peak_rss_mb']:>8}")
+        tokens = r.get("llm_tokens", {})
+        print(f"{'':>13}llm tokens       in={tokens.get('in', 0)} cached={tokens.get('in_cached', 0)} out={tokens.get('out', 0)}")
+        for stage, stats in r["stages"].items():
+            print(f"{'':>13}{stage:<16} n={stats['count']:<5} p50={stats['p50']:.3f}s p95={stats['p95']:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline lead generation benchmark")
+    parser.add_argument("--leads", default="10,50", help="Comma-separated leads per request")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated concurrent requests")
+    parser.add_argument("--analyze", type=int, default=3, help="Concurrent /analyze calls per scenario")
+    parser.add_argument("--sites", type=int, default=500, help="Size of the fixture site corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--slow-fraction", type=float, default=0.1)
+    parser.add_argument("--broken-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="Seconds slow hosts wait before answering")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake OpenAI latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show agent output")
+    parser.add_argument("--state-dir", help="Directory for the lead store and other app state "
+                                            "(default: a temporary directory removed afterwards)")
+    # Internal: run a single scenario against already running fakes
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--proxy-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--openai-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.leads = int(args.leads)
+        args.concurrency = int(args.concurrency)
+        return child_main(args)
+
+    keep_state = bool(args.state_dir)
+    state_root = args.state_dir or tempfile.mkdtemp(prefix="bench-state-")
+
+    from benchmarks.fixture_sites import SiteFarm, start_site_farm
+    from benchmarks.fake_openai import start_fake_openai
+
+    farm = SiteFarm(size=args.sites, seed=args.seed, slow_fraction=args.slow_fraction,
+                    broken_fraction=args.broken_fraction, slow_delay=args.slow_delay)
+    site_server = start_site_farm(farm)
+    openai_server = start_fake_openai(farm, latency=args.llm_latency, jitter=args.llm_jitter)
+    print(f"Fixture farm: {args.sites} sites on :{site_server.server_port}, "
+          f"fake OpenAI on :{openai_server.server_port} ({args.llm_latency}s latency)")
+
+    results = []
+    for leads in [int(v) for v in args.leads.split(",")]:
+        for concurrency in [int(v) for v in args.concurrency.split(",")]:
+            print(f"Running scenario: {leads} leads x {concurrency} concurrent requests...")
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+                result_file = tmp.name
+            # Each scenario starts from an empty store
+            state_dir = os.path.join(state_root, f"{leads}x{concurrency}")
+            shutil.rmtree(state_dir, ignore_errors=True)
+            cmd = [sys.executable, "-m", "benchmarks.run_pipeline", "--child",
+                   "--leads", str(leads), "--concurrency", str(concurrency),
+                   "--analyze", str(args.analyze), "--sites", str(args.sites),
+                   "--proxy-port", str(site_server.server_port),
+                   "--openai-port", str(openai_server.server_port), "--result-file", result_file,
+                   "--state-dir", state_dir]
+            output = None if args.verbose else subprocess.DEVNULL
+            subprocess.run(cmd, check=True, stdout=output)
+            with open(result_file) as f:
+                results.append(json.load(f))
+            os.unlink(result_file)
+
+    if not keep_state:
+        shutil.rmtree(state_root, ignore_errors=True)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    site_server.shutdown()
+    openai_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
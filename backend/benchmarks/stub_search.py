@@ -0,0 +1,39 @@
+"""
+Stub Search Provider
+Drop-in replacement for duckduckgo_search.DDGS that returns fixture sites
+"""
+
+import zlib
+from typing import List
+
+from benchmarks.fixture_sites import site_url
+
+# Number of fixture sites the stub can point at; set by the benchmark runner
+FARM_SIZE = 500
+
+
+class StubDDGS:
+    """Context manager with the DDGS.text() interface used by the scraper and lookup service."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query: str, max_results: int = 3) -> List[dict]:
+        # Deterministic: the same query always maps to the same sites
+        start = zlib.crc32(query.encode()) % FARM_SIZE
+        return [
+            {"title": f"Company {(start + i) % FARM_SIZE} - Official Site",
+             "href": site_url((start + i) % FARM_SIZE) + "/",
+             "body": f"Official website of company {(start + i) % FARM_SIZE}."}
+            for i in range(max_results)
+        ]
+
+
+def install_stub_search():
+    """Replace DDGS in every module that imported it."""
+    from app.services import web_scraper, company_lookup
+    web_scraper.DDGS = StubDDGS
+    company_lookup.DDGS = StubDDGS
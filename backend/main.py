@@ -1,10 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import os
+import time
 
 load_dotenv()
 
+from app.services.structured_logging import configure_logging
+from app.services.admission import AdmissionRejected
+from app.services.cancellation import ClientDisconnected
+from app.services.metrics import HTTP_REQUEST_SECONDS
+from app.services.profiler import ProfilingMiddleware
+from app.services.responses import CompressionMiddleware
+
+configure_logging()
+
 app = FastAPI(title="Lead Genius AI API", version="1.0.0")
 
 # Configure CORS - Allowing all for local dev to avoid headaches
@@ -18,6 +30,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added before the latency middleware so it runs in the endpoint's task
+app.add_middleware(ProfilingMiddleware)
+
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (/api/leads/{id}), never the raw path
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    HTTP_REQUEST_SECONDS.labels(
+        method=request.method, endpoint=endpoint, status=str(response.status_code)
+    ).observe(time.perf_counter() - start)
+    return response
+
+# Outermost, so every response (including errors) is negotiated for br/gzip
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected(request: Request, exc: ClientDisconnected):
+    # Nobody reads this; 499 keeps abandoned requests apart in the latency metrics
+    return Response(status_code=499)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Lead Genius AI Agent System is running."}
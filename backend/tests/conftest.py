@@ -0,0 +1,17 @@
+"""
+Test setup: every store the app writes is pointed at a temporary directory
+before any app module is imported, so tests never touch leads.db or results/.
+"""
+
+import os
+import sys
+import tempfile
+
+STATE_DIR = tempfile.mkdtemp(prefix="leadgen-tests-")
+os.environ["LEAD_DB_PATH"] = os.path.join(STATE_DIR, "leads.db")
+os.environ["RESULTS_DIR"] = os.path.join(STATE_DIR, "results")
+os.environ["PROFILE_DIR"] = os.path.join(STATE_DIR, "profiles")
+os.environ.pop("REPLAY_MODE", None)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.models.schemas import ResearchResult
+from app.services.admission import AdmissionLane, AdmissionRejected
+
+
+async def hold(lane, started, release, order=None, name=None):
+    async with lane.admit():
+        if order is not None:
+            order.append(name)
+        started.set()
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queued_jobs_run_in_arrival_order():
+    async def run():
+        lane = AdmissionLane("test", max_concurrent=1, max_queue=5, max_wait=5)
+        release, order = asyncio.Event(), []
+        jobs = [asyncio.create_task(hold(lane, asyncio.Event(), release, order, i)) for i in range(4)]
+        await settle()
+        assert (lane.active, len(lane._waiters)) == (1, 3)
+        release.set()
+        await asyncio.gather(*jobs)
+        assert order == [0, 1, 2, 3]
+        assert (lane.active, len(lane._waiters)) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def run():
+        lane = AdmissionLane("test", max_concurrent=1, max_queue=1, max_wait=5)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(lane, asyncio.Event(), release))
+        queued = asyncio.create_task(hold(lane, asyncio.Event(), release))
+        await settle()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with lane.admit():
+                pass
+        assert rejected.value.reason == "queue_full"
+        # One job queued ahead, one running: two job lengths on one slot
+        assert rejected.value.retry_after == 20
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(run())
+
+
+def test_wait_timeout_frees_the_queue_place():
+    async def run():
+        lane = AdmissionLane("test", max_concurrent=1, max_queue=1, max_wait=0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(lane, asyncio.Event(), release))
+        await settle()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with lane.admit():
+                pass
+        assert rejected.value.reason == "wait_timeout"
+        assert len(lane._waiters) == 0
+        release.set()
+        await running
+        assert lane.active == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        lane = AdmissionLane("test", max_concurrent=1, max_queue=2, max_wait=5)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(lane, asyncio.Event(), release))
+        waiting = asyncio.create_task(hold(lane, asyncio.Event(), release))
+        await settle()
+        waiting.cancel()
+        await settle()
+        release.set()
+        await running
+        assert (lane.active, len(lane._waiters)) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_retry_after_tracks_job_duration():
+    lane = AdmissionLane("test", max_concurrent=2, max_queue=4, max_wait=5)
+    assert lane.retry_after() == 5
+    lane._job_seconds = 1000
+    assert lane.retry_after() == 120
+
+
+def test_saturated_endpoint_answers_429_and_coalesced_calls_share_a_slot(monkeypatch):
+    import main
+    from app.api import endpoints
+
+    lane = AdmissionLane("heavy", max_concurrent=1, max_queue=0, max_wait=1)
+    monkeypatch.setattr(endpoints, "heavy_lane", lane)
+
+    async def analyze(input_data):
+        await asyncio.sleep(0.1)
+        return ResearchResult(company_name=input_data.company_name, company_summary="", icp_profile=[],
+                              target_industries=[], target_companies=[], usp="", pain_points=[], sources=[],
+                              confidence_score=0.5)
+
+    monkeypatch.setattr(endpoints.research_agent, "_analyze", analyze)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"company_name": "Acme", "website": "https://acme.test"}
+            same = await asyncio.gather(*(client.post("/api/analyze", json=body) for _ in range(3)))
+            assert [r.status_code for r in same] == [200, 200, 200]
+            other = dict(body, company_name="Globex")
+            first, second = await asyncio.gather(client.post("/api/analyze", json=body),
+                                                 client.post("/api/analyze", json=other))
+            assert first.status_code == 200
+            assert second.status_code == 429
+            assert int(second.headers["retry-after"]) >= 1
+
+    asyncio.run(run())
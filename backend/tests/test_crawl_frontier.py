@@ -0,0 +1,80 @@
+from bs4 import BeautifulSoup
+
+from app.services.crawl_frontier import CrawlFrontier, canonical_url
+
+ROOT = "https://acme.test/"
+
+
+def fetch_root(frontier, final_url=None, content=b"<html>home</html>"):
+    assert frontier.pop_batch(1) == [(ROOT, 0)]
+    assert frontier.record(ROOT, content, final_url or ROOT)
+
+
+def test_canonical_url_drops_noise():
+    assert canonical_url("https://www.acme.test/contact/?utm_source=x&b=2&a=1#team") == "//acme.test/contact?a=1&b=2"
+    assert canonical_url("http://acme.test") == canonical_url("https://acme.test/")
+
+
+def test_only_relevant_same_site_links_within_depth_are_queued():
+    frontier = CrawlFrontier(ROOT, max_depth=2)
+    assert frontier.add("https://www.acme.test/contact")
+    assert not frontier.add("https://acme.test/contact/")  # same page
+    assert not frontier.add("https://other.test/contact")
+    assert not frontier.add("https://acme.test/blog-post")  # not contact-like
+    assert not frontier.add("https://acme.test/contact.pdf")
+    assert not frontier.add("https://acme.test/locations", depth=3)
+    assert frontier.add("https://acme.test/locations", depth=2)
+
+
+def test_homepage_first_then_best_links():
+    frontier = CrawlFrontier(ROOT)
+    fetch_root(frontier)
+    soup = BeautifulSoup('<a href="/careers">Jobs</a><a href="/contact">Contact us</a>'
+                         '<a href="mailto:x@acme.test">Mail</a><a href="/about">About</a>', "html.parser")
+    assert frontier.add_links(soup, ROOT, depth=1) == 3
+    assert [url for url, _ in frontier.pop_batch(3)] == [
+        "https://acme.test/contact", "https://acme.test/about", "https://acme.test/careers",
+    ]
+
+
+def test_page_budget_counts_in_flight_and_failed_pages():
+    frontier = CrawlFrontier(ROOT, max_pages=3)
+    fetch_root(frontier)
+    for path in ("/contact", "/locations", "/about", "/team"):
+        frontier.add(f"https://acme.test{path}")
+    batch = frontier.pop_batch(5)
+    assert len(batch) == 2
+    assert frontier.exhausted and frontier.pop_batch(5) == []
+    frontier.record(batch[0][0], None)
+    assert frontier.exhausted
+    assert frontier.summary()["pages"] == 2
+
+
+def test_byte_budget_stops_the_crawl():
+    frontier = CrawlFrontier(ROOT, max_pages=10, max_bytes=100)
+    fetch_root(frontier, content=b"x" * 100)
+    frontier.add("https://acme.test/contact")
+    assert frontier.exhausted
+    assert frontier.pop_batch(3) == []
+
+
+def test_duplicate_content_and_redirects_are_skipped():
+    frontier = CrawlFrontier(ROOT)
+    fetch_root(frontier, final_url="https://www.acme-corp.test/")
+    # The homepage's redirect target counts as the same site
+    assert frontier.add("https://acme-corp.test/contact")
+    frontier.add("https://acme.test/locations")
+    frontier.add("https://acme.test/about")
+    (first, _), (second, _), (third, _) = frontier.pop_batch(3)
+    assert frontier.record(first, b"<html>contact</html>", first)
+    # Same bytes under another URL
+    assert not frontier.record(second, b"<html>contact</html>", second)
+    # Redirected to a page already fetched
+    assert not frontier.record(third, b"<html>other</html>", first)
+    assert frontier.summary()["duplicates"] == 2
+
+
+def test_rel_canonical_is_not_queued():
+    frontier = CrawlFrontier(ROOT)
+    frontier.mark_seen("https://acme.test/contact")
+    assert not frontier.add("https://acme.test/contact")
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from app.models.schemas import CompanyLead, FieldProvenance
+from app.services.freshness import (
+    ALL_FETCHES, EMPTY_RETRY_DAYS, FAILED_RETRY_DAYS, FIELD_GROUPS, GROUP_TTL_DAYS,
+    plan_fetches, stale_groups, stamp,
+)
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+
+def make_lead(**fields):
+    return CompanyLead(company_name="Acme", website="https://acme.test", channel_source="test",
+                       discovered_at=NOW.isoformat(), **fields)
+
+
+def fresh_lead():
+    lead = make_lead(linkedin_url="https://linkedin.com/company/acme", email_addresses=["info@acme.test"],
+                     branches=[{"name": "HQ"}], key_contacts=[{"full_name": "Ada", "designation": "CEO",
+                                                                "role_category": "Decision Maker"}])
+    for group in FIELD_GROUPS:
+        stamp(lead, group, "test", now=NOW)
+    return lead
+
+
+def test_never_fetched_groups_are_stale():
+    assert stale_groups(make_lead(), now=NOW) == list(FIELD_GROUPS)
+
+
+def test_fresh_groups_are_kept_until_their_ttl():
+    lead = fresh_lead()
+    assert stale_groups(lead, now=NOW) == []
+    contact_ttl = timedelta(days=GROUP_TTL_DAYS["contact"])
+    assert "contact" not in stale_groups(lead, now=NOW + contact_ttl - timedelta(seconds=1))
+    assert "contact" in stale_groups(lead, now=NOW + contact_ttl)
+
+
+def test_empty_and_failed_groups_are_retried_sooner():
+    lead = fresh_lead()
+    lead.linkedin_url = None
+    stamp(lead, "social", "test", now=NOW)
+    assert lead.field_provenance["social"].status == "empty"
+    stamp(lead, "key_contacts", "test", failed=True, now=NOW)
+    assert lead.field_provenance["key_contacts"].status == "failed"
+
+    assert stale_groups(lead, now=NOW + timedelta(days=FAILED_RETRY_DAYS)) == ["key_contacts"]
+    assert stale_groups(lead, now=NOW + timedelta(days=EMPTY_RETRY_DAYS)) == ["social", "key_contacts"]
+
+
+def test_forced_and_unreadable_groups_are_stale():
+    lead = fresh_lead()
+    lead.field_provenance["branches"] = FieldProvenance(source="test", fetched_at="yesterday", status="ok")
+    assert stale_groups(lead, force=["social"], now=NOW) == ["social", "branches"]
+
+
+def test_contact_and_branches_share_one_crawl():
+    assert plan_fetches(["contact", "branches"]) == {"contact_info"}
+    assert plan_fetches(["social", "key_contacts"]) == {"social_links", "llm_contacts"}
+    assert plan_fetches([]) == set()
+    assert plan_fetches(None) == ALL_FETCHES
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import host_latency as hl
+from app.services.host_latency import HostLatencyTracker, alternate_url, fetch, host_key, host_latency
+
+
+def test_www_and_apex_share_a_host():
+    assert host_key("https://www.acme.test/contact") == host_key("http://acme.test") == "acme.test"
+    assert alternate_url("https://www.acme.test/a?b=1") == "https://acme.test/a?b=1"
+    assert alternate_url("http://acme.test:8080/") == "http://www.acme.test:8080/"
+    assert alternate_url("http://127.0.0.1/") is None
+
+
+def test_timeout_adapts_to_the_hosts_p95():
+    tracker = HostLatencyTracker()
+    url = "https://fast.test/"
+    assert tracker.timeout_for(url, 15).read == 15
+    for seconds in (0.1, 0.2, 0.3):
+        tracker.record(url, seconds)
+    assert tracker.timeout_for(url, 15).read == hl.MIN_FETCH_TIMEOUT
+    for seconds in (3.0, 3.5, 4.0):
+        tracker.record(url, seconds)
+    assert tracker.timeout_for(url, 15).read == pytest.approx(4.0 * hl.TIMEOUT_MULTIPLIER)
+    assert tracker.timeout_for(url, 5).read == 5
+
+
+def test_dead_host_is_probed_then_recovers():
+    tracker = HostLatencyTracker()
+    url = "https://dead.test/"
+    for _ in range(hl.DEAD_HOST_TIMEOUTS):
+        tracker.record_timeout(url)
+    assert tracker.timeout_for(url, 15).read == hl.MIN_FETCH_TIMEOUT
+    tracker._hosts["dead.test"].last_timeout -= hl.DEAD_HOST_COOLDOWN + 1
+    assert tracker.timeout_for(url, 15).read == 15
+
+
+def run_fetch(url, responses):
+    """
+    fetch() against a mock transport; responses maps host -> (delay, status)
+    or (delay, exception class). Returns (response or exception, hosts requested).
+    """
+    requested = []
+
+    async def handler(request):
+        requested.append(request.url.host)
+        delay, outcome = responses[request.url.host]
+        await asyncio.sleep(delay)
+        if isinstance(outcome, type):
+            raise outcome("failed", request=request)
+        return httpx.Response(outcome, text=request.url.host)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            try:
+                return await fetch(client, url, {}, timeout=5), requested
+            except Exception as e:
+                return e, requested
+
+    return asyncio.run(run())
+
+
+def warm(host):
+    # Three quick samples put the hedge delay at 10ms
+    for _ in range(hl.MIN_SAMPLES):
+        host_latency.record(f"https://{host}/", 0.01)
+
+
+def test_fast_primary_is_not_hedged():
+    warm("quick.test")
+    response, requested = run_fetch("https://quick.test/", {"quick.test": (0, 200)})
+    assert response.status_code == 200
+    assert requested == ["quick.test"]
+
+
+def test_successful_hedge_beats_a_slow_primary():
+    warm("slow.test")
+    response, requested = run_fetch("https://slow.test/", {
+        "slow.test": (0.5, 200), "www.slow.test": (0, 200),
+    })
+    assert response.text == "www.slow.test"
+    assert requested == ["slow.test", "www.slow.test"]
+
+
+def test_hedge_404_does_not_beat_a_pending_primary():
+    warm("apex-only.test")
+    response, _ = run_fetch("https://apex-only.test/about", {
+        "apex-only.test": (0.2, 200), "www.apex-only.test": (0, 404),
+    })
+    assert response.status_code == 200
+    assert response.text == "apex-only.test"
+
+
+def test_primary_404_is_still_returned():
+    warm("missing.test")
+    response, _ = run_fetch("https://missing.test/gone", {
+        "missing.test": (0.1, 404), "www.missing.test": (0.3, 404),
+    })
+    assert response.status_code == 404
+    assert response.text == "missing.test"
+
+
+def test_primary_failure_is_reported_when_both_fail():
+    warm("down.test")
+    error, _ = run_fetch("https://down.test/", {
+        "down.test": (0.05, httpx.ConnectError), "www.down.test": (0, 503),
+    })
+    assert isinstance(error, httpx.ConnectError)
@@ -0,0 +1,81 @@
+import csv
+import io
+import re
+import zipfile
+
+import pyarrow.parquet as pq
+
+from app.services.lead_export import DEFAULT_COLUMNS, export_leads, iter_rows, parse_columns
+
+LEAD = {
+    "company_name": "Acme Dental",
+    "website": "https://acme.test",
+    "email_addresses": ["info@acme.test", "", "sales@acme.test"],
+    "phone_numbers": [{"number": "+1 555 0100", "has_whatsapp": True}, {"number": "+1 555 0101"}],
+    "confidence_score": 0.8,
+    "key_contacts": [
+        {"full_name": "Ada Smith", "email": "ada@acme.test"},
+        {"full_name": "Bo Jones", "email": None},
+    ],
+}
+BARE = {"company_name": "Bare Co", "key_contacts": []}
+
+COLUMNS = parse_columns(
+    "Name=company_name,Emails=email_addresses[],Phones=phone_numbers[].number,"
+    "First Phone=phone_numbers[0].number,Missing=phone_numbers[5].number,"
+    "Contact=key_contacts.full_name,Contact Email=key_contacts.email,confidence_score"
+)
+
+
+def test_parse_columns():
+    assert COLUMNS[0] == ("Name", "company_name")
+    assert COLUMNS[-1] == ("confidence_score", "confidence_score")
+    assert parse_columns(None) == DEFAULT_COLUMNS
+    assert parse_columns(" , ") == []
+
+
+def test_paths_resolve_lists_indexes_and_exploded_items():
+    rows = list(iter_rows([LEAD, BARE], COLUMNS))
+    assert rows == [
+        ["Acme Dental", "info@acme.test; sales@acme.test", "+1 555 0100; +1 555 0101", "+1 555 0100", None,
+         "Ada Smith", "ada@acme.test", 0.8],
+        ["Acme Dental", "info@acme.test; sales@acme.test", "+1 555 0100; +1 555 0101", "+1 555 0100", None,
+         "Bo Jones", None, 0.8],
+        # A lead without contacts still gets one row
+        ["Bare Co", None, None, None, None, None, None, None],
+    ]
+
+
+def test_without_explode_one_row_per_lead():
+    columns = parse_columns("Name=company_name,Contacts=key_contacts[].full_name")
+    rows = list(iter_rows([LEAD, BARE], columns, explode=None))
+    assert rows == [["Acme Dental", "Ada Smith; Bo Jones"], ["Bare Co", ""]]
+
+
+def test_csv_export():
+    body = b"".join(export_leads([LEAD, BARE], "csv", COLUMNS)).decode("utf-8")
+    assert body.startswith("﻿")
+    rows = list(csv.reader(io.StringIO(body[1:])))
+    assert rows[0] == [header for header, _ in COLUMNS]
+    assert rows[1][5:7] == ["Ada Smith", "ada@acme.test"]
+    assert rows[3] == ["Bare Co", "", "", "", "", "", "", ""]
+
+
+def test_xlsx_export():
+    body = b"".join(export_leads([LEAD], "xlsx", COLUMNS))
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        strings = archive.read("xl/sharedStrings.xml").decode() if "xl/sharedStrings.xml" in archive.namelist() else ""
+    text = sheet + strings
+    for value in ("Contact Email", "Acme Dental", "ada@acme.test", "Bo Jones", "info@acme.test; sales@acme.test"):
+        assert value in text
+    # Header plus one row per contact
+    assert len(re.findall(r"<row ", sheet)) == 3
+
+
+def test_parquet_export_types_numeric_columns():
+    body = b"".join(export_leads([LEAD], "parquet", COLUMNS))
+    table = pq.read_table(io.BytesIO(body))
+    assert table.column_names == [header for header, _ in COLUMNS]
+    assert table.column("confidence_score").to_pylist() == [0.8, 0.8]
+    assert table.column("Contact").to_pylist() == ["Ada Smith", "Bo Jones"]
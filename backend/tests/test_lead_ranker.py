@@ -0,0 +1,61 @@
+from app.models.schemas import CompanyLead
+from app.services.lead_ranker import LeadRanker
+
+
+def make_lead(name, industry=None, location=None):
+    return CompanyLead(company_name=name, industry=industry, location=location,
+                       channel_source="test", discovered_at="2026-01-01T00:00:00")
+
+
+ICP = ["Dental clinics"]
+KEYWORDS = ["dental clinic"]
+INDUSTRIES = ["Dental Clinics"]
+
+
+def test_matching_lead_ranks_first_and_scores_are_normalized():
+    leads = [
+        make_lead("Summit Roofing", "Construction"),
+        make_lead("Bright Smile Dental", "Dental Clinics"),
+        make_lead("Harbor Bakery", "Food"),
+    ]
+    ranked = LeadRanker().rank(leads, ICP, KEYWORDS, INDUSTRIES)
+    assert ranked[0].company_name == "Bright Smile Dental"
+    assert ranked[0].relevance_score == 1.0
+    assert all(0.0 <= lead.relevance_score <= 1.0 for lead in leads)
+    assert leads[0].relevance_score == 0.0
+
+
+def test_snippet_text_counts_towards_relevance():
+    leads = [make_lead("Acme Holdings"), make_lead("Globex Group")]
+    scores = LeadRanker().score(leads, ICP, KEYWORDS, INDUSTRIES, snippets={1: "Family dental clinic in Leeds"})
+    assert scores[1] > scores[0]
+
+
+def test_industry_terms_outweigh_keywords():
+    leads = [make_lead("Northside Orthodontics"), make_lead("Northside Implants")]
+    scores = LeadRanker(industry_weight=3.0).score(
+        leads, [], ["implants"], ["orthodontics"]
+    )
+    assert scores[0] > scores[1]
+
+
+def test_top_k_and_min_score_limit_the_selection():
+    leads = [
+        make_lead("Bright Smile Dental", "Dental Clinics"),
+        make_lead("City Dental Clinic", "Dental"),
+        make_lead("Harbor Bakery", "Food"),
+    ]
+    ranker = LeadRanker()
+    assert len(ranker.rank(leads, ICP, KEYWORDS, INDUSTRIES, top_k=2)) == 2
+    selected = ranker.rank(leads, ICP, KEYWORDS, INDUSTRIES, min_score=0.01)
+    assert "Harbor Bakery" not in [lead.company_name for lead in selected]
+
+
+def test_ties_keep_discovery_order():
+    leads = [make_lead("Alpha Bakery"), make_lead("Beta Bakery"), make_lead("Gamma Bakery")]
+    ranked = LeadRanker().rank(leads, ICP, KEYWORDS, INDUSTRIES)
+    assert [lead.company_name for lead in ranked] == ["Alpha Bakery", "Beta Bakery", "Gamma Bakery"]
+
+
+def test_no_leads():
+    assert LeadRanker().rank([], ICP, KEYWORDS, INDUSTRIES) == []
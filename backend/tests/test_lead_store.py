@@ -0,0 +1,87 @@
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.schemas import CompanyLead
+from app.services.lead_store import LeadStore, decode_cursor, encode_cursor
+
+
+def make_lead(i, **fields):
+    values = dict(company_name=f"Company {i}", website=f"https://company{i}.test", channel_source="test",
+                  confidence_score=round(i / 100, 2), discovered_at=f"2026-01-01T00:00:{i % 3:02d}")
+    values.update(fields)
+    return CompanyLead(**values)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LeadStore(str(tmp_path / "leads.db"))
+
+
+def page_through(store, **filters):
+    seen, cursor = [], None
+    while True:
+        page = store.query(limit=7, cursor=cursor, **filters)
+        seen.extend(lead["company_name"] for lead in page["leads"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_cursor_pages_cover_every_lead_once_despite_ties(store):
+    store.add_leads(make_lead(i) for i in range(30))
+    names = page_through(store)
+    assert len(names) == 30 and len(set(names)) == 30
+
+    by_confidence = page_through(store, sort="confidence_score")
+    assert by_confidence[0] == "Company 29" and by_confidence[-1] == "Company 0"
+
+
+def test_filters_and_full_text_search(store):
+    store.add_leads([
+        make_lead(1, industry="Dental", summary="Family dental practice in Leeds"),
+        make_lead(2, industry="Construction", summary="General contractor"),
+        make_lead(3, industry="dental", location="Berlin, Germany"),
+    ])
+    assert [l["company_name"] for l in store.query(q="dent")["leads"]] == ["Company 1"]
+    assert {l["company_name"] for l in store.query(industry="DENTAL")["leads"]} == {"Company 1", "Company 3"}
+    assert [l["company_name"] for l in store.query(location="germany")["leads"]] == ["Company 3"]
+    assert store.query(q='"unbalanced (quote')["leads"] == []
+
+
+def test_upsert_by_domain_keeps_enriched_rows(store):
+    store.add_leads([make_lead(1, enrichment_status="enriched", industry="Dental")])
+    store.add_leads([make_lead(1, enrichment_status="skipped")])
+    assert store.count() == 1
+    assert store.get_leads(["company1.test"])[0]["enrichment_status"] == "enriched"
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("2026-01-01T00:00:00", 42)) == ("2026-01-01T00:00:00", 42)
+    assert decode_cursor(encode_cursor(0.5, 7)) == (0.5, 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    "abc",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b"[[1], 2]").decode(),
+    base64.urlsafe_b64encode(b'["x", null]').decode(),
+])
+def test_malformed_cursor_is_a_value_error(store, cursor):
+    with pytest.raises(ValueError, match="invalid cursor"):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        store.query(cursor=cursor)
+
+
+def test_malformed_cursor_is_a_400():
+    import main
+    client = TestClient(main.app)
+    response = client.get("/api/leads", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid cursor"}
+    assert client.get("/api/leads", params={"sort": "name"}).status_code == 400
@@ -0,0 +1,89 @@
+import pytest
+
+from app.models.schemas import CompanyLead
+from app.services.seen_filter import BloomFilter, SeenFilter, entity_keys, lookup_keys, normalize_company_name
+
+
+def make_lead(name, website=None):
+    return CompanyLead(company_name=name, website=website, channel_source="test", discovered_at="2026-01-01T00:00:00")
+
+
+@pytest.fixture
+def seen(tmp_path):
+    return SeenFilter(str(tmp_path / "leads.db"))
+
+
+@pytest.mark.parametrize("name, normalized", [
+    ("The Acme Corp., Inc.", "acme"),
+    ("ACME, Inc.", "acme"),
+    ("Müller & Söhne GmbH", "muller and sohne"),
+    ("Inc.", None),
+    (None, None),
+])
+def test_normalize_company_name(name, normalized):
+    assert normalize_company_name(name) == normalized
+
+
+def test_keys():
+    assert entity_keys("https://www.acme.test/about", "Acme Inc") == ["domain:acme.test", "label:acme"]
+    assert entity_keys(None, "Globex LLC") == ["name:globex"]
+    assert lookup_keys("https://acme.test", "Acme") == ["domain:acme.test", "name:acme"]
+    assert lookup_keys(None, "Acme") == ["name:acme", "label:acme"]
+
+
+def test_bloom_has_no_false_negatives_and_counts_new_keys_only():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"domain:site{i}.test" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    count = bloom.count
+    assert not bloom.add(keys[0])
+    assert bloom.count == count
+    false_positives = sum(f"domain:other{i}.test" in bloom for i in range(2000))
+    assert false_positives < 2000 * 0.05
+
+
+def test_enriched_domains_are_skipped_but_same_named_companies_are_not(seen):
+    assert seen.add_leads([make_lead("Summit Dental LLC", "https://summitdental.test")]) == 2
+    new, skipped = seen.filter_new([
+        make_lead("Summit Dental", "https://www.summitdental.test/"),
+        make_lead("Summit Dental", "https://summit-dental-denver.test"),
+        make_lead("Summit Dental Inc"),
+    ])
+    assert [lead.website for lead in skipped] == ["https://www.summitdental.test/", None]
+    assert [lead.website for lead in new] == ["https://summit-dental-denver.test"]
+
+
+def test_imported_names_exclude_every_lead_with_that_name(seen):
+    seen.add([(None, "Globex Corporation", None), ("initech.test", None, None)], source="crm")
+    new, skipped = seen.filter_new([
+        make_lead("Globex", "https://globex.test"),
+        make_lead("Initech", "https://initech.test"),
+        make_lead("Hooli", "https://hooli.test"),
+    ])
+    assert [lead.company_name for lead in skipped] == ["Globex", "Initech"]
+    assert [lead.company_name for lead in new] == ["Hooli"]
+
+
+def test_re_adding_known_keys(seen):
+    entries = [("acme.test", "Acme", "Dental"), (None, "Globex", None)]
+    assert seen.add(entries, source="crm") == 3
+    bloom_count = seen._bloom.count
+    assert seen.add(entries, source="crm") == 0
+    assert seen._bloom.count == bloom_count
+    assert seen.count() == 3
+
+
+def test_store_outlives_the_bloom_filter(seen, tmp_path):
+    seen.add([("acme.test", "Acme", "Dental")], source="crm")
+    reopened = SeenFilter(str(tmp_path / "leads.db"))
+    _, skipped = reopened.filter_new([make_lead("Acme", "https://acme.test")])
+    assert len(skipped) == 1
+
+
+def test_prompt_exclusions_prefer_target_industries(seen):
+    seen.add([("a.test", "Alpha Dental", "Dental"), ("b.test", "Beta Build", "Construction")], source="crm")
+    assert seen.prompt_exclusions(["dental"], limit=1) == ["Alpha Dental"]
+    assert seen.prompt_exclusions(["construction"], limit=5)[0] == "Beta Build"
+    assert seen.prompt_exclusions(["dental"], limit=0) == []
@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from pydantic import BaseModel
+
+from app.services.singleflight import SingleFlight
+
+
+class Result(BaseModel):
+    items: list
+
+
+class Work:
+    """fn for SingleFlight.do that counts runs and blocks until released."""
+
+    def __init__(self, result=None, error=None):
+        self.runs = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_callers_share_one_run_and_get_copies():
+    async def run():
+        flight, work = SingleFlight("test"), Work(result=Result(items=[1]))
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+        await settle()
+        assert flight.in_flight("k")
+        work.release.set()
+        results = await asyncio.gather(*callers)
+        assert work.runs == 1
+        assert not flight.in_flight("k")
+        results[1].items.append(2)
+        assert results[0].items == [1] and results[2].items == [1]
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_caller():
+    async def run():
+        flight, work = SingleFlight("test"), Work(error=RuntimeError("boom"))
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await settle()
+        work.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert [str(r) for r in results] == ["boom", "boom"]
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_caller_keeps_the_run_for_others():
+    async def run():
+        flight, work = SingleFlight("test"), Work(result="done")
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await settle()
+        first.cancel()
+        await settle()
+        assert not work.cancelled
+        work.release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
+
+
+def test_cancelling_the_last_caller_cancels_the_run():
+    async def run():
+        flight, work = SingleFlight("test"), Work(result="done")
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await settle()
+        for caller in callers:
+            caller.cancel()
+        await settle()
+        assert work.cancelled
+        assert not flight.in_flight("k")
+
+        # The next caller starts a fresh run instead of joining the cancelled one
+        fresh = Work(result="again")
+        fresh.release.set()
+        assert await flight.do("k", fresh) == "again"
+
+    asyncio.run(run())
+
+
+def test_only_the_leader_is_admitted():
+    async def run():
+        admitted = 0
+
+        @asynccontextmanager
+        async def admit():
+            nonlocal admitted
+            admitted += 1
+            yield
+
+        flight, work = SingleFlight("test"), Work(result="done")
+        callers = [asyncio.create_task(flight.do("k", work, admit=admit)) for _ in range(4)]
+        await settle()
+        work.release.set()
+        assert await asyncio.gather(*callers) == ["done"] * 4
+        assert admitted == 1
+
+    asyncio.run(run())
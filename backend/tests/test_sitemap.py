@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+
+import httpx
+
+from app.services import sitemap
+from app.services.sitemap import SitemapDiscovery, score_contact_url
+
+
+def urlset(*urls, host="https://acme.test"):
+    """A urlset of the given URLs; paths are taken to be on `host`."""
+    entries = "".join(f"<url><loc>{host + url if url.startswith('/') else url}</loc></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+
+def sitemap_index(*urls):
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'.encode()
+
+
+def serve(routes):
+    """Client answering from {path: bytes}; other paths are 404. Requested paths are recorded."""
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        body = routes.get(request.url.path)
+        return httpx.Response(200, content=body) if body is not None else httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requested
+
+
+def site_urls(routes, base_url="https://acme.test", discovery=None):
+    async def run():
+        client, requested = serve(routes)
+        async with client:
+            return await (discovery or SitemapDiscovery()).get_site_urls(client, base_url, {}), requested
+    return asyncio.run(run())
+
+
+def test_contact_keywords_match_whole_words():
+    assert score_contact_url("https://acme.test/contact") > 0
+    assert score_contact_url("https://acme.test/locations") > 0
+    assert score_contact_url("https://acme.test/restore") == 0
+    assert score_contact_url("https://acme.test/contact") > score_contact_url("https://acme.test/blog/2020/contact-us")
+
+
+def test_parses_urlset():
+    urls, _ = site_urls({"/sitemap.xml": urlset("/", "/contact", "/about")})
+    assert urls == ["https://acme.test/", "https://acme.test/contact", "https://acme.test/about"]
+
+
+def test_follows_index_children_most_likely_to_list_pages(monkeypatch):
+    monkeypatch.setattr(sitemap, "MAX_SITEMAP_FILES", 2)
+    routes = {
+        "/robots.txt": b"User-agent: *\nSitemap: https://acme.test/index.xml\n",
+        "/index.xml": sitemap_index("https://acme.test/posts.xml", "https://acme.test/pages.xml"),
+        "/posts.xml": urlset("/blog/1"),
+        "/pages.xml": urlset("/contact"),
+    }
+    urls, requested = site_urls(routes)
+    assert urls == ["https://acme.test/contact"]
+    # The index plus one child exhaust the file budget
+    assert "/posts.xml" not in requested
+
+
+def test_byte_budget_spans_files(monkeypatch):
+    monkeypatch.setattr(sitemap, "MAX_SITEMAP_BYTES", 300)
+    big = urlset(*[f"/page-{i}" for i in range(50)])
+    assert len(big) > 300
+    routes = {"/sitemap.xml": big, "/sitemap_index.xml": urlset("/contact")}
+    urls, requested = site_urls(routes)
+    assert 0 < len(urls) < 50
+    assert "/sitemap_index.xml" not in requested
+
+
+def test_gzip_bomb_is_cut_off_at_the_decompressed_budget():
+    bomb = gzip.compress(b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + b" " * (20 * 1024 * 1024))
+    assert len(bomb) < 64 * 1024
+
+    async def run():
+        client, _ = serve({"/sitemap.xml.gz": bomb})
+        async with client:
+            return await SitemapDiscovery()._parse_sitemap(client, "https://acme.test/sitemap.xml.gz", {}, max_bytes=4096)
+
+    is_index, locations, used = asyncio.run(run())
+    assert (is_index, locations) == (False, [])
+    assert used == 4096
+
+
+def test_gzip_sitemap_is_parsed():
+    routes = {"/sitemap.xml": gzip.compress(urlset("/contact", "/team"))}
+    urls, _ = site_urls(routes)
+    assert urls == ["https://acme.test/contact", "https://acme.test/team"]
+
+
+def test_empty_results_are_cached_briefly(monkeypatch):
+    discovery = SitemapDiscovery()
+    _, requested = site_urls({}, discovery=discovery)
+    assert requested
+    _, requested = site_urls({}, discovery=discovery)
+    assert requested == []
+
+    monkeypatch.setattr(sitemap, "SITEMAP_EMPTY_CACHE_TTL", 0)
+    urls, requested = site_urls({"/sitemap.xml": urlset("/contact")}, discovery=discovery)
+    assert urls == ["https://acme.test/contact"]
+
+    monkeypatch.setattr(sitemap, "SITEMAP_EMPTY_CACHE_TTL", 300)
+    monkeypatch.setattr(sitemap, "SITEMAP_CACHE_TTL", 300)
+    _, requested = site_urls({}, discovery=discovery)
+    assert requested == []
+
+
+def contact_pages(routes, base_url):
+    async def run():
+        client, _ = serve(routes)
+        async with client:
+            return await SitemapDiscovery().find_contact_pages(client, base_url, {}, limit=5)
+    return asyncio.run(run())
+
+
+def test_contact_pages_stay_on_site():
+    routes = {"/sitemap.xml": urlset("/contact", "https://other.test/contact", "/locations")}
+    expected = ["https://acme.test/contact", "https://acme.test/locations"]
+    assert contact_pages(routes, "https://acme.test") == expected
+    assert contact_pages(routes, "https://www.acme.test") == expected
+
+
+def test_only_a_leading_www_is_ignored():
+    routes = {"/sitemap.xml": urlset("https://news.acme.test/contact", "https://news.www.acme.test/locations")}
+    assert contact_pages(routes, "https://news.acme.test") == ["https://news.acme.test/contact"]
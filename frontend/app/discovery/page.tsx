@@ -29,19 +29,29 @@ export default function DiscoveryPage() {
         const fetchKeywords = async () => {
             try {
                 const baseUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-                const res = await fetch(`${baseUrl}/api/keywords`, {
+                const res = await fetch(`${baseUrl}/api/keywords/stream`, {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify(input)
                 });
-                const result = await res.json();
 
-                if (result.grouped_keywords) {
-                    setCategories(result.grouped_keywords);
-                    if (result.grouped_keywords.length > 0) {
-                        setSelectedKeywords(result.grouped_keywords[0].keywords.slice(0, 3));
+                // Categories render as soon as each one is generated
+                let first = true;
+                await readEvents(res, (event, data) => {
+                    if (event === 'category') {
+                        setCategories(prev => [...prev, data]);
+                        if (first) {
+                            setSelectedKeywords(data.keywords.slice(0, 3));
+                            first = false;
+                        }
+                        setLoading(false);
+                    } else if (event === 'result' && data.grouped_keywords) {
+                        setCategories(data.grouped_keywords);
+                        if (first && data.grouped_keywords.length > 0) {
+                            setSelectedKeywords(data.grouped_keywords[0].keywords.slice(0, 3));
+                        }
                     }
-                }
+                });
             } catch (err) {
                 console.error(err);
             } finally {
@@ -68,13 +78,18 @@ export default function DiscoveryPage() {
                 company_summary: inputData.company_summary,
                 target_industries: inputData.target_industries
             };
-            const res = await fetch(`${baseUrl}/api/strategy`, {
+            const res = await fetch(`${baseUrl}/api/strategy/stream`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(payload)
             });
-            const result = await res.json();
-            setStrategyResult(result);
+            await readEvents(res, (event, data) => {
+                if (event === 'channel') {
+                    setStrategyResult((prev: any) => ({ ...prev, channels: [...(prev?.channels || []), data] }));
+                } else if (event === 'result') {
+                    setStrategyResult(data);
+                }
+            });
         } catch (e) {
             console.error(e);
         } finally {
@@ -132,8 +147,9 @@ export default function DiscoveryPage() {
                             ...inputData
                         }));
                         router.push('/leads');
-                    }} className="oceanic-btn oceanic-btn-primary text-lg px-12 py-4">
-                        Generate Leads →
+                    }} disabled={analyzingStrategy}
+                        className="oceanic-btn oceanic-btn-primary text-lg px-12 py-4 disabled:opacity-50 disabled:cursor-not-allowed">
+                        {analyzingStrategy ? 'Finding channels...' : 'Generate Leads →'}
                     </button>
                 </div>
             </div>
@@ -194,6 +210,31 @@ export default function DiscoveryPage() {
     )
 }
 
+// Reads a newline-delimited JSON event stream ({"event", "data"} per line)
+async function readEvents(res: Response, onEvent: (event: string, data: any) => void) {
+    if (!res.body) throw new Error('Streaming not supported');
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() || '';
+        for (const line of lines) {
+            if (line.trim()) {
+                const message = JSON.parse(line);
+                onEvent(message.event, message.data);
+            }
+        }
+        if (done) break;
+    }
+    if (buffer.trim()) {
+        const message = JSON.parse(buffer);
+        onEvent(message.event, message.data);
+    }
+}
+
 function LoadingScreen() {
     return (
         <div className="min-h-screen flex flex-col items-center justify-center bg-gray-50">
@@ -53,6 +53,7 @@ export default function LeadsPage() {
     const [totalLeads, setTotalLeads] = useState(0);
     const [leadsByChannel, setLeadsByChannel] = useState<Record<string, number>>({});
     const [expandedCompany, setExpandedCompany] = useState<string | null>(null);
+    const [resultId, setResultId] = useState<string | null>(null);
 
     useEffect(() => {
         const stored = localStorage.getItem('Oceanic6_strategy');
@@ -80,6 +81,7 @@ export default function LeadsPage() {
                 selected_channels: strategyData.channels.map((c: any) => c.name),
                 selected_keywords: strategyData.keywords || [],
                 target_industries: strategyData.target_industries || [],
+                icp_profile: strategyData.icp_profile || [],
                 company_summary: strategyData.company_summary || "",
                 max_leads_per_channel: 10
             };
@@ -96,6 +98,7 @@ export default function LeadsPage() {
             setLeads(result.companies || []);
             setTotalLeads(result.total_leads || 0);
             setLeadsByChannel(result.leads_by_channel || {});
+            setResultId(result.result_id || null);
 
         } catch (error) {
             console.error('Error generating leads:', error);
@@ -105,7 +108,18 @@ export default function LeadsPage() {
         }
     };
 
+    const exportFromServer = (format: 'csv' | 'xlsx' | 'parquet') => {
+        if (!resultId) return;
+        // The backend streams the stored result, so large exports never sit in browser memory
+        const baseUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+        window.location.href = `${baseUrl}/api/results/${resultId}/export?format=${format}`;
+    };
+
     const exportToCSV = () => {
+        if (resultId) {
+            exportFromServer('csv');
+            return;
+        }
         if (leads.length === 0) return;
 
         const headers = [
@@ -250,10 +264,15 @@ export default function LeadsPage() {
                     </div>
 
                     {/* Export Button */}
-                    <div className="flex justify-end mb-4">
+                    <div className="flex justify-end gap-2 mb-4">
                         <button onClick={exportToCSV} className="oceanic-btn oceanic-btn-outline">
                             Export to CSV
                         </button>
+                        {resultId && (
+                            <button onClick={() => exportFromServer('xlsx')} className="oceanic-btn oceanic-btn-outline">
+                                Export to Excel
+                            </button>
+                        )}
                     </div>
 
                     {/* Leads Table */}